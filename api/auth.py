@@ -1,9 +1,15 @@
 """API key authentication for v2 endpoints.
 
-Keys stored as SHA256 hashes in data/api_keys.json.
+Keys stored as HMAC-SHA256 hashes (hex, peppered with API_KEY_PEPPER) in
+data/api_keys.json. Entries written under the old unpeppered SHA256 hash
+are re-keyed on first use. The table is cached in-process and only re-read
+when the file's mtime changes; per-request usage counters are written back
+in batches, or kept in Redis (atomic HINCRBY) when REDIS_URL is set.
 """
 
+import atexit
 import hashlib
+import hmac
 import json
 import os
 import secrets
@@ -13,44 +19,224 @@ from functools import wraps
 
 from flask import request, jsonify
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 KEYS_FILE = os.path.join(DATA_DIR, "api_keys.json")
 
+_PEPPER = os.environ.get("API_KEY_PEPPER", "").encode()
+
 _lock = threading.Lock()
+SAVE_INTERVAL = 50  # flush usage counters every N validated requests
+INDEX_PREFIX_BYTES = 8
+
+# In-process copy of KEYS_FILE. "mtime" detects writes from other processes;
+# "dirty" holds hashes whose last_used/request_count are not yet on disk;
+# "index" maps the first INDEX_PREFIX_BYTES of each digest to a bucket of
+# (full digest, hex key in "keys") pairs.
+_cache = {"mtime": None, "keys": {}, "index": {}, "dirty": set(), "pending": 0}
 
 
-def _hash_key(key: str) -> str:
+def _hash_key(key: str) -> bytes:
+    return hmac.new(_PEPPER, key.encode(), hashlib.sha256).digest()
+
+
+def _legacy_hash_key(key: str) -> str:
+    """Unpeppered SHA256 hex digest used before HMAC hashing."""
     return hashlib.sha256(key.encode()).hexdigest()
 
 
+def _reindex(keys: dict):
+    """Rebuild the digest-prefix index. Caller must hold ``_lock``."""
+    index = {}
+    for h in keys:
+        try:
+            digest = bytes.fromhex(h)
+        except ValueError:
+            continue
+        index.setdefault(digest[:INDEX_PREFIX_BYTES], []).append((digest, h))
+    _cache["index"] = index
+
+
+def _index_add(key_hash: str):
+    """Add one key to the index in place. Caller must hold ``_lock``."""
+    digest = bytes.fromhex(key_hash)
+    _cache["index"].setdefault(digest[:INDEX_PREFIX_BYTES], []).append((digest, key_hash))
+
+
+def _index_remove(key_hash: str):
+    """Remove one key from the index in place. Caller must hold ``_lock``."""
+    try:
+        prefix = bytes.fromhex(key_hash)[:INDEX_PREFIX_BYTES]
+    except ValueError:
+        return
+    bucket = _cache["index"].get(prefix)
+    if not bucket:
+        return
+    bucket[:] = [entry for entry in bucket if entry[1] != key_hash]
+    if not bucket:
+        del _cache["index"][prefix]
+
+
+def _lookup(digest: bytes) -> str | None:
+    """Find the hex key for digest; full digests are compared in constant time."""
+    for candidate, key_hash in _cache["index"].get(digest[:INDEX_PREFIX_BYTES], ()):
+        if hmac.compare_digest(candidate, digest):
+            return key_hash
+    return None
+
+
 def _load_keys() -> dict:
+    """Return the cached key table, re-reading KEYS_FILE only when it changed.
+
+    Caller must hold ``_lock``. The returned dict is the cache itself.
+    """
     try:
-        with open(KEYS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+        mtime = os.stat(KEYS_FILE).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime == _cache["mtime"]:
+        return _cache["keys"]
+
+    keys = {}
+    if mtime is not None:
+        try:
+            with open(KEYS_FILE, "rb") as f:
+                raw = f.read()
+            keys = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except (FileNotFoundError, json.JSONDecodeError):
+            keys = {}
+
+    # Keep usage counters that have not been flushed yet
+    old = _cache["keys"]
+    for h in list(_cache["dirty"]):
+        if h in keys and h in old:
+            keys[h]["last_used"] = old[h].get("last_used", 0)
+            keys[h]["request_count"] = old[h].get("request_count", 0)
+        else:
+            _cache["dirty"].discard(h)
+
+    _cache["keys"] = keys
+    _cache["mtime"] = mtime
+    _reindex(keys)
+    return keys
 
 
 def _save_keys(data: dict):
+    """Atomically write the cached key table. Caller must hold ``_lock``.
+
+    ``data`` is the dict returned by _load_keys(); callers keep the index in
+    sync themselves (_index_add/_index_remove) when adding or removing keys.
+    """
     os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_file = KEYS_FILE + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_file, KEYS_FILE)
+    _cache["keys"] = data
+    _cache["mtime"] = os.stat(KEYS_FILE).st_mtime_ns
+    _cache["dirty"].clear()
+    _cache["pending"] = 0
+
+
+def flush():
+    """Persist pending usage counters (called on process exit)."""
     with _lock:
-        with open(KEYS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        if _cache["dirty"]:
+            _save_keys(_load_keys())
+
+
+atexit.register(flush)
+
+
+class RedisKeyCounters:
+    """Per-key request_count/last_used kept in Redis hashes.
+
+    Increments are atomic across workers and never rewrite KEYS_FILE.
+    """
+
+    def __init__(self, client, prefix: str = "apikey"):
+        self._client = client
+        self._prefix = prefix
+
+    def _key(self, key_hash: str) -> str:
+        return f"{self._prefix}:{key_hash}"
+
+    def increment(self, key_hash: str) -> dict:
+        now = time.time()
+        pipe = self._client.pipeline(transaction=True)  # MULTI/EXEC
+        pipe.hincrby(self._key(key_hash), "request_count", 1)
+        pipe.hset(self._key(key_hash), "last_used", now)
+        count, _ = pipe.execute()
+        return {"request_count": count, "last_used": now}
+
+    def get_many(self, key_hashes: list[str]) -> dict[str, dict]:
+        pipe = self._client.pipeline(transaction=False)
+        for h in key_hashes:
+            pipe.hgetall(self._key(h))
+        result = {}
+        for h, raw in zip(key_hashes, pipe.execute()):
+            if not raw:
+                continue
+            raw = {(k.decode() if isinstance(k, bytes) else k): v for k, v in raw.items()}
+            result[h] = {
+                "request_count": int(raw.get("request_count", 0)),
+                "last_used": float(raw.get("last_used", 0)),
+            }
+        return result
+
+    def delete(self, key_hash: str):
+        self._client.delete(self._key(key_hash))
+
+
+def _create_counters():
+    redis_url = os.environ.get("REDIS_URL", "").strip()
+    if redis_url and redis is not None:
+        return RedisKeyCounters(redis.Redis.from_url(redis_url))
+    return None
+
+
+# None -> counters live in KEYS_FILE (write-behind, see SAVE_INTERVAL)
+_counters = _create_counters()
+
+
+def _migrate_legacy_key(keys: dict, raw_key: str, digest: bytes) -> str | None:
+    """Re-key an entry stored under the old SHA256 hash. Caller must hold ``_lock``."""
+    legacy_hash = _legacy_hash_key(raw_key)
+    meta = keys.pop(legacy_hash, None)
+    if meta is None:
+        return None
+    _index_remove(legacy_hash)
+    key_hash = digest.hex()
+    keys[key_hash] = meta
+    _index_add(key_hash)
+    _save_keys(keys)
+    return key_hash
 
 
 def generate_api_key(name: str = "default") -> dict:
     """Generate a new API key. Returns the raw key (shown once) and metadata."""
     raw_key = f"ssh_{secrets.token_hex(24)}"
-    key_hash = _hash_key(raw_key)
+    key_hash = _hash_key(raw_key).hex()
 
-    keys = _load_keys()
-    keys[key_hash] = {
-        "name": name,
-        "created_at": time.time(),
-        "last_used": 0,
-        "request_count": 0,
-    }
-    _save_keys(keys)
+    with _lock:
+        keys = _load_keys()
+        keys[key_hash] = {
+            "name": name,
+            "created_at": time.time(),
+            "last_used": 0,
+            "request_count": 0,
+        }
+        _index_add(key_hash)
+        _save_keys(keys)
 
     return {
         "key": raw_key,
@@ -61,40 +247,64 @@ def generate_api_key(name: str = "default") -> dict:
 
 def validate_key(raw_key: str) -> dict | None:
     """Validate an API key. Returns key metadata or None."""
-    key_hash = _hash_key(raw_key)
-    keys = _load_keys()
-    meta = keys.get(key_hash)
-    if meta:
-        meta["last_used"] = time.time()
-        meta["request_count"] = meta.get("request_count", 0) + 1
-        keys[key_hash] = meta
-        _save_keys(keys)
-        return {"hash": key_hash, **meta}
-    return None
+    digest = _hash_key(raw_key)
+    with _lock:
+        keys = _load_keys()
+        key_hash = _lookup(digest)
+        if key_hash is None:
+            key_hash = _migrate_legacy_key(keys, raw_key, digest)
+            if key_hash is None:
+                return None
+        meta = keys[key_hash]
+        if _counters is not None:
+            meta = dict(meta)
+        else:
+            meta["last_used"] = time.time()
+            meta["request_count"] = meta.get("request_count", 0) + 1
+            _cache["dirty"].add(key_hash)
+            _cache["pending"] += 1
+            if _cache["pending"] >= SAVE_INTERVAL:
+                _save_keys(keys)
+            return {"hash": key_hash, **meta}
+
+    meta.update(_counters.increment(key_hash))
+    return {"hash": key_hash, **meta}
 
 
 def revoke_key(key_hash: str) -> bool:
     """Revoke an API key by its hash."""
-    keys = _load_keys()
-    if key_hash in keys:
+    with _lock:
+        keys = _load_keys()
+        if key_hash not in keys:
+            return False
         del keys[key_hash]
+        _index_remove(key_hash)
+        _cache["dirty"].discard(key_hash)
+        # Written through immediately: other workers only see revocations via the file
         _save_keys(keys)
-        return True
-    return False
+    if _counters is not None:
+        _counters.delete(key_hash)
+    return True
 
 
 def list_keys() -> list[dict]:
     """List all API keys (hashes only, not raw keys)."""
-    keys = _load_keys()
     result = []
-    for h, meta in keys.items():
-        result.append({
-            "key_hash": h[:12] + "...",
-            "name": meta.get("name", "unknown"),
-            "created_at": meta.get("created_at", 0),
-            "last_used": meta.get("last_used", 0),
-            "request_count": meta.get("request_count", 0),
-        })
+    hashes = []
+    with _lock:
+        for h, meta in _load_keys().items():
+            hashes.append(h)
+            result.append({
+                "key_hash": h[:12] + "...",
+                "name": meta.get("name", "unknown"),
+                "created_at": meta.get("created_at", 0),
+                "last_used": meta.get("last_used", 0),
+                "request_count": meta.get("request_count", 0),
+            })
+    if _counters is not None:
+        usage = _counters.get_many(hashes)
+        for h, item in zip(hashes, result):
+            item.update(usage.get(h, {}))
     return result
 
 
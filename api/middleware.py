@@ -1,66 +1,154 @@
 """Rate limiter and audit logging middleware for v2 API.
 
-Sliding window rate limiting by API key:
-- RPM (requests per minute)
-- Tokens per hour
+Bucketed sliding window rate limiting by API key:
+- RPM (requests per minute, 60 x 1s buckets)
+- Tokens per hour (60 x 1min buckets)
+
+When REDIS_URL is set (and redis-py is installed) limits are kept in Redis
+sorted sets instead, so they are shared across workers and survive
+serverless cold starts.
 """
 
+import os
 import time
 import threading
-from collections import defaultdict
+import uuid
+from array import array
+from collections import namedtuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 from services.audit_log import audit_logger
 
 
+RING_SIZE = 60  # buckets per window
+REQ_BUCKET_SECONDS = 1  # 60 x 1s = RPM window
+TOK_BUCKET_SECONDS = 60  # 60 x 1min = tokens/hour window
+
+# Result of a combined check: rpm/tokens are True when that limit allows the request
+RateCheck = namedtuple("RateCheck", ["rpm", "tokens"])
+
+
+def _expire_buckets(ring: array, last: int, total: int, current: int) -> int:
+    """Zero buckets (last, current] of ring and return the updated running total."""
+    if current - last >= RING_SIZE:
+        for i in range(RING_SIZE):
+            ring[i] = 0
+        return 0
+    for b in range(last + 1, current + 1):
+        i = b % RING_SIZE
+        total -= ring[i]
+        ring[i] = 0
+    return total
+
+
+class KeyWindow:
+    """Per-key limiter state: a request ring and a token ring with running totals.
+
+    Memory and work per key are O(RING_SIZE), independent of request rate.
+    *_last is the most recent bucket number the ring was advanced to.
+    """
+
+    __slots__ = ("req_ring", "req_total", "req_last", "tok_ring", "tok_total", "tok_last")
+
+    def __init__(self):
+        self.req_ring = array("I", [0]) * RING_SIZE
+        self.req_total = 0
+        self.req_last = 0
+        self.tok_ring = array("I", [0]) * RING_SIZE
+        self.tok_total = 0
+        self.tok_last = 0
+
+    def advance_requests(self, now: float):
+        current = int(now) // REQ_BUCKET_SECONDS
+        if current > self.req_last:
+            self.req_total = _expire_buckets(self.req_ring, self.req_last, self.req_total, current)
+            self.req_last = current
+
+    def advance_tokens(self, now: float):
+        current = int(now) // TOK_BUCKET_SECONDS
+        if current > self.tok_last:
+            self.tok_total = _expire_buckets(self.tok_ring, self.tok_last, self.tok_total, current)
+            self.tok_last = current
+
+
 class RateLimiter:
-    """Sliding window rate limiter."""
+    """Bucketed sliding window rate limiter."""
 
     def __init__(self, rpm: int = 60, tokens_per_hour: int = 1_000_000):
         self.rpm = rpm
         self.tokens_per_hour = tokens_per_hour
-        self._request_windows: dict[str, list[float]] = defaultdict(list)
-        self._token_windows: dict[str, list[tuple[float, int]]] = defaultdict(list)
+        self._keys: dict[str, KeyWindow] = {}
         self._lock = threading.Lock()
 
-    def _clean_window(self, window: list, cutoff: float):
-        """Remove entries older than cutoff."""
-        while window and (window[0] if isinstance(window[0], (int, float)) else window[0][0]) < cutoff:
-            window.pop(0)
+    def _window(self, key_hash: str) -> KeyWindow:
+        w = self._keys.get(key_hash)
+        if w is None:
+            w = self._keys[key_hash] = KeyWindow()
+        return w
 
     def check_rpm(self, key_hash: str) -> bool:
         """Check if request is within RPM limit. Returns True if allowed."""
         now = time.time()
         with self._lock:
-            window = self._request_windows[key_hash]
-            self._clean_window(window, now - 60)
-            if len(window) >= self.rpm:
+            w = self._window(key_hash)
+            w.advance_requests(now)
+            if w.req_total >= self.rpm:
                 return False
-            window.append(now)
+            w.req_ring[w.req_last % RING_SIZE] += 1
+            w.req_total += 1
             return True
 
     def check_tokens(self, key_hash: str, tokens: int) -> bool:
         """Check if token usage is within hourly limit. Returns True if allowed."""
         now = time.time()
         with self._lock:
-            window = self._token_windows[key_hash]
-            # Remove entries older than 1 hour
-            while window and window[0][0] < now - 3600:
-                window.pop(0)
-            total = sum(t for _, t in window)
-            if total + tokens > self.tokens_per_hour:
+            w = self._window(key_hash)
+            w.advance_tokens(now)
+            if w.tok_total + tokens > self.tokens_per_hour:
                 return False
-            window.append((now, tokens))
+            w.tok_ring[w.tok_last % RING_SIZE] += tokens
+            w.tok_total += tokens
             return True
 
+    def check(self, key_hash: str, tokens: int) -> RateCheck:
+        """check_rpm + check_tokens under one lock acquisition.
+
+        Tokens are only counted once the request passed the RPM limit, and a
+        request rejected for tokens still uses its RPM slot (as with the two
+        separate calls).
+        """
+        now = time.time()
+        with self._lock:
+            w = self._window(key_hash)
+            w.advance_requests(now)
+            if w.req_total >= self.rpm:
+                return RateCheck(False, True)
+            w.req_ring[w.req_last % RING_SIZE] += 1
+            w.req_total += 1
+
+            w.advance_tokens(now)
+            if w.tok_total + tokens > self.tokens_per_hour:
+                return RateCheck(True, False)
+            w.tok_ring[w.tok_last % RING_SIZE] += tokens
+            w.tok_total += tokens
+            return RateCheck(True, True)
+
     def get_usage(self, key_hash: str) -> dict:
         """Get current usage stats for a key."""
         now = time.time()
         with self._lock:
-            req_window = self._request_windows.get(key_hash, [])
-            tok_window = self._token_windows.get(key_hash, [])
-
-            recent_requests = sum(1 for t in req_window if t > now - 60)
-            recent_tokens = sum(t for ts, t in tok_window if ts > now - 3600)
+            recent_requests = 0
+            recent_tokens = 0
+            w = self._keys.get(key_hash)
+            if w is not None:
+                w.advance_requests(now)
+                w.advance_tokens(now)
+                recent_requests = w.req_total
+                recent_tokens = w.tok_total
 
             return {
                 "rpm_used": recent_requests,
@@ -70,6 +158,116 @@ class RateLimiter:
             }
 
 
+# KEYS[1]=window key; ARGV: now_ms, rpm, member
+_RPM_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - 60000)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[3])
+redis.call('PEXPIRE', KEYS[1], 60000)
+return 1
+"""
+
+# KEYS[1]=window key; ARGV: now_ms, tokens, limit, member. Members are "<id>:<tokens>".
+_TOKENS_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - 3600000)
+local total = 0
+for _, m in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    total = total + tonumber(string.match(m, ':(%d+)$'))
+end
+if total + tonumber(ARGV[2]) > tonumber(ARGV[3]) then return 0 end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4] .. ':' .. ARGV[2])
+redis.call('PEXPIRE', KEYS[1], 3600000)
+return 1
+"""
+
+# Both scripts above in one call. KEYS[1]=rpm key, KEYS[2]=tokens key;
+# ARGV: now_ms, rpm, tokens, limit, member. Returns {rpm_ok, tokens_ok}.
+_CHECK_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - 60000)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then return {0, 1} end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[5])
+redis.call('PEXPIRE', KEYS[1], 60000)
+redis.call('ZREMRANGEBYSCORE', KEYS[2], 0, tonumber(ARGV[1]) - 3600000)
+local total = 0
+for _, m in ipairs(redis.call('ZRANGE', KEYS[2], 0, -1)) do
+    total = total + tonumber(string.match(m, ':(%d+)$'))
+end
+if total + tonumber(ARGV[3]) > tonumber(ARGV[4]) then return {1, 0} end
+redis.call('ZADD', KEYS[2], ARGV[1], ARGV[5] .. ':' .. ARGV[3])
+redis.call('PEXPIRE', KEYS[2], 3600000)
+return {1, 1}
+"""
+
+
+class RedisRateLimiter:
+    """Sliding window rate limiter backed by Redis sorted sets.
+
+    Same interface as RateLimiter. Each check is a single Lua script
+    (cleanup + count + insert), so it is atomic across processes.
+    """
+
+    def __init__(self, client, rpm: int = 60, tokens_per_hour: int = 1_000_000,
+                 prefix: str = "ratelimit"):
+        self.rpm = rpm
+        self.tokens_per_hour = tokens_per_hour
+        self._client = client
+        self._prefix = prefix
+        # register_script uses EVALSHA and reloads the script on NOSCRIPT
+        self._rpm_script = client.register_script(_RPM_SCRIPT)
+        self._tokens_script = client.register_script(_TOKENS_SCRIPT)
+        self._check_script = client.register_script(_CHECK_SCRIPT)
+
+    def _key(self, kind: str, key_hash: str) -> str:
+        return f"{self._prefix}:{kind}:{key_hash}"
+
+    def check_rpm(self, key_hash: str) -> bool:
+        """Check if request is within RPM limit. Returns True if allowed."""
+        now_ms = int(time.time() * 1000)
+        allowed = self._rpm_script(
+            keys=[self._key("rpm", key_hash)],
+            args=[now_ms, self.rpm, uuid.uuid4().hex],
+        )
+        return bool(allowed)
+
+    def check_tokens(self, key_hash: str, tokens: int) -> bool:
+        """Check if token usage is within hourly limit. Returns True if allowed."""
+        now_ms = int(time.time() * 1000)
+        allowed = self._tokens_script(
+            keys=[self._key("tokens", key_hash)],
+            args=[now_ms, int(tokens), self.tokens_per_hour, uuid.uuid4().hex],
+        )
+        return bool(allowed)
+
+    def check(self, key_hash: str, tokens: int) -> RateCheck:
+        """check_rpm + check_tokens in one script call (one round trip)."""
+        now_ms = int(time.time() * 1000)
+        rpm_ok, tokens_ok = self._check_script(
+            keys=[self._key("rpm", key_hash), self._key("tokens", key_hash)],
+            args=[now_ms, self.rpm, int(tokens), self.tokens_per_hour, uuid.uuid4().hex],
+        )
+        return RateCheck(bool(rpm_ok), bool(tokens_ok))
+
+    def get_usage(self, key_hash: str) -> dict:
+        """Get current usage stats for a key."""
+        now_ms = int(time.time() * 1000)
+        pipe = self._client.pipeline()
+        pipe.zcount(self._key("rpm", key_hash), now_ms - 60000, "+inf")
+        pipe.zrangebyscore(self._key("tokens", key_hash), now_ms - 3600000, "+inf")
+        recent_requests, token_members = pipe.execute()
+        recent_tokens = 0
+        for m in token_members:
+            if isinstance(m, bytes):
+                m = m.decode()
+            recent_tokens += int(m.rsplit(":", 1)[1])
+
+        return {
+            "rpm_used": recent_requests,
+            "rpm_limit": self.rpm,
+            "tokens_hour_used": recent_tokens,
+            "tokens_hour_limit": self.tokens_per_hour,
+        }
+
+
 def log_request(key_hash: str, endpoint: str, method: str,
                 tokens: int = 0, latency_ms: float = 0.0,
                 status_code: int = 200):
@@ -84,5 +282,12 @@ def log_request(key_hash: str, endpoint: str, method: str,
     )
 
 
+def _create_rate_limiter():
+    redis_url = os.environ.get("REDIS_URL", "").strip()
+    if redis_url and redis is not None:
+        return RedisRateLimiter(redis.Redis.from_url(redis_url))
+    return RateLimiter()
+
+
 # Singleton
-rate_limiter = RateLimiter()
+rate_limiter = _create_rate_limiter()
@@ -4,7 +4,7 @@ All existing endpoints preserved with identical behavior.
 No authentication required (backward compatible).
 """
 
-import io
+import functools
 import json
 import os
 import re
@@ -12,10 +12,15 @@ import ssl
 import sys
 import subprocess
 import threading
-from contextlib import redirect_stdout
+import time
 from dataclasses import asdict
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Fix SSL certificate verification for Python 3.14+ on macOS
 try:
@@ -66,11 +71,18 @@ except (ImportError, ModuleNotFoundError):
     def git_status_summary(cwd):
         return "unavailable (serverless)"
 
+    _TICKET_RE = re.compile(r"\bTicket ([A-Z])\b", re.ASCII)
+
     def detect_ticket_ids(text):
-        return re.findall(r"\bTicket ([A-Z])\b", text)
+        return _TICKET_RE.findall(text)
+
+    _KOREAN_RE = re.compile(r"[\uac00-\ud7a3]")
 
     def _contains_korean(text):
-        return bool(re.search(r"[\uac00-\ud7a3]", text))
+        # isascii() is a C-level scan that rejects plain-English output cheaply
+        if text.isascii():
+            return False
+        return _KOREAN_RE.search(text) is not None
 
     def translate_non_code_to_english(text):
         return text
@@ -108,8 +120,8 @@ except (ImportError, ModuleNotFoundError):
 try:
     from llm_router import (
         route_text as _llm_route_text,
-        print_friendly as _print_friendly,
-        print_human as _print_human,
+        render_friendly as _render_friendly,
+        render_human as _render_human,
         filter_one_task as _filter_one_task,
         render_tickets_md as _render_tickets_md,
     )
@@ -118,62 +130,210 @@ except ImportError:
     _HAS_LLM_ROUTER = False
 
 from config import (
-    IS_VERCEL, BASE_DIR, HISTORY_FILE, PROMPTS_FILE, FEEDBACK_FILE,
-    ROUTE_COST_PER_1K, ROUTE_TOKENS_PER_TASK,
-    DEFAULT_COST_PER_1K, DEFAULT_TOKENS_PER_TASK,
+    IS_VERCEL, BASE_DIR, HISTORY_FILE, HISTORY_LEGACY_FILE, PROMPTS_FILE, FEEDBACK_FILE,
+    ROUTE_TOKENS_PER_TASK, ROUTE_COST_PER_TASK,
+    DEFAULT_TOKENS_PER_TASK, DEFAULT_COST_PER_TASK,
 )
 
 v1_bp = Blueprint("v1", __name__)
 
+ROUTER_CACHE_TTL = 30  # seconds; router scripts only change on deploy
+
+
+@functools.lru_cache(maxsize=1)
+def _router_candidates_for(_ttl_bucket):
+    return tuple(find_router_candidates())
+
+
+def _router_candidates():
+    """find_router_candidates() memoized for ROUTER_CACHE_TTL seconds."""
+    return list(_router_candidates_for(int(time.time()) // ROUTER_CACHE_TTL))
+
+
+@functools.lru_cache(maxsize=256)
+def _ticket_ids_for(text):
+    return tuple(detect_ticket_ids(text))
+
+
+def _detect_ticket_ids(text):
+    """detect_ticket_ids() memoized on the output text."""
+    return list(_ticket_ids_for(text))
+
 _file_lock = threading.Lock()
 
+# path -> ((st_mtime_ns, st_size), parsed data). Parsed data is shared between
+# requests; callers that mutate it must write it back via _write_json_file.
+_json_cache: dict[str, tuple[tuple[int, int], object]] = {}
+
 
 def _read_json_file(path, default=None):
     if default is None:
         default = {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        st = os.stat(path)
+    except OSError:
+        return default
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _json_cache.get(path)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except (FileNotFoundError, json.JSONDecodeError):
         return default
+    _json_cache[path] = (stamp, data)
+    return data
+
+
+def _dump_json_bytes(data, pretty=False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if pretty else None).encode("utf-8")
+
+
+def _write_json_file(path, data, pretty=False):
+    """Serialize outside the lock, then atomically replace path (temp file + rename).
+
+    Only human-edited files (prompts) are written indented.
+    """
+    buf = _dump_json_bytes(data, pretty)
+    tmp_file = path + ".tmp"
+    with _file_lock:
+        with open(tmp_file, "wb") as f:
+            f.write(buf)
+        os.replace(tmp_file, path)
+        _json_cache.pop(path, None)
 
 
-def _write_json_file(path, data):
+def _read_history():
+    """History entries: the JSONL log, or the legacy JSON array until it is migrated."""
+    try:
+        st = os.stat(HISTORY_FILE)
+    except OSError:
+        data = _read_json_file(HISTORY_LEGACY_FILE, [])
+        if isinstance(data, dict):
+            data = data.get("entries", data.get("history", []))
+        return data if isinstance(data, list) else []
+    stamp = (st.st_mtime_ns, st.st_size)
+    entry = _json_cache.get(HISTORY_FILE)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    loads = orjson.loads if orjson is not None else json.loads
+    entries = []
+    try:
+        with open(HISTORY_FILE, "rb") as f:
+            for line in f:
+                try:
+                    entries.append(loads(line))
+                except ValueError:
+                    continue  # blank or torn line
+    except FileNotFoundError:
+        return []
+    _json_cache[HISTORY_FILE] = (stamp, entries)
+    return entries
+
+
+def _write_history(entries):
+    """Atomically rewrite the JSONL history (used by the delete endpoints)."""
+    buf = b"".join(_dump_json_bytes(e) + b"\n" for e in entries)
+    tmp_file = HISTORY_FILE + ".tmp"
     with _file_lock:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(tmp_file, "wb") as f:
+            f.write(buf)
+        os.replace(tmp_file, HISTORY_FILE)
+        _json_cache.pop(HISTORY_FILE, None)
+
+
+def _history_etag():
+    return _file_etag(HISTORY_FILE) or _file_etag(HISTORY_LEGACY_FILE)
+
+
+def _file_etag(path):
+    """Weak ETag value from the file's mtime and size, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def _not_modified(etag):
+    """Return a 304 response if the client already holds this version, else None."""
+    if etag and request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag, weak=True)
+        return resp
+    return None
+
+
+def _with_etag(resp, etag):
+    if etag:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+_NUMBERED_LINE_RE = re.compile(r"\[(\d+)\]\s*(.+)")
+
+
+def _parse_translated_lines(result):
+    """Yield (line_index, english) pairs from a {"lines": [{"i", "en"}]} reply.
+
+    Tolerates prose around the JSON object and falls back to "[i] text" lines.
+    """
+    start = result.find("{")
+    end = result.rfind("}")
+    obj = None
+    if 0 <= start < end:
+        raw = result[start:end + 1]
+        try:
+            obj = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except ValueError:
+            obj = None
+    if isinstance(obj, dict) and isinstance(obj.get("lines"), list):
+        for item in obj["lines"]:
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get("i"))
+            except (TypeError, ValueError):
+                continue
+            yield idx, str(item.get("en") or "").strip().replace("\n", " ")
+        return
+    for match in _NUMBERED_LINE_RE.finditer(result):
+        yield int(match.group(1)), match.group(2).strip()
 
 
 def _translate_remaining_korean(text, api_key):
-    if not _contains_korean(text):
+    """Translate every remaining Korean line in a single Groq request."""
+    # One C-level pass rejects all-English blocks before any per-line work
+    if text.isascii():
         return text
     lines = text.splitlines()
-    kr_indices = []
-    kr_lines = []
-    for i, line in enumerate(lines):
-        if _contains_korean(line):
-            kr_indices.append(i)
-            kr_lines.append(line)
-    if not kr_lines:
+    kr_items = [{"i": i, "kr": line} for i, line in enumerate(lines) if _contains_korean(line)]
+    if not kr_items:
         return text
-    numbered = "\n".join(f"[{i}] {line}" for i, line in zip(kr_indices, kr_lines))
     system = (
-        "Translate each Korean line to English. "
-        "Each line starts with a bracket number like [0], [1], [2]. "
-        "Keep that exact bracket number prefix unchanged. "
+        "Translate the Korean in each line to English. "
         "Keep file paths, code, markers, ## headers, and bullet format intact. "
-        "Only translate Korean words to English."
+        "Only translate Korean words to English. "
+        'Return only JSON: {"lines":[{"i":0,"en":"..."}]} using the same i values.'
     )
     try:
         result = _groq_chat(
-            [{"role": "system", "content": system}, {"role": "user", "content": numbered}],
+            [
+                {"role": "system", "content": system},
+                {"role": "user", "content": json.dumps({"lines": kr_items}, ensure_ascii=False)},
+            ],
             api_key=api_key, max_tokens=1000, temperature=0.0,
         )
     except Exception:
         return text
-    for match in re.finditer(r"\[(\d+)\]\s*(.+)", result):
-        idx = int(match.group(1))
-        translated = match.group(2).strip()
+    for idx, translated in _parse_translated_lines(result):
         if 0 <= idx < len(lines) and translated:
             lines[idx] = translated
     return "\n".join(lines)
@@ -183,7 +343,7 @@ def _translate_remaining_korean(text, api_key):
 
 @v1_bp.route("/api/routers", methods=["GET"])
 def api_routers():
-    candidates = find_router_candidates()
+    candidates = _router_candidates()
     items = []
     for p in candidates:
         items.append({
@@ -203,51 +363,53 @@ def api_preflight():
 
 @v1_bp.route("/api/history", methods=["GET"])
 def api_history_get():
-    data = _read_json_file(HISTORY_FILE, [])
-    if isinstance(data, list):
-        entries = data
-    elif isinstance(data, dict):
-        entries = data.get("entries", data.get("history", []))
-    else:
-        entries = []
-    return jsonify({"entries": entries})
+    etag = _history_etag()
+    cached = _not_modified(etag)
+    if cached:
+        return cached
+    return _with_etag(jsonify({"entries": _read_history()}), etag)
 
 
 @v1_bp.route("/api/history", methods=["DELETE"])
 def api_history_delete_all():
-    _write_json_file(HISTORY_FILE, [])
+    _write_history([])
     return jsonify({"success": True, "deleted": "all"})
 
 
 @v1_bp.route("/api/history/<int:idx>", methods=["DELETE"])
 def api_history_delete_one(idx):
-    data = _read_json_file(HISTORY_FILE, [])
-    entries = data if isinstance(data, list) else data.get("entries", data.get("history", []))
+    entries = _read_history()
 
     if idx < 0 or idx >= len(entries):
         return jsonify({"error": "Index out of range"}), 404
 
-    entries.pop(idx)
-    _write_json_file(HISTORY_FILE, entries)
+    entries = entries[:idx] + entries[idx + 1:]  # cached list is shared; don't mutate
+    _write_history(entries)
     return jsonify({"success": True, "deleted_index": idx})
 
 
 @v1_bp.route("/api/cost-stats", methods=["GET"])
 def api_cost_stats():
-    data = _read_json_file(HISTORY_FILE, [])
-    entries = data if isinstance(data, list) else data.get("entries", [])
+    entries = _read_history()
 
     total_tokens = 0
     total_cost = 0.0
     route_counts = {"claude": 0, "cheap_llm": 0, "split": 0}
 
+    # Hoist lookups out of the per-task loop
+    tokens_per_task = ROUTE_TOKENS_PER_TASK.get
+    cost_per_task = ROUTE_COST_PER_TASK.get
+    default_tokens = DEFAULT_TOKENS_PER_TASK
+    default_cost = DEFAULT_COST_PER_TASK
+
     for entry in entries:
-        tasks = entry.get("tasks", [{"route": entry.get("route", "claude")}])
+        tasks = entry.get("tasks")
+        if tasks is None:
+            tasks = ({"route": entry.get("route", "claude")},)
         for t in tasks:
             r = t.get("route", "claude")
-            tk = ROUTE_TOKENS_PER_TASK.get(r, DEFAULT_TOKENS_PER_TASK)
-            total_tokens += tk
-            total_cost += (tk / 1000) * ROUTE_COST_PER_1K.get(r, DEFAULT_COST_PER_1K)
+            total_tokens += tokens_per_task(r, default_tokens)
+            total_cost += cost_per_task(r, default_cost)
             if r in route_counts:
                 route_counts[r] += 1
 
@@ -261,14 +423,22 @@ def api_cost_stats():
 
 @v1_bp.route("/api/prompts", methods=["GET"])
 def api_prompts_get():
+    etag = _file_etag(PROMPTS_FILE)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
     data = _read_json_file(PROMPTS_FILE, {"prompts": []})
-    return jsonify(data)
+    return _with_etag(jsonify(data), etag)
 
 
 @v1_bp.route("/api/feedback", methods=["GET"])
 def api_feedback_get():
+    etag = _file_etag(FEEDBACK_FILE)
+    cached = _not_modified(etag)
+    if cached:
+        return cached
     data = _read_json_file(FEEDBACK_FILE, {"feedback": {}})
-    return jsonify(data)
+    return _with_etag(jsonify(data), etag)
 
 
 # ---------- POST endpoints ----------
@@ -326,25 +496,21 @@ def api_route():
             if one_task:
                 router_out = _filter_one_task(router_out, one_task)
 
-            # Capture printed output
-            buf = io.StringIO()
-            with redirect_stdout(buf):
-                if tickets_md:
-                    print(_render_tickets_md(router_out, economy=economy, phase=phase))
-                elif friendly:
-                    _print_friendly(router_out, desktop_edit=desktop_edit,
-                                    economy=economy, phase=phase, opus_only=opus_only)
-                else:
-                    _print_human(router_out, desktop_edit=desktop_edit,
-                                 economy=economy, phase=phase, opus_only=opus_only)
-
-            combined = buf.getvalue().strip()
+            if tickets_md:
+                combined = _render_tickets_md(router_out, economy=economy, phase=phase)
+            elif friendly:
+                combined = _render_friendly(router_out, desktop_edit=desktop_edit,
+                                            economy=economy, phase=phase, opus_only=opus_only)
+            else:
+                combined = _render_human(router_out, desktop_edit=desktop_edit,
+                                         economy=economy, phase=phase, opus_only=opus_only)
+            combined = combined.strip()
         except Exception as e:
             return jsonify({"error": str(e), "output": "", "tickets": []})
     else:
         # Fallback: subprocess (local only, not Vercel-compatible)
         router = body.get("router", "").strip()
-        candidates = find_router_candidates()
+        candidates = _router_candidates()
         candidate_paths = [os.path.abspath(c) for c in candidates]
         if not router or os.path.abspath(router) not in candidate_paths:
             return jsonify({"error": "Router not allowed", "output": "", "tickets": []}), 400
@@ -369,23 +535,31 @@ def api_route():
             cmd.extend(["--min-tickets", str(min_tickets_n)])
         if merge:
             cmd.extend(["--merge", merge])
-        cmd.append(request_text)
+        # "-" makes the router read the request from stdin (no ARG_MAX/quoting limits)
+        cmd.append("-")
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd(), timeout=120)
+            # Bytes in/out with one explicit UTF-8 decode; the child is told to use UTF-8
+            result = subprocess.run(cmd, input=request_text.encode("utf-8"), capture_output=True,
+                                    cwd=os.getcwd(), timeout=120,
+                                    env={**os.environ, "PYTHONUTF8": "1", "PYTHONDONTWRITEBYTECODE": "1"})
         except subprocess.TimeoutExpired:
             return jsonify({"error": "Router timed out (120s)", "output": "", "tickets": []})
         except Exception as e:
             return jsonify({"error": str(e), "output": "", "tickets": []})
 
-        out = (result.stdout or "").strip()
-        err = (result.stderr or "").strip()
+        out = result.stdout.decode("utf-8", "replace").strip()
+        err = result.stderr.decode("utf-8", "replace").strip()
         combined = out
         if err:
             combined += "\n\n--- STDERR ---\n" + err
 
     translate_status = ""
-    if body.get("translate_en", False):
+    translate_en = body.get("translate_en", False)
+    if translate_en and combined.isascii():
+        # Nothing to translate: skip the dictionary pass and segment scan
+        translate_status = "ok"
+    elif translate_en:
         combined = translate_non_code_to_english(combined)
         api_key = os.environ.get("GROQ_API_KEY", "").strip()
         if api_key:
@@ -397,7 +571,7 @@ def api_route():
         else:
             translate_status = "no_api_key"
 
-    tickets = detect_ticket_ids(combined)
+    tickets = _detect_ticket_ids(combined)
 
     resp = {
         "output": combined,
@@ -465,7 +639,7 @@ def api_extract_block():
 def api_prompts_save():
     body = request.get_json(silent=True) or {}
     prompts = body.get("prompts", [])
-    _write_json_file(PROMPTS_FILE, {"prompts": prompts})
+    _write_json_file(PROMPTS_FILE, {"prompts": prompts}, pretty=True)
     return jsonify({"success": True, "count": len(prompts)})
 
 
@@ -4,16 +4,25 @@ Authenticated endpoints with rate limiting, token budget management,
 priority queue routing, analytics, and SSE real-time updates.
 """
 
+import asyncio
+import functools
 import json
+import logging
 import os
 import sys
 import subprocess
 import time
 import threading
-import queue as stdlib_queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 from flask import Blueprint, request, jsonify, Response, stream_with_context
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from api.auth import require_api_key, generate_api_key, list_keys, revoke_key
 from api.middleware import rate_limiter, log_request
 from services.token_budget import budget_manager, count_tokens
@@ -21,37 +30,175 @@ from services.model_registry import model_registry
 from services.queue_manager import queue_manager
 from services.analytics import get_dashboard_data
 from services.audit_log import audit_logger
+from services.usage_log import usage_log
 
 v2_bp = Blueprint("v2", __name__, url_prefix="/api/v2")
+_log = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, BASE_DIR)
 from router_gui import find_router_candidates
 
-# SSE subscribers
-_sse_subscribers: list[stdlib_queue.Queue] = []
-_sse_lock = threading.Lock()
+# Import llm_router for in-process routing (no interpreter spawn per request)
+try:
+    from llm_router import route_text as _llm_route_text, render_human as _render_human
+    _HAS_LLM_ROUTER = True
+except ImportError:
+    _HAS_LLM_ROUTER = False
+
+ROUTER_TIMEOUT = 120  # seconds
+ROUTER_CACHE_TTL = 60  # seconds between router script re-scans
+# Runs in-process routing so route_task can enforce ROUTER_TIMEOUT. A timed-out
+# call keeps its worker, so llm_router bounds its own Groq I/O (connect and
+# read timeouts plus GROQ_STREAM_DEADLINE) well below ROUTER_TIMEOUT.
+_router_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="v2-router")
+
+SSE_BUFFER = 50  # events a slow client may fall behind before it is dropped
+
+# SSE subscribers, sharded so broadcasts and connects/disconnects on
+# different shards never wait on the same lock. Entries provide
+# push(msg) -> bool; False means the client fell behind and is dropped.
+SSE_SHARDS = (os.cpu_count() or 1) * 4
+_sse_shards: list[tuple[threading.Lock, dict]] = [
+    (threading.Lock(), {}) for _ in range(SSE_SHARDS)
+]
+# Total subscribers; read without a lock so broadcasts can bail out early
+_sse_count = 0
+_sse_count_lock = threading.Lock()
+
+
+class SseChannel:
+    """Single-producer/single-consumer event buffer for one stream client.
+
+    deque append/popleft are atomic, so push() takes no lock; the Event
+    wakes the client's generator.
+    """
+
+    __slots__ = ("buf", "ev")
+
+    def __init__(self):
+        self.buf: deque = deque(maxlen=SSE_BUFFER)
+        self.ev = threading.Event()
+
+    def push(self, msg: bytes) -> bool:
+        if len(self.buf) >= SSE_BUFFER:
+            return False
+        self.buf.append(msg)
+        self.ev.set()
+        return True
+
+
+def _sse_shard(sub) -> tuple[threading.Lock, dict]:
+    # hash() rather than id(): it drops the always-zero alignment bits
+    return _sse_shards[hash(sub) % SSE_SHARDS]
+
+
+def _sse_count_add(delta: int):
+    global _sse_count
+    with _sse_count_lock:
+        _sse_count += delta
+
+
+def _sse_subscribe(sub):
+    lock, subscribers = _sse_shard(sub)
+    with lock:
+        subscribers[id(sub)] = sub
+    _sse_count_add(1)
+
+
+def _sse_unsubscribe(sub):
+    lock, subscribers = _sse_shard(sub)
+    with lock:
+        removed = subscribers.pop(id(sub), None)
+    if removed is not None:
+        _sse_count_add(-1)
+
+
+def _json_response(obj, status: int = 200) -> Response:
+    """jsonify() replacement that encodes with orjson when available."""
+    if orjson is None:
+        resp = jsonify(obj)
+        resp.status_code = status
+        return resp
+    return Response(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+                    status=status, mimetype="application/json")
+
+
+def _json_body() -> dict:
+    """Parsed JSON request body, or {} (like request.get_json(silent=True) or {})."""
+    if orjson is None:
+        return request.get_json(silent=True) or {}
+    if not request.is_json:
+        return {}
+    raw = request.get_data()
+    if not raw:
+        return {}
+    try:
+        body = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _sse_message(event: str, data: dict) -> bytes:
+    """Encode one SSE event; the same bytes object is shared by all subscribers."""
+    if orjson is not None:
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
 
 
 def _broadcast_sse(event: str, data: dict):
     """Send SSE event to all subscribers."""
-    msg = f"event: {event}\ndata: {json.dumps(data)}\n\n"
-    with _sse_lock:
-        dead = []
-        for q in _sse_subscribers:
-            try:
-                q.put_nowait(msg)
-            except stdlib_queue.Full:
-                dead.append(q)
-        for q in dead:
-            _sse_subscribers.remove(q)
+    if not _sse_count:
+        return
+    msg = _sse_message(event, data)
+    for lock, subscribers in _sse_shards:
+        with lock:
+            dead = [key for key, sub in subscribers.items() if not sub.push(msg)]
+            for key in dead:
+                del subscribers[key]
+        if dead:
+            _sse_count_add(-len(dead))
+
+
+_CWD = os.getcwd()  # the server never chdirs; saves a getcwd() per abspath
+
+
+def _abspath(path: str) -> str:
+    return os.path.normpath(os.path.join(_CWD, path))
+
+
+@functools.lru_cache(maxsize=1)
+def _router_candidates_for(_ttl_bucket):
+    candidates = tuple(find_router_candidates())
+    return candidates, frozenset(_abspath(c) for c in candidates)
+
+
+def _router_candidates() -> tuple[tuple[str, ...], frozenset[str]]:
+    """find_router_candidates() and their absolute paths, memoized for ROUTER_CACHE_TTL seconds."""
+    return _router_candidates_for(int(time.time()) // ROUTER_CACHE_TTL)
+
+
+def _route_in_process(request_text: str, economy: str) -> str:
+    """Route and render like `llm_router.py --economy <economy> <request>`."""
+    out = _llm_route_text(
+        request_text,
+        desktop_edit=False,
+        economy=economy,
+        phase="implement",
+        opus_only=False,
+        max_tickets=0,
+        merge_spec="",
+    )
+    return _render_human(out, desktop_edit=False, economy=economy,
+                         phase="implement", opus_only=False).strip()
 
 
 # ---------- Health ----------
 
 @v2_bp.route("/health", methods=["GET"])
 def health():
-    return jsonify({
+    return _json_response({
         "status": "ok",
         "version": "2.0",
         "timestamp": time.time(),
@@ -63,7 +210,7 @@ def health():
 
 @v2_bp.route("/models", methods=["GET"])
 def models():
-    return jsonify({"models": model_registry.list_all()})
+    return _json_response({"models": model_registry.list_all()})
 
 
 # ---------- SSE Stream ----------
@@ -76,27 +223,26 @@ def sse_stream():
     custom headers, so browser EventSource cannot attach Bearer tokens.
     Read-only metrics only; no sensitive data exposed.
     """
-    q = stdlib_queue.Queue(maxsize=50)
-    with _sse_lock:
-        _sse_subscribers.append(q)
+    channel = SseChannel()
+    _sse_subscribe(channel)
 
     def generate():
+        buf, ev = channel.buf, channel.ev
         try:
             # Send initial data
-            yield f"event: connected\ndata: {json.dumps({'status': 'connected'})}\n\n"
+            yield _sse_message("connected", {"status": "connected"})
             while True:
-                try:
-                    msg = q.get(timeout=30)
-                    yield msg
-                except stdlib_queue.Empty:
+                if not ev.wait(timeout=30):
                     # Heartbeat
-                    yield f"event: heartbeat\ndata: {json.dumps({'time': time.time()})}\n\n"
+                    yield _sse_message("heartbeat", {"time": time.time()})
+                    continue
+                ev.clear()
+                while buf:
+                    yield buf.popleft()
         except GeneratorExit:
             pass
         finally:
-            with _sse_lock:
-                if q in _sse_subscribers:
-                    _sse_subscribers.remove(q)
+            _sse_unsubscribe(channel)
 
     return Response(
         stream_with_context(generate()),
@@ -109,6 +255,79 @@ def sse_stream():
     )
 
 
+class _AsyncSubscriber:
+    """Registry entry for an ASGI stream; hands messages to its event loop.
+
+    Broadcasts run on request threads, so messages cross over with
+    call_soon_threadsafe. push() returns False when the client is too far
+    behind (or its loop is gone), like SseChannel.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_BUFFER)
+
+    def push(self, msg: bytes) -> bool:
+        if self.queue.full():
+            return False
+        try:
+            self._loop.call_soon_threadsafe(self._put, msg)
+        except RuntimeError:  # event loop closed
+            return False
+        return True
+
+    def _put(self, msg: bytes):
+        try:
+            self.queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            pass
+
+
+async def _wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def sse_stream_asgi(scope, receive, send, headers=()):
+    """Native ASGI version of sse_stream() (see create_asgi_app in app.py).
+
+    Idle clients wait on the event loop instead of pinning a server thread.
+    ``headers`` are extra (name, value) byte pairs added to the response.
+    """
+    sub = _AsyncSubscriber(asyncio.get_running_loop())
+    _sse_subscribe(sub)
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+                *headers,
+            ],
+        })
+        msg = _sse_message("connected", {"status": "connected"})
+        while True:
+            await send({"type": "http.response.body", "body": msg, "more_body": True})
+            get = asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait({get, disconnected}, timeout=30,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                get.cancel()
+                break
+            if get in done:
+                msg = get.result()
+            else:
+                get.cancel()
+                # Heartbeat
+                msg = _sse_message("heartbeat", {"time": time.time()})
+    finally:
+        disconnected.cancel()
+        _sse_unsubscribe(sub)
+
+
 # ---------- Authenticated Endpoints ----------
 
 @v2_bp.route("/route", methods=["POST"])
@@ -116,39 +335,38 @@ def sse_stream():
 def route_task():
     """Queue-enabled routing with budget check and token counting."""
     start = time.time()
-    body = request.get_json(silent=True) or {}
+    body = _json_body()
     key_meta = getattr(request, "api_key_meta", {})
     key_hash = key_meta.get("hash", "unknown")
 
-    # Rate limit check
-    if not rate_limiter.check_rpm(key_hash):
-        log_request(key_hash, "/api/v2/route", "POST", status_code=429)
-        return jsonify({"error": "Rate limit exceeded (RPM)"}), 429
-
     request_text = body.get("request", "").strip()
     if not request_text:
-        return jsonify({"error": "Empty request"}), 400
+        return _json_response({"error": "Empty request"}, 400)
 
     # Count input tokens
     input_tokens = count_tokens(request_text)
 
-    # Budget check
+    # Budget check (first, so a 402 is not charged against the rate limits)
     budget_name = body.get("budget", "")
     if budget_name:
         budget = budget_manager.get(budget_name)
         if budget and budget.remaining < input_tokens:
-            return jsonify({"error": f"Budget '{budget_name}' exhausted ({budget.remaining} tokens remaining)"}), 402
+            return _json_response({"error": f"Budget '{budget_name}' exhausted ({budget.remaining} tokens remaining)"}, 402)
 
-    # Token rate limit check
-    if not rate_limiter.check_tokens(key_hash, input_tokens):
+    # Rate limit check (RPM + hourly tokens in one call)
+    rl = rate_limiter.check(key_hash, input_tokens)
+    if not rl.rpm:
+        log_request(key_hash, "/api/v2/route", "POST", status_code=429)
+        return _json_response({"error": "Rate limit exceeded (RPM)"}, 429)
+    if not rl.tokens:
         log_request(key_hash, "/api/v2/route", "POST", tokens=input_tokens, status_code=429)
-        return jsonify({"error": "Token rate limit exceeded (hourly)"}), 429
+        return _json_response({"error": "Token rate limit exceeded (hourly)"}, 429)
 
     # Model selection
     model_id = body.get("model", "claude-sonnet")
     model = model_registry.get(model_id)
     if not model:
-        return jsonify({"error": f"Unknown model: {model_id}"}), 400
+        return _json_response({"error": f"Unknown model: {model_id}"}, 400)
 
     # Enqueue task
     priority = body.get("priority", 5)
@@ -157,44 +375,57 @@ def route_task():
         priority=priority,
     )
     if not queue_item:
-        return jsonify({"error": "Queue full, try again later"}), 503
+        return _json_response({"error": "Queue full, try again later"}, 503)
 
     # Process (dequeue and execute)
     item = queue_manager.dequeue()
     if not item:
-        return jsonify({"error": "Queue processing error"}), 500
+        return _json_response({"error": "Queue processing error"}, 500)
 
-    # Execute via subprocess (same as v1)
-    router = body.get("router", "").strip()
-    candidates = find_router_candidates()
-    candidate_paths = [os.path.abspath(c) for c in candidates]
-
-    if not router or os.path.abspath(router) not in candidate_paths:
-        # Use first available router
-        if candidates:
-            router = candidates[0]
-        else:
-            return jsonify({"error": "No router available"}), 500
+    economy = (body.get("economy") or "strict").strip().lower()
+    if economy not in ("strict", "balanced"):
+        economy = "strict"
 
-    cmd = [sys.executable, router]
-    economy = body.get("economy", "strict")
-    cmd.extend(["--economy", economy])
-    cmd.append(request_text)
+    router = body.get("router", "").strip()
+    if _HAS_LLM_ROUTER and not router:
+        # Direct call, same output as running the router script with --economy
+        future = _router_pool.submit(_route_in_process, request_text, economy)
+        try:
+            combined = future.result(timeout=ROUTER_TIMEOUT)
+        except FutureTimeout:
+            return _json_response({"error": "Router timed out (120s)"}, 504)
+        except Exception as e:
+            _log.error("Router execution failed: %s", e)
+            return _json_response({"error": "Router execution failed"}, 500)
+    else:
+        # Subprocess: a specific router was requested, or llm_router is unavailable
+        candidates, candidate_paths = _router_candidates()
+        if not router or _abspath(router) not in candidate_paths:
+            # Use first available router
+            if candidates:
+                router = candidates[0]
+            else:
+                return _json_response({"error": "No router available"}, 500)
+
+        # "-" makes the router read the request from stdin
+        cmd = [sys.executable, router, "--economy", economy, "-"]
 
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd(), timeout=120)
-    except subprocess.TimeoutExpired:
-        return jsonify({"error": "Router timed out (120s)"}), 504
-    except Exception as e:
-        import logging
-        logging.error(f"Router execution failed: {e}")
-        return jsonify({"error": "Router execution failed"}), 500
-
-    out = (result.stdout or "").strip()
-    err = (result.stderr or "").strip()
-    combined = out
-    if err:
-        combined += "\n\n--- STDERR ---\n" + err
+        try:
+            # Bytes in/out with one explicit UTF-8 decode; the child is told to use UTF-8
+            result = subprocess.run(cmd, input=request_text.encode("utf-8"), capture_output=True,
+                                    cwd=_CWD, timeout=ROUTER_TIMEOUT,
+                                    env={**os.environ, "PYTHONUTF8": "1", "PYTHONDONTWRITEBYTECODE": "1"})
+        except subprocess.TimeoutExpired:
+            return _json_response({"error": "Router timed out (120s)"}, 504)
+        except Exception as e:
+            _log.error("Router execution failed: %s", e)
+            return _json_response({"error": "Router execution failed"}, 500)
+
+        out = result.stdout.decode("utf-8", "replace").strip()
+        err = result.stderr.decode("utf-8", "replace").strip()
+        combined = out
+        if err:
+            combined += "\n\n--- STDERR ---\n" + err
 
     # Count output tokens
     output_tokens = count_tokens(combined)
@@ -205,22 +436,23 @@ def route_task():
     if budget_name:
         alert = budget_manager.consume(budget_name, total_tokens)
 
-    # Cost calculation
-    cost = model.cost_estimate(input_tokens, output_tokens)
+    # Cost calculation (rounded once for usage log, SSE and response)
+    cost = round(model.cost_estimate(input_tokens, output_tokens), 6)
 
     # Record token usage
     _record_usage(input_tokens, output_tokens, cost, model_id, key_hash)
 
     latency = (time.time() - start) * 1000
     log_request(key_hash, "/api/v2/route", "POST", tokens=total_tokens, latency_ms=latency)
+    latency = round(latency, 1)
 
     # SSE broadcast
     _broadcast_sse("route_complete", {
         "model": model_id,
         "input_tokens": input_tokens,
         "output_tokens": output_tokens,
-        "cost": round(cost, 6),
-        "latency_ms": round(latency, 1),
+        "cost": cost,
+        "latency_ms": latency,
     })
 
     if alert:
@@ -233,57 +465,30 @@ def route_task():
             "output": output_tokens,
             "total": total_tokens,
         },
-        "cost": round(cost, 6),
+        "cost": cost,
         "model": model_id,
-        "latency_ms": round(latency, 1),
+        "latency_ms": latency,
         "budget_alert": alert,
     }
-    return jsonify(resp)
-
-
-_usage_lock = threading.Lock()
+    return _json_response(resp)
 
 
 def _record_usage(input_tokens: int, output_tokens: int, cost: float,
                   model_id: str, key_hash: str):
-    """Record token usage for analytics (thread-safe atomic write)."""
-    usage_file = os.path.join(BASE_DIR, "data", "token_usage.json")
-    entry = {
+    """Record token usage for analytics (buffered; written by the usage log flusher).
+
+    ``cost`` is expected to be rounded already.
+    """
+    usage_log.record({
         "timestamp": time.time(),
         "input_tokens": input_tokens,
         "output_tokens": output_tokens,
         "tokens": input_tokens + output_tokens,
-        "cost": round(cost, 6),
+        "cost": cost,
         "model": model_id,
         "key_hash": key_hash[:12] if key_hash else "unknown",
         "latency_ms": 0,
-    }
-
-    with _usage_lock:
-        os.makedirs(os.path.dirname(usage_file), exist_ok=True)
-        try:
-            with open(usage_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, OSError):
-            data = []
-
-        data.append(entry)
-        if len(data) > 10000:
-            data = data[-10000:]
-
-        # Atomic write via temp file + rename
-        tmp_file = usage_file + ".tmp"
-        try:
-            with open(tmp_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-            os.replace(tmp_file, usage_file)
-        except OSError:
-            # Fallback: direct write
-            try:
-                with open(usage_file, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
-            except OSError:
-                pass
+    })
 
 
 # ---------- Analytics ----------
@@ -296,7 +501,7 @@ def analytics():
     if period not in ("1h", "24h", "7d", "30d"):
         period = "24h"
     data = get_dashboard_data(period)
-    return jsonify(data)
+    return _json_response(data)
 
 
 # ---------- Budget ----------
@@ -305,23 +510,23 @@ def analytics():
 @require_api_key
 def budget_list():
     """List all budgets."""
-    return jsonify({"budgets": budget_manager.summary()})
+    return _json_response({"budgets": budget_manager.summary()})
 
 
 @v2_bp.route("/budget", methods=["POST"])
 @require_api_key
 def budget_create():
     """Create or update a budget."""
-    body = request.get_json(silent=True) or {}
+    body = _json_body()
     name = body.get("name", "").strip()
     limit = body.get("limit", 0)
     period = body.get("period", "monthly")
 
     if not name or limit <= 0:
-        return jsonify({"error": "name and positive limit required"}), 400
+        return _json_response({"error": "name and positive limit required"}, 400)
 
     budget = budget_manager.create(name, limit, period)
-    return jsonify({"budget": budget.to_dict()}), 201
+    return _json_response({"budget": budget.to_dict()}, 201)
 
 
 @v2_bp.route("/budget/<name>", methods=["DELETE"])
@@ -329,8 +534,8 @@ def budget_create():
 def budget_delete(name):
     """Delete a budget."""
     if budget_manager.delete(name):
-        return jsonify({"deleted": True})
-    return jsonify({"error": "Budget not found"}), 404
+        return _json_response({"deleted": True})
+    return _json_response({"error": "Budget not found"}, 404)
 
 
 # ---------- Queue ----------
@@ -339,7 +544,7 @@ def budget_delete(name):
 @require_api_key
 def queue_status():
     """Queue status."""
-    return jsonify(queue_manager.status())
+    return _json_response(queue_manager.status())
 
 
 # ---------- API Keys ----------
@@ -348,17 +553,17 @@ def queue_status():
 @require_api_key
 def create_key():
     """Generate a new API key."""
-    body = request.get_json(silent=True) or {}
+    body = _json_body()
     name = body.get("name", "unnamed")
     result = generate_api_key(name)
-    return jsonify(result), 201
+    return _json_response(result, 201)
 
 
 @v2_bp.route("/keys", methods=["GET"])
 @require_api_key
 def get_keys():
     """List all API keys."""
-    return jsonify({"keys": list_keys()})
+    return _json_response({"keys": list_keys()})
 
 
 # ---------- Audit Log ----------
@@ -368,4 +573,4 @@ def get_keys():
 def get_audit_log():
     """Get recent audit log entries."""
     limit = request.args.get("limit", 100, type=int)
-    return jsonify({"entries": audit_logger.get_recent(limit)})
+    return _json_response({"entries": audit_logger.get_recent(limit)})
@@ -5,9 +5,13 @@ Serves static files from website/ and provides v1 (unauthenticated)
 and v2 (authenticated enterprise) API endpoints.
 
 Usage:
-    python app.py [--port 8080]
+    python app.py [--port 8080] [--asgi]
+
+--asgi serves the app with uvicorn (needs uvicorn and asgiref installed);
+/api/v2/stream then runs natively on the event loop.
 """
 
+import gzip
 import os
 import sys
 
@@ -17,6 +21,45 @@ from flask_cors import CORS
 from config import IS_VERCEL, WEBSITE_DIR
 
 
+_CONNECT_SRC = "'self' https://*.vercel.app" if IS_VERCEL else "'self'"
+
+# Built once; add_security_headers only copies them onto each response
+SECURITY_HEADERS = (
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    ("Content-Security-Policy", (
+        "default-src 'self'; "
+        "script-src 'self'; "
+        "style-src 'self' 'unsafe-inline'; "
+        "img-src 'self' data:; "
+        f"connect-src {_CONNECT_SRC}; "
+        "font-src 'self'"
+    )),
+)
+API_NO_STORE_HEADERS = (
+    ("Cache-Control", "no-cache, no-store, must-revalidate"),
+    ("Pragma", "no-cache"),
+    ("Expires", "0"),
+)
+
+GZIP_MIN_BYTES = 1024  # smaller bodies are not worth the gzip framing
+
+
+def _gzip_response(response):
+    """gzip a buffered response in place if the client accepts it and it is large enough."""
+    if (response.direct_passthrough or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or "Content-Encoding" in response.headers
+            or (response.content_length or 0) <= GZIP_MIN_BYTES
+            or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return
+    response.set_data(gzip.compress(response.get_data(), compresslevel=1))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+
+
 def create_app():
     app = Flask(__name__, static_folder=WEBSITE_DIR, static_url_path="")
     app.config["JSON_SORT_KEYS"] = False
@@ -32,26 +75,16 @@ def create_app():
     # Security + cache-control headers for all responses
     @app.after_request
     def add_security_headers(response):
-        # Cache: allow static assets, disable for API
-        if request.path.startswith("/api/"):
-            response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-            response.headers["Expires"] = "0"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        connect_src = "'self'"
-        if IS_VERCEL:
-            connect_src = "'self' https://*.vercel.app"
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            f"connect-src {connect_src}; "
-            "font-src 'self'"
-        )
+        # Cache: allow static assets, disable for API.
+        # ETag-bearing API responses may be stored but must be revalidated.
+        if request.path[:5] == "/api/":
+            if "ETag" in response.headers:
+                response.headers["Cache-Control"] = "no-cache"
+            else:
+                response.headers.update(API_NO_STORE_HEADERS)
+            # Large JSON bodies (analytics, audit, keys) go out gzipped
+            _gzip_response(response)
+        response.headers.update(SECURITY_HEADERS)
         return response
 
     # Register blueprints
@@ -79,6 +112,35 @@ def create_app():
     return app
 
 
+def create_asgi_app(app=None):
+    """Wrap the Flask app for an ASGI server.
+
+    Everything goes through asgiref's WsgiToAsgi except GET /api/v2/stream,
+    which is served by the async handler in api.v2 so idle SSE clients do
+    not each hold a worker thread.
+    """
+    from asgiref.wsgi import WsgiToAsgi
+
+    wsgi_app = WsgiToAsgi(app or create_app())
+    if IS_VERCEL:
+        return wsgi_app
+    try:
+        from api.v2 import sse_stream_asgi
+    except ImportError:
+        return wsgi_app
+
+    stream_headers = [(k.lower().encode(), v.encode()) for k, v in SECURITY_HEADERS]
+
+    async def asgi_app(scope, receive, send):
+        if (scope["type"] == "http" and scope["method"] == "GET"
+                and scope["path"] == "/api/v2/stream"):
+            await sse_stream_asgi(scope, receive, send, stream_headers)
+        else:
+            await wsgi_app(scope, receive, send)
+
+    return asgi_app
+
+
 def main():
     port = 8080
     if "--port" in sys.argv:
@@ -99,6 +161,16 @@ def main():
     print("API v2: /api/v2/* (authenticated)")
     print("Press Ctrl+C to stop.\n")
 
+    if "--asgi" in sys.argv:
+        try:
+            import uvicorn
+            asgi_app = create_asgi_app(app)
+        except ImportError:
+            print("--asgi needs uvicorn and asgiref; using the threaded server.\n")
+        else:
+            uvicorn.run(asgi_app, host="127.0.0.1", port=port, workers=1)
+            return
+
     app.run(host="127.0.0.1", port=port, debug=False, threaded=True)
 
 
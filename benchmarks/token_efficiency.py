@@ -11,20 +11,23 @@ Usage:
     python3 benchmarks/token_efficiency.py
 """
 
+import os
 import sys
-import json
 import time
+import itertools
+import multiprocessing as mp
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from llm_router_v5 import EnhancedRouter
+from ml.dataset import TRAINING_DATA_FILE, iter_samples
 
 
 def load_test_samples(count=100):
     """
-    Load test samples from ml/training_data.json
+    Load test samples from ml/training_data.jsonl
 
     Args:
         count: Number of samples to load (default: 100)
@@ -32,21 +35,51 @@ def load_test_samples(count=100):
     Returns:
         List of text samples
     """
-    training_data_path = Path(__file__).parent.parent / "ml" / "training_data.json"
+    training_data_path = TRAINING_DATA_FILE
 
-    if not training_data_path.exists():
-        raise FileNotFoundError(f"Training data not found: {training_data_path}")
-
-    with open(training_data_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Extract text samples (up to count); JSONL streams, so only count lines are read
+    samples = [item["text"] for item in itertools.islice(iter_samples(training_data_path), count)]
 
-    # Extract text samples (up to count)
-    samples = [item["text"] for item in data[:count]]
+    if not samples:
+        raise FileNotFoundError(f"Training data not found: {training_data_path}")
 
     print(f"Loaded {len(samples)} test samples from {training_data_path}")
     return samples
 
 
+_router = None  # one EnhancedRouter per worker process
+
+
+def _init_worker():
+    global _router
+    _router = EnhancedRouter(
+        enable_nlp=True,
+        enable_compression=True,
+        compression_level=2,
+        fallback_to_v4=True,
+        min_nlp_chars=0,  # measure every sample, short ones included
+    )
+
+
+def _measure_sample(job):
+    """Route one sample in a worker; returns (index, original, compressed, error)."""
+    i, sample = job
+    try:
+        # Route sample (triggers compression)
+        output = _router.route(sample, v5_enabled=True, economy="balanced")
+    except Exception as e:
+        return i, 0, 0, str(e)
+
+    # Extract token stats from compression results
+    original_tokens = 0
+    compressed_tokens = 0
+    for task in output.tasks:
+        if task.compression_result:
+            original_tokens += task.compression_result.original_tokens
+            compressed_tokens += task.compression_result.compressed_tokens
+    return i, original_tokens, compressed_tokens, None
+
+
 def benchmark_token_reduction():
     """
     Measure average token reduction rate
@@ -62,17 +95,12 @@ def benchmark_token_reduction():
         samples = load_test_samples(100)
     except FileNotFoundError as e:
         print(f"Error: {e}")
-        print("Please ensure ml/training_data.json exists with at least 100 samples.")
+        print("Please ensure ml/training_data.jsonl exists with at least 100 samples.")
         sys.exit(1)
 
-    # Initialize router with compression level 2 (balanced)
-    print("\nInitializing EnhancedRouter (compression_level=2)...")
-    router = EnhancedRouter(
-        enable_nlp=True,
-        enable_compression=True,
-        compression_level=2,
-        fallback_to_v4=True
-    )
+    # One router (compression level 2, balanced) per worker process
+    workers = os.cpu_count() or 1
+    print(f"\nInitializing EnhancedRouter (compression_level=2) in {workers} workers...")
 
     # Run benchmark
     print(f"\nProcessing {len(samples)} samples...\n")
@@ -84,25 +112,17 @@ def benchmark_token_reduction():
 
     benchmark_start = time.time()
 
-    for i, sample in enumerate(samples):
-        if i % 10 == 0:
-            print(f"  [{i:3d}/{len(samples)}] Processing...")
-
-        try:
-            # Route sample (triggers compression)
-            output = router.route(sample, v5_enabled=True, economy="balanced")
-
-            # Extract token stats from compression results
-            original_tokens = 0
-            compressed_tokens = 0
+    with mp.Pool(workers, initializer=_init_worker) as pool:
+        jobs = pool.imap_unordered(_measure_sample, enumerate(samples), chunksize=4)
+        for done, (i, original_tokens, compressed_tokens, error) in enumerate(jobs):
+            if done % 10 == 0:
+                print(f"  [{done:3d}/{len(samples)}] Processing...")
 
-            for task in output.tasks:
-                if task.compression_result:
-                    original_tokens += task.compression_result.original_tokens
-                    compressed_tokens += task.compression_result.compressed_tokens
-
-            # Calculate reduction for this sample
-            if original_tokens > 0:
+            if error is not None:
+                print(f"  [ERROR] Sample {i} failed: {error}")
+                failures += 1
+            elif original_tokens > 0:
+                # Calculate reduction for this sample
                 reduction = 1.0 - (compressed_tokens / original_tokens)
                 results.append(reduction)
                 total_original += original_tokens
@@ -111,10 +131,6 @@ def benchmark_token_reduction():
                 # No compression data available
                 failures += 1
 
-        except Exception as e:
-            print(f"  [ERROR] Sample {i} failed: {e}")
-            failures += 1
-
     benchmark_time = time.time() - benchmark_start
 
     # Calculate metrics
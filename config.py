@@ -18,15 +18,19 @@ else:
 WEBSITE_DIR = os.path.join(BASE_DIR, "website")
 
 if IS_VERCEL:
-    HISTORY_FILE = os.path.join(DATA_DIR, "task_history.json")
+    HISTORY_FILE = os.path.join(DATA_DIR, "task_history.jsonl")
     PROMPTS_FILE = os.path.join(DATA_DIR, "prompts.json")
     FEEDBACK_FILE = os.path.join(DATA_DIR, "feedback.json")
 else:
-    HISTORY_FILE = os.path.join(BASE_DIR, "task_history.json")
+    HISTORY_FILE = os.path.join(BASE_DIR, "task_history.jsonl")
     PROMPTS_FILE = os.path.join(BASE_DIR, "prompts.json")
     FEEDBACK_FILE = os.path.join(BASE_DIR, "feedback.json")
 
-TOKEN_USAGE_FILE = os.path.join(DATA_DIR, "token_usage.json")
+# Legacy JSON array; llm_router migrates it to HISTORY_FILE on its next write
+HISTORY_LEGACY_FILE = os.path.splitext(HISTORY_FILE)[0] + ".json"
+
+TOKEN_USAGE_FILE = os.path.join(DATA_DIR, "token_usage.json")  # legacy JSON array
+TOKEN_USAGE_LOG = os.path.join(DATA_DIR, "token_usage.jsonl")
 
 DEFAULT_PORT = 8080
 
@@ -46,3 +50,11 @@ ROUTE_TOKENS_PER_TASK = {
 
 DEFAULT_COST_PER_1K = 0.01
 DEFAULT_TOKENS_PER_TASK = 1000
+
+# Estimated cost of a single task per route type (derived from the tables above)
+ROUTE_COST_PER_TASK = {
+    r: (ROUTE_TOKENS_PER_TASK.get(r, DEFAULT_TOKENS_PER_TASK) / 1000)
+    * ROUTE_COST_PER_1K.get(r, DEFAULT_COST_PER_1K)
+    for r in ROUTE_TOKENS_PER_TASK.keys() | ROUTE_COST_PER_1K.keys()
+}
+DEFAULT_COST_PER_TASK = (DEFAULT_TOKENS_PER_TASK / 1000) * DEFAULT_COST_PER_1K
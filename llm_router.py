@@ -24,10 +24,35 @@ Core flags:
 
 from __future__ import annotations
 import re, json, sys, os
+import atexit
 import datetime  # task history logging
-import urllib.request
-from dataclasses import dataclass, asdict
-from typing import List, Tuple, Dict, Optional
+import functools
+import hashlib
+import http.client
+import queue
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from dataclasses import dataclass
+from typing import List, Tuple, Dict, Iterable, Iterator, Optional, TextIO
+
+try:
+    import orjson  # optional: faster JSON for history, Groq calls and --json
+except ImportError:
+    orjson = None
+
+
+def _dumps(obj) -> str:
+    """Compact JSON, non-ASCII kept as-is."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 # -------------------------
 # Models
@@ -59,46 +84,141 @@ class RouterOutput:
 # Task history logging
 # -------------------------
 
-def record_tasks(tasks: List[TaskDecision], path: str = "task_history.json") -> None:
-    """Append routed tasks to a local JSON history file.
+HISTORY_FILE = "task_history.jsonl"
 
-    Keeps an audit trail of what the router produced per invocation.
-    Failure to write must not break routing.
-    """
+
+def _migrate_history(path: str) -> None:
+    """Convert a legacy task_history.json array to JSONL once, if no JSONL log exists."""
+    legacy = os.path.splitext(path)[0] + ".json"
+    if legacy == path or os.path.exists(path):
+        return
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        with open(legacy, "r", encoding="utf-8") as f:
             history = json.load(f)
-            if not isinstance(history, list):
-                history = []
     except Exception:
-        history = []
+        return
+    if not isinstance(history, list) or not history:
+        return
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.writelines(_dumps(r) + "\n" for r in history)
+    os.replace(tmp_file, path)
 
-    ts = datetime.datetime.now().isoformat()
-    for t in tasks:
-        history.append({
-            "timestamp": ts,
-            "id": t.id,
-            "summary": t.summary,
-            "priority": t.priority,
-            "route": t.route,
-            "confidence": t.confidence,
-            "reasons": t.reasons,
-        })
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(history, f, ensure_ascii=False, indent=2)
+def record_tasks(tasks: List[TaskDecision], path: str = HISTORY_FILE) -> None:
+    """Append routed tasks to a local JSONL history file (one record per line).
+
+    Keeps an audit trail of what the router produced per invocation.
+    Appending keeps the write O(tasks) no matter how long the history is.
+    Failure to write must not break routing.
+    """
+    _migrate_history(path)
+    ts = datetime.datetime.now().isoformat()
+    with open(path, "a", encoding="utf-8") as f:
+        for t in tasks:
+            f.write(_dumps({
+                "timestamp": ts,
+                "id": t.id,
+                "summary": t.summary,
+                "priority": t.priority,
+                "route": t.route,
+                "confidence": t.confidence,
+                "reasons": t.reasons,
+            }) + "\n")
+
+
+_history_queue: "queue.Queue[List[TaskDecision]]" = queue.Queue()
+_history_thread: Optional[threading.Thread] = None
+_history_thread_lock = threading.Lock()
+
+
+def _history_writer() -> None:
+    while True:
+        tasks = _history_queue.get()
+        try:
+            record_tasks(tasks)
+        except Exception:
+            pass  # failure to write must not break routing
+        finally:
+            _history_queue.task_done()
+
+
+def record_tasks_async(tasks: List[TaskDecision]) -> None:
+    """Queue tasks for record_tasks on a single background writer thread.
+
+    Keeps the history write off route_text's critical path; pending writes
+    are drained at interpreter exit so short CLI runs still record.
+    """
+    global _history_thread
+    if _history_thread is None:
+        with _history_thread_lock:
+            if _history_thread is None:
+                _history_thread = threading.Thread(
+                    target=_history_writer, name="task-history", daemon=True)
+                _history_thread.start()
+                atexit.register(_history_queue.join)
+    _history_queue.put(tasks)
+
+
+def load_history(path: str = HISTORY_FILE) -> List[dict]:
+    """Read the task history written by record_tasks (skips torn lines)."""
+    if not os.path.exists(path):
+        # Not migrated yet: fall back to the legacy JSON array
+        try:
+            with open(os.path.splitext(path)[0] + ".json", "r", encoding="utf-8") as f:
+                history = json.load(f)
+            return history if isinstance(history, list) else []
+        except Exception:
+            return []
+    history: List[dict] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    history.append(_loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return history
 
 # -------------------------
 # Text normalization
 # -------------------------
 
+# Compiled once; these run on every routed request
+_RE_WS = re.compile(r"[ \t]+")
+_RE_WS_ANY = re.compile(r"\s+")
+_RE_LEAD_PUNCT = re.compile(r"^[,;:·\-\u2013\u2014/]+\s*")
+_RE_NUMBERED_LINE = re.compile(r"(^|\n)\s*(\d+[\.\)]|[\u2460-\u2473])\s+")
+_RE_NUMBERED_TWO = re.compile(r"\d+\.\s+\S.*\d+\.\s+\S")
+_RE_SPLIT_NUM = re.compile(r"(?:^|\n|\s)\s*\d+[\.\)]\s+")
+_RE_LIST_PREFIX = re.compile(r"^\s*(?:\d+[\.\)]\s*|[-*]\s+)")
+# Circled digits ①..⑳ (U+2460..U+2473) -> "1."..."20.", applied in one translate() pass
+_CIRCLED_TRANS = {0x2460 + i: f"{i + 1}." for i in range(20)}
+_RE_MERGE_SPEC = re.compile(r"^\s*([A-Za-z])\s*\+\s*([A-Za-z])\s*$")
+# "지금부터 연속적으로 수정할 이슈:" preamble
+_RE_ISSUE_PREAMBLE = re.compile(r"^\s*\uc9c0\uae08\ubd80\ud130\s+\uc5f0\uc18d\uc801\uc73c\ub85c\s+\uc218\uc815\ud560\s+\uc774\uc288\s*[:\-]?\s*")
+# Pasted router output: one match per (stripped) line. "stub" ends the input;
+# anything else is a header/guardrail/stub line to drop.
+_RE_BOILERPLATE = re.compile(
+    r"(?P<stub>Change log stub)"
+    r"|(?:Task |Ticket )(?s:.*):\Z"  # pasted headers
+    r"|Implement minimal fix|IMPLEMENT:|Flow:|(?:STOP|Stop\.?)\Z"  # guardrail boilerplate
+    r"|## YYYY-MM-DD|- (?:What changed|Files|Notes)"  # change-log stub lines
+)
+
 def _norm(s: str) -> str:
-    s = s.strip().replace("\r\n", "\n")
+    # Each step is skipped when it cannot change anything (the common clean input)
+    s = s.strip()
+    if "\r" in s:
+        s = s.replace("\r\n", "\n")
     # If the user pasted literal "\\n" sequences (common in UIs), unescape them.
     if "\\n" in s and "\n" not in s:
-        s = s.replace("\\n", "\n")
-    s = re.sub(r"[ \t]+", " ", s)
-    return s.strip()
+        s = s.replace("\\n", "\n").strip()
+    if "  " in s or "\t" in s:
+        s = _RE_WS.sub(" ", s)
+    return s
 
 def _contains_any(text: str, kws: List[str]) -> bool:
     t = text.lower()
@@ -108,41 +228,19 @@ def _contains_any(text: str, kws: List[str]) -> bool:
 
 # Helper to remove leading punctuation artifacts from splits
 def _strip_leading_punct(s: str) -> str:
-    return re.sub(r"^[,;:·\-\u2013\u2014/]+\s*", "", s).strip()
+    return _RE_LEAD_PUNCT.sub("", s).strip()
 
 # Helper to remove router boilerplate if the user pastes prior outputs back as input
 def _strip_router_boilerplate(s: str) -> str:
-    lines = s.splitlines()
     out: List[str] = []
-    for line in lines:
-        raw = line.strip()
-
-        # Drop common pasted headers
-        if raw.startswith("Task ") and raw.endswith(":"):
-            continue
-        if raw.startswith("Ticket ") and raw.endswith(":"):
-            continue
-
-        # If a change-log stub starts, drop everything after it
-        if raw.startswith("Change log stub"):
+    for line in s.splitlines():
+        m = _RE_BOILERPLATE.match(line.strip())
+        if m is None:
+            out.append(line)
+        elif m.lastgroup == "stub":
+            # If a change-log stub starts, drop everything after it
             break
 
-        # Drop common guardrail boilerplate lines
-        if raw.startswith("Implement minimal fix"):
-            continue
-        if raw.startswith("IMPLEMENT:") or raw.startswith("Flow:"):
-            continue
-        if raw in {"STOP", "Stop", "Stop."}:
-            continue
-
-        # Drop stub lines if present
-        if raw.startswith("## YYYY-MM-DD"):
-            continue
-        if raw.startswith("- What changed") or raw.startswith("- Files") or raw.startswith("- Notes"):
-            continue
-
-        out.append(line)
-
     return "\n".join(out).strip()
 
 # -------------------------
@@ -150,15 +248,12 @@ def _strip_router_boilerplate(s: str) -> str:
 # -------------------------
 
 def is_numbered(text: str) -> bool:
-    return bool(re.search(r"(^|\n)\s*(\d+[\.\)]|[\u2460-\u2473])\s+", text)) or \
-           bool(re.search(r"\d+\.\s+\S.*\d+\.\s+\S", text))
+    return bool(_RE_NUMBERED_LINE.search(text)) or bool(_RE_NUMBERED_TWO.search(text))
 
 def split_numbered(text: str) -> List[str]:
-    circled_map = {chr(9311 + i): f"{i+1}." for i in range(20)}
-    for k, v in circled_map.items():
-        text = text.replace(k, v)
-    parts = re.split(r"(?:^|\n|\s)\s*\d+[\.\)]\s+", text)
-    return [_strip_leading_punct(p) for p in parts if _strip_leading_punct(p)]
+    text = text.translate(_CIRCLED_TRANS)
+    parts = _RE_SPLIT_NUM.split(text)
+    return [p for p in map(_strip_leading_punct, parts) if p]
 
 # -------------------------
 # Groq API (text splitting)
@@ -167,37 +262,137 @@ def split_numbered(text: str) -> List[str]:
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_SPLIT_MODEL = "llama-3.1-8b-instant"
 
-def _groq_chat(messages: list, api_key: str, *, model: str = GROQ_SPLIT_MODEL,
-               max_tokens: int = 512, temperature: float = 0.0) -> str:
+_GROQ_URL = urlsplit(GROQ_API_URL)
+_groq_local = threading.local()  # one keep-alive connection per thread
+
+GROQ_MAX_WORKERS = 4  # concurrent Groq calls (e.g. --min-tickets re-splits)
+GROQ_TIMEOUT = 15  # seconds per connect / socket read
+GROQ_STREAM_DEADLINE = 60  # seconds for a whole streamed reply (socket timeouts are per read)
+_groq_pool: Optional[ThreadPoolExecutor] = None
+_groq_pool_lock = threading.Lock()
+
+
+def _groq_executor() -> ThreadPoolExecutor:
+    """Shared pool, so each worker's keep-alive connection outlives a single call."""
+    global _groq_pool
+    if _groq_pool is None:
+        with _groq_pool_lock:
+            if _groq_pool is None:
+                _groq_pool = ThreadPoolExecutor(GROQ_MAX_WORKERS, thread_name_prefix="groq")
+    return _groq_pool
+
+
+@functools.lru_cache(maxsize=1)
+def _groq_ssl_context() -> ssl.SSLContext:
+    # Use certifi CA bundle if available (fixes SSL on macOS with Python 3.14+)
+    try:
+        import certifi
+        return ssl.create_default_context(cafile=certifi.where())
+    except ImportError:
+        return ssl.create_default_context()
+
+
+def _groq_connection(timeout: float) -> http.client.HTTPSConnection:
+    conn = getattr(_groq_local, "conn", None)
+    if conn is None:
+        conn = _groq_local.conn = http.client.HTTPSConnection(
+            _GROQ_URL.hostname, _GROQ_URL.port, timeout=timeout, context=_groq_ssl_context())
+    return conn
+
+
+def _groq_drop() -> None:
+    conn = getattr(_groq_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _groq_local.conn = None
+
+
+def _groq_open(body: bytes, headers: Dict[str, str], timeout: float) -> http.client.HTTPResponse:
+    """POST to the Groq API over this thread's keep-alive HTTPS connection.
+
+    Repeated calls (e.g. --min-tickets re-splits) skip the TCP + TLS
+    handshake. If the server closed the idle connection, retry once on a
+    fresh one. Returns once the headers are in; the caller must read the
+    body to the end (or call _groq_drop) before the next request.
+    """
+    reused = getattr(_groq_local, "conn", None) is not None
+    conn = _groq_connection(timeout)
+    try:
+        conn.request("POST", _GROQ_URL.path, body=body, headers=headers)
+        resp = conn.getresponse()
+    except (http.client.HTTPException, OSError) as e:
+        _groq_drop()
+        # Stale keep-alive shows up as RemoteDisconnected / reset / SSL EOF
+        if not reused or isinstance(e, TimeoutError):
+            raise
+        return _groq_open(body, headers, timeout)
+    if resp.status >= 400:
+        _groq_drop()
+        raise OSError(f"HTTP Error {resp.status}: {resp.reason}")
+    return resp
+
+
+def _groq_request(messages: list, api_key: str, model: str, max_tokens: int, temperature: float,
+                  stream: bool = False) -> http.client.HTTPResponse:
     payload = {
         "model": model,
         "messages": messages,
         "max_tokens": max_tokens,
         "temperature": temperature,
     }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        GROQ_API_URL,
-        data=data,
-        headers={
+    if stream:
+        payload["stream"] = True
+    data = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+    return _groq_open(
+        data,
+        {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
             "User-Agent": "LLMRouter/4.0",
         },
-        method="POST",
+        timeout=GROQ_TIMEOUT,
     )
-    ssl_ctx = None
+
+
+def _groq_chat(messages: list, api_key: str, *, model: str = GROQ_SPLIT_MODEL,
+               max_tokens: int = 512, temperature: float = 0.0) -> str:
+    resp = _groq_request(messages, api_key, model, max_tokens, temperature)
     try:
-        import certifi, ssl
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-    except ImportError:
-        pass
-    with urllib.request.urlopen(req, timeout=15, context=ssl_ctx) as resp:
-        raw = resp.read().decode("utf-8", errors="replace")
-    obj = json.loads(raw)
+        raw = resp.read()
+    except (http.client.HTTPException, OSError):
+        _groq_drop()
+        raise
+    obj = _loads(raw) if orjson is not None else json.loads(raw.decode("utf-8", errors="replace"))
     return obj["choices"][0]["message"]["content"]
 
 
+def _groq_chat_stream(messages: list, api_key: str, *, model: str = GROQ_SPLIT_MODEL,
+                      max_tokens: int = 512, temperature: float = 0.0) -> Iterator[str]:
+    """_groq_chat with "stream": true; yields content deltas as the SSE events arrive.
+
+    Raises TimeoutError if the reply is still streaming after GROQ_STREAM_DEADLINE.
+    """
+    deadline = time.monotonic() + GROQ_STREAM_DEADLINE
+    resp = _groq_request(messages, api_key, model, max_tokens, temperature, stream=True)
+    try:
+        for line in resp:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Groq stream exceeded {GROQ_STREAM_DEADLINE}s")
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            delta = _loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+        resp.read()  # drain the end of the chunked body so the connection is reusable
+    except BaseException:
+        # Includes GeneratorExit: a half-read response leaves the connection unusable
+        _groq_drop()
+        raise
+
+
 def _parse_numbered_response(text: str) -> List[str]:
     """Parse Groq response like '1. task one\\n2. task two' into a list."""
     lines = text.strip().splitlines()
@@ -206,12 +401,26 @@ def _parse_numbered_response(text: str) -> List[str]:
         line = line.strip()
         if not line:
             continue
-        cleaned = re.sub(r"^\s*(?:\d+[\.\)]\s*|[-*]\s+)", "", line).strip()
+        cleaned = _RE_LIST_PREFIX.sub("", line).strip()
         if cleaned:
             tasks.append(cleaned)
     return tasks
 
 
+def _parse_numbered_stream(chunks: Iterable[str]) -> List[str]:
+    """_parse_numbered_response over streamed text, parsing each line once it is complete."""
+    tasks: List[str] = []
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        # Keep a trailing partial line for the next chunk
+        pending = lines.pop() if lines and lines[-1].splitlines() == [lines[-1]] else ""
+        if lines:
+            tasks.extend(_parse_numbered_response("".join(lines)))
+    tasks.extend(_parse_numbered_response(pending))
+    return tasks
+
+
 _SPLIT_SYSTEM_PROMPT = (
     "You are a task splitter. Given a user request (Korean or English), "
     "split it into independent, actionable tasks. Rules:\n"
@@ -235,23 +444,91 @@ _SPLIT_SYSTEM_PROMPT_FORCE = (
     "- Prefer MORE splits over fewer."
 )
 
+# --min-tickets: ask for the whole shortfall in one call instead of one re-split per ticket
+_SPLIT_SYSTEM_PROMPT_MIN_N = _SPLIT_SYSTEM_PROMPT_FORCE + "\n- Output at least {n} tasks."
+
+
+# Groq split results, persisted across runs. Keyed by sha1 of system prompt +
+# whitespace-normalized request, so a prompt change or --force-split misses.
+SPLIT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "llm_router", "splits.json")
+SPLIT_CACHE_MAX = 500  # oldest entries are dropped first
+
+_split_cache: Optional[Dict[str, List[str]]] = None  # loaded on first use
+_split_cache_lock = threading.Lock()
+
+
+def _split_cache_key(text: str, system: str) -> str:
+    norm = _RE_WS_ANY.sub(" ", text.strip())
+    return hashlib.sha1(f"{system}\0{norm}".encode("utf-8")).hexdigest()
+
+
+def _split_cache_load() -> Dict[str, List[str]]:
+    """Return the split cache, reading it from disk once. Caller must hold the lock."""
+    global _split_cache
+    if _split_cache is None:
+        try:
+            with open(SPLIT_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        _split_cache = data if isinstance(data, dict) else {}
+    return _split_cache
+
+
+def _split_cache_get(key: str) -> Optional[List[str]]:
+    with _split_cache_lock:
+        tasks = _split_cache_load().get(key)
+    return list(tasks) if tasks else None
+
+
+def _split_cache_put(key: str, tasks: List[str]) -> None:
+    with _split_cache_lock:
+        cache = _split_cache_load()
+        cache.pop(key, None)
+        cache[key] = tasks
+        while len(cache) > SPLIT_CACHE_MAX:
+            del cache[next(iter(cache))]
+        tmp_file = f"{SPLIT_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(SPLIT_CACHE_FILE), exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_file, SPLIT_CACHE_FILE)
+        except OSError:
+            pass  # cache is best-effort
+
+
+def split_via_groq(text: str, *, force_split: bool = False, min_tasks: int = 0) -> List[str]:
+    """Split text into tasks using Groq LLM. Returns [text] if API unavailable.
+
+    min_tasks > 1 asks for at least that many tasks (implies force_split).
+    Successful splits are cached on disk (SPLIT_CACHE_FILE); repeating a
+    request skips the API call.
+    """
+    if min_tasks > 1:
+        system = _SPLIT_SYSTEM_PROMPT_MIN_N.format(n=min_tasks)
+    else:
+        system = _SPLIT_SYSTEM_PROMPT_FORCE if force_split else _SPLIT_SYSTEM_PROMPT
+    key = _split_cache_key(text, system)
+    cached = _split_cache_get(key)
+    if cached:
+        return cached
 
-def split_via_groq(text: str, *, force_split: bool = False) -> List[str]:
-    """Split text into tasks using Groq LLM. Returns [text] if API unavailable."""
     api_key = os.environ.get("GROQ_API_KEY", "").strip()
     if not api_key:
         print("[WARN] GROQ_API_KEY not set. Returning text as single task.", file=sys.stderr)
         return [text]
 
-    system = _SPLIT_SYSTEM_PROMPT_FORCE if force_split else _SPLIT_SYSTEM_PROMPT
     messages = [
         {"role": "system", "content": system},
         {"role": "user", "content": text},
     ]
     try:
-        response = _groq_chat(messages, api_key)
-        tasks = _parse_numbered_response(response)
-        return tasks if tasks else [text]
+        tasks = _parse_numbered_stream(_groq_chat_stream(messages, api_key))
+        if not tasks:
+            return [text]
+        _split_cache_put(key, tasks)
+        return tasks
     except Exception as e:
         print(f"[WARN] Groq split failed: {e}. Returning text as single task.", file=sys.stderr)
         return [text]
@@ -260,13 +537,37 @@ def extract_tasks(full_text: str, *, force_split: bool = False) -> List[str]:
     t = _norm(full_text)
     t = _strip_leading_punct(t)
     t = _strip_router_boilerplate(t)
-    t = re.sub(r"^\s*\uc9c0\uae08\ubd80\ud130\s+\uc5f0\uc18d\uc801\uc73c\ub85c\s+\uc218\uc815\ud560\s+\uc774\uc288\s*[:\-]?\s*", "", t)
+    return _split_tasks(t, force_split=force_split)
+
+def _extract_tasks_normalized(t: str, *, force_split: bool = False) -> List[str]:
+    """extract_tasks() for text route_text already ran through _norm + _strip_router_boilerplate.
+
+    Both passes are idempotent on their own output, so only the cheap
+    leading-punct strip is repeated (and the boilerplate pass only if that
+    exposed a new first line).
+    """
+    if "\\n" in t and "\n" not in t:
+        # A second _norm would now unescape literal "\\n"; keep that behaviour
+        return extract_tasks(t, force_split=force_split)
+    s = _strip_leading_punct(t)
+    if s != t:
+        s = _strip_router_boilerplate(s)
+    return _split_tasks(s, force_split=force_split)
+
+def _split_tasks(t: str, *, force_split: bool) -> List[str]:
+    t = _RE_ISSUE_PREAMBLE.sub("", t)
     if is_numbered(t):
-        return [_strip_leading_punct(p) for p in split_numbered(t) if _strip_leading_punct(p)]
-    return [_strip_leading_punct(p) for p in split_via_groq(t, force_split=force_split) if _strip_leading_punct(p)]
+        parts = split_numbered(t)
+    else:
+        parts = split_via_groq(t, force_split=force_split)
+    return [p for p in map(_strip_leading_punct, parts) if p]
 
 def summarize(task: str, n: int = 80) -> str:
-    s = re.sub(r"\s+", " ", task.strip())
+    s = task.strip()
+    # isprintable() is False for every whitespace char except " ", so a clean
+    # single-spaced task has nothing for the regex to collapse
+    if "  " in s or not s.isprintable():
+        s = _RE_WS_ANY.sub(" ", s)
     return s if len(s) <= n else s[: n - 1].rstrip() + "\u2026"
 
 # -------------------------
@@ -284,25 +585,17 @@ def apply_max_tickets(tasks: List[str], max_tickets: int) -> List[str]:
 def apply_merge_spec(tasks: List[str], merge_spec: str) -> List[str]:
     if not merge_spec:
         return tasks
-    m = re.match(r"^\s*([A-Za-z])\s*\+\s*([A-Za-z])\s*$", merge_spec)
+    m = _RE_MERGE_SPEC.match(merge_spec)
     if not m:
         return tasks
-    a, b = m.group(1).upper(), m.group(2).upper()
-    indexed = [(chr(ord("A")+i), t) for i, t in enumerate(tasks)]
-    a_idx = next((i for i,(tid,_) in enumerate(indexed) if tid==a), None)
-    b_idx = next((i for i,(tid,_) in enumerate(indexed) if tid==b), None)
-    if a_idx is None or b_idx is None or a_idx == b_idx:
+    # Ticket IDs are "A".."Z" by position, so the letter gives the index directly
+    a_idx = ord(m.group(1).upper()) - ord("A")
+    b_idx = ord(m.group(2).upper()) - ord("A")
+    if a_idx >= len(tasks) or b_idx >= len(tasks) or a_idx == b_idx:
         return tasks
-    lo, hi = min(a_idx,b_idx), max(a_idx,b_idx)
-    merged = indexed[lo][1] + " / " + indexed[hi][1]
-    new = []
-    for i,(tid,txt) in enumerate(indexed):
-        if i == lo:
-            new.append(merged)
-        elif i == hi:
-            continue
-        else:
-            new.append(txt)
+    lo, hi = min(a_idx, b_idx), max(a_idx, b_idx)
+    new = tasks[:hi] + tasks[hi + 1:]
+    new[lo] = tasks[lo] + " / " + tasks[hi]
     return new
 
 # -------------------------
@@ -315,11 +608,13 @@ def build_change_log_stub(ticket_id: str) -> str:
 def next_session_starter(ticket_id: str, summary_line: str) -> str:
     return f"{ticket_id}: {summary_line}"
 
+# Prompts are stored stripped (no trailing newline) so renderers can emit them as-is
+
 def build_prompt_desktop(ticket_id: str, task: str, *, economy: str, phase: str) -> str:
-    return task.strip() + "\n"
+    return task.strip()
 
 def build_prompt_opus_only(ticket_id: str, task: str) -> str:
-    return task.strip() + "\n"
+    return task.strip()
 
 # -------------------------
 # Notes + Session Guard
@@ -347,38 +642,53 @@ def session_guard(n_tasks: int, economy: str, phase: str) -> List[str]:
 # Rendering
 # -------------------------
 
-def print_friendly(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool) -> None:
+def render_friendly(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool) -> str:
+    lines = []
     if len(out.tasks) > 1:
-        print(f"[{len(out.tasks)} tickets] Run one at a time. A -> finish -> new session -> B")
+        lines.append(f"[{len(out.tasks)} tickets] Run one at a time. A -> finish -> new session -> B")
     if out.global_notes:
         for n in out.global_notes:
-            print(f"! {n}")
+            lines.append(f"! {n}")
     for t in out.tasks:
-        print(f"\nTicket {t.id} -- {t.summary}")
-        print(f"[{t.route.upper()} {t.confidence:.0%}]")
-        print("\n[Copy and paste to Claude]")
-        print("```")
-        print(t.claude_prompt.strip())
-        print("```")
-        print(f"next: {t.next_session_starter}")
-    print()
-
-def print_human(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool) -> None:
+        lines.append(f"\nTicket {t.id} -- {t.summary}")
+        lines.append(f"[{t.route.upper()} {t.confidence:.0%}]")
+        lines.append("\n[Copy and paste to Claude]")
+        lines.append("```")
+        lines.append(t.claude_prompt)
+        lines.append("```")
+        lines.append(f"next: {t.next_session_starter}")
+    lines.append("")
+    return "\n".join(lines)
+
+def render_human(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool) -> str:
     mode = "OPUS" if opus_only else ("DE" if desktop_edit else "N")
-    print(f"ROUTER v4.0 | {mode} {economy[0].upper()} {phase[0].upper()} | {out.route.upper()} {out.confidence:.0%}")
+    lines = [f"ROUTER v4.0 | {mode} {economy[0].upper()} {phase[0].upper()} | {out.route.upper()} {out.confidence:.0%}"]
     for n in out.global_notes:
-        print(f"! {n}")
+        lines.append(f"! {n}")
     for s in out.session_guard:
-        print(f"# {s}")
+        lines.append(f"# {s}")
     for t in out.tasks:
-        print(f"\n[{t.id}] p{t.priority} {t.summary}")
-        print(f"  route={t.route} {t.confidence:.0%} | {', '.join(t.reasons[:2])}")
-        print("\n[Copy and paste to Claude]")
-        print("```")
-        print(t.claude_prompt.strip())
-        print("```")
-        print(f"  next: {t.next_session_starter}")
-        print(f"  log: {t.change_log_stub.strip()}")
+        lines.append(f"\n[{t.id}] p{t.priority} {t.summary}")
+        lines.append(f"  route={t.route} {t.confidence:.0%} | {', '.join(t.reasons[:2])}")
+        lines.append("\n[Copy and paste to Claude]")
+        lines.append("```")
+        lines.append(t.claude_prompt)
+        lines.append("```")
+        lines.append(f"  next: {t.next_session_starter}")
+        lines.append(f"  log: {t.change_log_stub.strip()}")
+    return "\n".join(lines)
+
+def print_friendly(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool,
+                   file: Optional[TextIO] = None) -> None:
+    """Write render_friendly() to file (default: sys.stdout) in one write."""
+    text = render_friendly(out, desktop_edit=desktop_edit, economy=economy, phase=phase, opus_only=opus_only)
+    (file or sys.stdout).write(text + "\n")
+
+def print_human(out: RouterOutput, *, desktop_edit: bool, economy: str, phase: str, opus_only: bool,
+                file: Optional[TextIO] = None) -> None:
+    """Write render_human() to file (default: sys.stdout) in one write."""
+    text = render_human(out, desktop_edit=desktop_edit, economy=economy, phase=phase, opus_only=opus_only)
+    (file or sys.stdout).write(text + "\n")
 
 def render_tickets_md(out: RouterOutput, *, economy: str, phase: str) -> str:
     lines = []
@@ -422,16 +732,37 @@ def filter_one_task(out: RouterOutput, tid: str) -> RouterOutput:
 # -------------------------
 
 def apply_min_tickets(tasks: List[str], min_tickets: int, full_text: str, *, force_split: bool = False) -> List[str]:
-    """Ensure at least min_tickets tasks. If fewer, try harder to split the largest task."""
+    """Ensure at least min_tickets tasks. If fewer, try harder to split the largest tasks.
+
+    Each round re-splits the longest tasks not tried yet, one per missing
+    ticket (up to GROQ_MAX_WORKERS), concurrently. A single candidate is asked
+    to cover the whole shortfall in one call. Stops when a round makes no
+    progress.
+    """
     if min_tickets <= 0 or len(tasks) >= min_tickets:
         return tasks
+    tried = set()
     while len(tasks) < min_tickets:
-        longest_idx = max(range(len(tasks)), key=lambda i: len(tasks[i]))
-        longest = tasks[longest_idx]
-        sub = split_via_groq(longest, force_split=True)
-        if len(sub) > 1:
-            tasks = tasks[:longest_idx] + sub + tasks[longest_idx + 1:]
+        need = min_tickets - len(tasks)
+        # Longest first; ties keep input order
+        order = sorted(range(len(tasks)), key=lambda i: -len(tasks[i]))
+        picks = [i for i in order if tasks[i] not in tried][:min(need, GROQ_MAX_WORKERS)]
+        if not picks:
+            break
+        if len(picks) == 1:
+            subs = [split_via_groq(tasks[picks[0]], force_split=True, min_tasks=need + 1)]
         else:
+            # Independent I/O-bound calls: wall time is ~one round trip instead of len(picks)
+            subs = list(_groq_executor().map(
+                lambda i: split_via_groq(tasks[i], force_split=True, min_tasks=2), picks))
+        progress = False
+        for i, sub in sorted(zip(picks, subs), reverse=True):  # splice back to front
+            if len(sub) > 1:
+                tasks = tasks[:i] + sub + tasks[i + 1:]
+                progress = True
+            else:
+                tried.add(tasks[i])
+        if not progress:
             break
     return tasks
 
@@ -440,8 +771,9 @@ def route_text(full_text: str, *, desktop_edit: bool, economy: str, phase: str,
               max_tickets: int, merge_spec: str, force_split: bool = False, min_tickets: int = 0) -> RouterOutput:
     text = _norm(full_text)
     text = _strip_router_boilerplate(text)
-    tasks = extract_tasks(text, force_split=force_split)
-    tasks = [_strip_leading_punct(t) for t in tasks if _strip_leading_punct(t)]
+    tasks = _extract_tasks_normalized(text, force_split=force_split)
+    # Not redundant: _strip_leading_punct is not idempotent ("- , x" -> ", x" -> "x")
+    tasks = [t for t in map(_strip_leading_punct, tasks) if t]
     tasks = apply_merge_spec(tasks, merge_spec)
     tasks = apply_min_tickets(tasks, min_tickets, text, force_split=force_split)
     tasks = apply_max_tickets(tasks, max_tickets)
@@ -463,7 +795,7 @@ def route_text(full_text: str, *, desktop_edit: bool, economy: str, phase: str,
         elif desktop_edit:
             prompt = build_prompt_desktop(tid, task, economy=economy, phase=phase)
         else:
-            prompt = task.strip() + "\n"
+            prompt = task.strip()
 
         decisions.append(TaskDecision(
             id=tid,
@@ -481,11 +813,8 @@ def route_text(full_text: str, *, desktop_edit: bool, economy: str, phase: str,
     overall_conf = 0.85
     reasons = ["All tasks routed to Claude"]
 
-    # Record task history (must not break routing)
-    try:
-        record_tasks(decisions)
-    except Exception:
-        pass
+    # Record task history in the background (must not break routing)
+    record_tasks_async(decisions)
     return RouterOutput(
         route=overall_route,
         confidence=overall_conf,
@@ -495,65 +824,72 @@ def route_text(full_text: str, *, desktop_edit: bool, economy: str, phase: str,
         tasks=decisions,
     )
 
-def parse_flag_value(args: List[str], flag: str) -> Tuple[List[str], Optional[str]]:
-    if flag not in args:
-        return args, None
-    i = args.index(flag)
-    if i == len(args) - 1:
-        return [a for a in args if a != flag], None
-    val = args[i+1]
-    return args[:i] + args[i+2:], val
+_SIMPLE_FLAGS = frozenset({"--json", "--desktop-edit", "--opus-only", "--tickets-md", "--friendly", "--force-split"})
+_VALUE_FLAGS = frozenset({"--economy", "--phase", "--one-task", "--save-tickets", "--max-tickets", "--min-tickets", "--merge"})
+
+def parse_args(args: List[str]) -> Tuple[set, Dict[str, str], List[str]]:
+    """Split argv in one pass into (simple flags, value flags, remaining words).
+
+    A value flag takes the next token; the first occurrence wins.
+    """
+    flags: set = set()
+    values: Dict[str, str] = {}
+    rest: List[str] = []
+    it = iter(args)
+    for a in it:
+        if a in _SIMPLE_FLAGS:
+            flags.add(a)
+        elif a in _VALUE_FLAGS:
+            val = next(it, None)
+            if val is not None:
+                values.setdefault(a, val)
+        else:
+            rest.append(a)
+    return flags, values, rest
 
 def main() -> int:
-    args = sys.argv[1:]
+    flags, values, args = parse_args(sys.argv[1:])
 
-    output_json = "--json" in args
-    desktop_edit = "--desktop-edit" in args
-    opus_only = "--opus-only" in args
-    tickets_md = "--tickets-md" in args
-    friendly = "--friendly" in args
-    force_split = "--force-split" in args
+    output_json = "--json" in flags
+    desktop_edit = "--desktop-edit" in flags
+    opus_only = "--opus-only" in flags
+    tickets_md = "--tickets-md" in flags
+    friendly = "--friendly" in flags
+    force_split = "--force-split" in flags
 
-    args, economy = parse_flag_value(args, "--economy")
-    economy = (economy or "strict").strip().lower()
+    economy = values.get("--economy", "strict").strip().lower()
     if economy not in {"strict", "balanced"}:
         economy = "strict"
 
-    args, phase = parse_flag_value(args, "--phase")
-    phase = (phase or "implement").strip().lower()
+    phase = values.get("--phase", "implement").strip().lower()
     if phase not in {"analyze", "implement"}:
         phase = "implement"
 
-    args, one_task = parse_flag_value(args, "--one-task")
-    args, save_tickets = parse_flag_value(args, "--save-tickets")
+    one_task = values.get("--one-task")
+    save_tickets = values.get("--save-tickets")
 
-    args, max_tickets = parse_flag_value(args, "--max-tickets")
     try:
-        max_tickets_n = int(max_tickets) if max_tickets else 0
-    except (ValueError, TypeError):
+        max_tickets_n = int(values.get("--max-tickets") or 0)
+    except ValueError:
         max_tickets_n = 0
 
-    args, min_tickets = parse_flag_value(args, "--min-tickets")
     try:
-        min_tickets_n = int(min_tickets) if min_tickets else 0
-    except (ValueError, TypeError):
+        min_tickets_n = int(values.get("--min-tickets") or 0)
+    except ValueError:
         min_tickets_n = 0
 
-    args, merge_spec = parse_flag_value(args, "--merge")
-    merge_spec = merge_spec or ""
-
-    # remove simple flags
-    simple = {"--json","--desktop-edit","--opus-only","--tickets-md","--friendly","--force-split"}
-    args = [a for a in args if a not in simple]
+    merge_spec = values.get("--merge", "")
 
     if not args:
-        print("Usage:")
-        print("  python llm_router.py --friendly \"<request>\"")
-        print("  python llm_router.py --desktop-edit --economy strict --phase implement \"<request>\"")
-        print("  python llm_router.py --one-task B --desktop-edit \"<request>\"")
-        print("  python llm_router.py --max-tickets 4 --merge \"A+B\" --desktop-edit \"<request>\"")
-        print("  python llm_router.py --tickets-md --save-tickets TICKETS.md \"<request>\"")
-        print("  python llm_router.py --opus-only \"<request>\"")
+        sys.stdout.write(
+            "Usage:\n"
+            "  python llm_router.py --friendly \"<request>\"\n"
+            "  python llm_router.py --desktop-edit --economy strict --phase implement \"<request>\"\n"
+            "  python llm_router.py --one-task B --desktop-edit \"<request>\"\n"
+            "  python llm_router.py --max-tickets 4 --merge \"A+B\" --desktop-edit \"<request>\"\n"
+            "  python llm_router.py --tickets-md --save-tickets TICKETS.md \"<request>\"\n"
+            "  python llm_router.py --opus-only \"<request>\"\n"
+        )
         return 2
 
     user_text = sys.stdin.read() if args[0] == "-" else " ".join(args)
@@ -573,7 +909,11 @@ def main() -> int:
         out = filter_one_task(out, one_task)
 
     if output_json:
-        print(json.dumps(asdict(out), ensure_ascii=False, indent=2))
+        if orjson is not None:
+            print(orjson.dumps(out, option=orjson.OPT_INDENT_2).decode("utf-8"))  # dataclasses natively
+        else:
+            from dataclasses import asdict  # only the stdlib fallback needs the dict copy
+            print(json.dumps(asdict(out), ensure_ascii=False, indent=2))
         return 0
 
     if tickets_md or save_tickets:
@@ -582,7 +922,7 @@ def main() -> int:
             save_text(save_tickets, md)
             print(f"Saved tickets to: {save_tickets}")
         else:
-            print(md)
+            sys.stdout.write(md + "\n")
         return 0
 
     if friendly:
@@ -17,6 +17,14 @@ Core v5.0 flags:
   --show-stats              Show token reduction & processing time
   --fallback-v4             Fallback to v4.0 on error (default: true)
   --no-cache                Disable caching (default: false)
+  --intent-model NAME       SentenceTransformer backbone for intent detection
+                            (default: paraphrase-multilingual-MiniLM-L12-v2)
+  --nlp-backend NAME        Embedding backend: torch | onnx | openvino
+                            (default: torch)
+  --bf16                    Keep FP32 weights (no INT8) and run the intent
+                            model under BF16 autocast
+  --min-nlp-chars N         Requests shorter than N chars (or under 4 words)
+                            skip the NLP stack; 0 disables (default: 0)
 
 All v4.0 flags are 100% compatible.
 """
@@ -26,10 +34,15 @@ import re, json, sys, os, time
 import asyncio
 import datetime
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Tuple, Dict, Optional, Any
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import orjson  # optional: faster final JSON dump in main()
+except ImportError:
+    orjson = None
 
 # v4.0 imports (for fallback and compatibility)
 import llm_router as v4
@@ -42,7 +55,7 @@ try:
     from nlp.compressor import Compressor, CompressionResult
     NLP_AVAILABLE = True
 except ImportError as e:
-    logging.warning(f"NLP modules not available: {e}. v5.0 features disabled.")
+    logging.warning("NLP modules not available: %s. v5.0 features disabled.", e)
     NLP_AVAILABLE = False
     # Dummy classes for type hints
     IntentAnalysis = Any
@@ -61,12 +74,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# v4.route_text() flags accepted through **kwargs, with their defaults.
+# _route_v5 and _fallback_v4 both go through _v4_kwargs so they stay in sync.
+_V4_DEFAULTS: Dict[str, Any] = {
+    "desktop_edit": False,
+    "economy": "balanced",
+    "phase": "implement",
+    "opus_only": False,
+    "max_tickets": 99,
+    "merge_spec": "",
+    "force_split": False,
+    "min_tickets": 0,
+}
+
+
+def _v4_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the v4.route_text() flags out of kwargs, filling in defaults"""
+    return {k: kwargs.get(k, default) for k, default in _V4_DEFAULTS.items()}
+
+
+# EnhancedRouter.route() skips NLP for requests with fewer words than this
+_MIN_NLP_WORDS = 4
+
 
 # -------------------------
 # Data Models (v5.0)
 # -------------------------
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedTaskDecision:
     """
     v5.0 Enhanced Task Decision
@@ -106,7 +141,7 @@ class EnhancedTaskDecision:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedRouterOutput:
     """
     v5.0 Enhanced Router Output
@@ -139,63 +174,82 @@ class LazyModelLoader:
     Lazy loading for NLP/ML models
 
     Models are loaded only when first accessed to minimize startup time.
-    Supports caching to avoid reloading.
+    Each one is built once and cached on the instance (cached_property);
+    a load that raises is retried on the next access. With enable_int8,
+    the intent embedding model is dynamically quantized to INT8 on CPU;
+    intent_model swaps its SentenceTransformer backbone (None keeps the
+    default) and backend runs it through ONNX Runtime or OpenVINO instead
+    of torch.
+    use_cache is handed to each model's per-text result cache. bf16 runs
+    an FP32 intent model under BF16 autocast (use with enable_int8=False).
     """
 
-    def __init__(self, model_dir: str = "./models"):
+    def __init__(
+        self,
+        model_dir: str = "./models",
+        enable_int8: bool = True,
+        intent_model: Optional[str] = None,
+        backend: str = "torch",
+        use_cache: bool = True,
+        bf16: bool = False
+    ):
         self.model_dir = Path(model_dir)
-        self._intent_detector: Optional[IntentDetector] = None
-        self._priority_ranker: Optional[PriorityRanker] = None
-        self._text_chunker: Optional[TextChunker] = None
-        self._compressor: Optional[Compressor] = None
+        self.use_cache = use_cache
+        self.bf16 = bf16
+        self.enable_int8 = enable_int8
+        self.intent_model = intent_model
+        self.backend = backend
 
-    @property
+    @cached_property
     def intent_detector(self) -> IntentDetector:
         """Load intent detector on first access"""
-        if self._intent_detector is None:
-            if not NLP_AVAILABLE:
-                raise RuntimeError("NLP modules not available")
-            logger.info("Loading intent detector...")
-            start = time.time()
-            self._intent_detector = IntentDetector()
-            logger.info(f"Intent detector loaded in {time.time() - start:.2f}s")
-        return self._intent_detector
-
-    @property
+        if not NLP_AVAILABLE:
+            raise RuntimeError("NLP modules not available")
+        logger.info("Loading intent detector...")
+        start = time.perf_counter()
+        detector = IntentDetector(
+            cache_dir=str(self.model_dir),
+            enable_int8=self.enable_int8,
+            embedding_model=self.intent_model,
+            backend=self.backend,
+            use_cache=self.use_cache,
+            bf16=self.bf16
+        )
+        logger.info("Intent detector loaded in %.2fs", time.perf_counter() - start)
+        return detector
+
+    @cached_property
     def priority_ranker(self) -> PriorityRanker:
         """Load priority ranker on first access"""
-        if self._priority_ranker is None:
-            if not NLP_AVAILABLE:
-                raise RuntimeError("NLP modules not available")
-            logger.info("Loading priority ranker...")
-            start = time.time()
-            self._priority_ranker = PriorityRanker()
-            logger.info(f"Priority ranker loaded in {time.time() - start:.2f}s")
-        return self._priority_ranker
-
-    @property
+        if not NLP_AVAILABLE:
+            raise RuntimeError("NLP modules not available")
+        logger.info("Loading priority ranker...")
+        start = time.perf_counter()
+        ranker = PriorityRanker(use_cache=self.use_cache)
+        logger.info("Priority ranker loaded in %.2fs", time.perf_counter() - start)
+        return ranker
+
+    @cached_property
     def text_chunker(self) -> TextChunker:
         """Load text chunker on first access"""
-        if self._text_chunker is None:
-            if not NLP_AVAILABLE:
-                raise RuntimeError("NLP modules not available")
-            logger.info("Loading text chunker...")
-            start = time.time()
-            self._text_chunker = TextChunker()
-            logger.info(f"Text chunker loaded in {time.time() - start:.2f}s")
-        return self._text_chunker
-
-    @property
+        if not NLP_AVAILABLE:
+            raise RuntimeError("NLP modules not available")
+        logger.info("Loading text chunker...")
+        start = time.perf_counter()
+        chunker = TextChunker()
+        logger.info("Text chunker loaded in %.2fs", time.perf_counter() - start)
+        return chunker
+
+    @cached_property
     def compressor(self) -> Compressor:
         """Load compressor on first access"""
-        if self._compressor is None:
-            if not NLP_AVAILABLE:
-                raise RuntimeError("NLP modules not available")
-            logger.info("Loading compressor...")
-            start = time.time()
-            self._compressor = Compressor()
-            logger.info(f"Compressor loaded in {time.time() - start:.2f}s")
-        return self._compressor
+        if not NLP_AVAILABLE:
+            raise RuntimeError("NLP modules not available")
+        logger.info("Loading compressor...")
+        start = time.perf_counter()
+        compressor = Compressor(use_cache=self.use_cache)
+        logger.info("Compressor loaded in %.2fs", time.perf_counter() - start)
+        return compressor
 
 
 # -------------------------
@@ -222,7 +276,12 @@ class EnhancedRouter:
         model_dir: str = "./models",
         use_cache: bool = True,
         enable_intent_detect: bool = True,
-        enable_smart_priority: bool = True
+        enable_smart_priority: bool = True,
+        intent_model: Optional[str] = None,
+        nlp_backend: str = "torch",
+        collect_stats: bool = True,
+        bf16: bool = False,
+        min_nlp_chars: int = 0
     ):
         """
         Initialize Enhanced Router
@@ -236,6 +295,15 @@ class EnhancedRouter:
             use_cache: Enable result caching
             enable_intent_detect: Enable intent detection module
             enable_smart_priority: Enable ML priority ranking module
+            intent_model: SentenceTransformer backbone for intent detection
+            nlp_backend: Embedding inference backend ("torch", "onnx", "openvino")
+            collect_stats: Time requests and tasks (processing_time_ms fields
+                and the average in get_stats()); off skips the clock reads
+            bf16: Load the intent model in FP32 (no INT8) and run it under
+                BF16 autocast
+            min_nlp_chars: Requests shorter than this (stripped), or with
+                fewer than _MIN_NLP_WORDS words, go straight to the v4.0 path
+                without loading or running any model; 0 (default) disables
         """
         self.enable_nlp = enable_nlp and NLP_AVAILABLE
         self.enable_compression = enable_compression and NLP_AVAILABLE
@@ -244,21 +312,31 @@ class EnhancedRouter:
         self.use_cache = use_cache
         self.enable_intent_detect = enable_intent_detect and NLP_AVAILABLE
         self.enable_smart_priority = enable_smart_priority and NLP_AVAILABLE
+        self.collect_stats = collect_stats
+        self.min_nlp_chars = min_nlp_chars
 
         # Lazy load models
-        self.loader = LazyModelLoader(model_dir) if NLP_AVAILABLE else None
-
-        # Performance tracking
+        self.loader = LazyModelLoader(
+            model_dir,
+            enable_int8=not bf16,
+            intent_model=intent_model,
+            backend=nlp_backend,
+            use_cache=use_cache,
+            bf16=bf16
+        ) if NLP_AVAILABLE else None
+
+        # Performance tracking (averages are derived in get_stats())
         self.stats = {
             "total_requests": 0,
             "v5_success": 0,
             "v4_fallback": 0,
-            "avg_processing_time_ms": 0.0,
+            "nlp_skipped": 0,
             "avg_token_reduction": 0.0
         }
+        self._total_processing_time_ms = 0.0
 
-        logger.info(f"EnhancedRouter initialized (NLP={self.enable_nlp}, "
-                   f"Compression={self.enable_compression}, Level={self.compression_level})")
+        logger.info("EnhancedRouter initialized (NLP=%s, Compression=%s, Level=%s)",
+                    self.enable_nlp, self.enable_compression, self.compression_level)
 
     def route(
         self,
@@ -275,56 +353,58 @@ class EnhancedRouter:
         Returns:
             EnhancedRouterOutput with tasks and metadata
         """
-        start_time = time.time()
+        if self.collect_stats:
+            start_ns = time.perf_counter_ns()
         self.stats["total_requests"] += 1
 
+        if self._is_trivial(request):
+            # Too short for the models to add anything; v4.0 output as is
+            self.stats["nlp_skipped"] += 1
+            return self._fallback_v4(request, **kwargs)
+
         try:
             # Try v5.0 routing
             result = self._route_v5(request, **kwargs)
             self.stats["v5_success"] += 1
 
-            # Update stats
-            elapsed_ms = (time.time() - start_time) * 1000
-            self.stats["avg_processing_time_ms"] = (
-                (self.stats["avg_processing_time_ms"] * (self.stats["v5_success"] - 1)
-                 + elapsed_ms) / self.stats["v5_success"]
-            )
-
-            result.total_processing_time_ms = elapsed_ms
+            if self.collect_stats:
+                elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+                self._total_processing_time_ms += elapsed_ms
+                result.total_processing_time_ms = elapsed_ms
             return result
 
         except Exception as e:
             if self.fallback_to_v4:
-                logger.warning(f"v5.0 routing failed, falling back to v4.0: {e}")
+                logger.warning("v5.0 routing failed, falling back to v4.0: %s", e)
                 self.stats["v4_fallback"] += 1
                 return self._fallback_v4(request, **kwargs)
             else:
                 raise
 
+    def _is_trivial(self, request: str) -> bool:
+        """True if request is below the min_nlp_chars / _MIN_NLP_WORDS cutoff"""
+        if self.min_nlp_chars <= 0:
+            return False
+        stripped = request.strip()
+        return len(stripped) < self.min_nlp_chars or len(stripped.split()) < _MIN_NLP_WORDS
+
     def _route_v5(self, request: str, **kwargs) -> EnhancedRouterOutput:
         """
         v5.0 routing with NLP/ML enhancements
 
         Flow:
         1. Use v4.0 to split tasks (leverage existing logic)
-        2. Apply v5.0 enhancements per task (PARALLEL PROCESSING):
+        2. Apply v5.0 enhancements (one batched call per model):
            - Intent detection
            - Priority ranking
            - Compression
-        3. Return enhanced results
+        3. Merge the per-task results and return them
         """
         # Step 1: Get base routing from v4.0
         # This handles task splitting, Groq API, etc.
         v4_result = v4.route_text(
             full_text=request,
-            desktop_edit=kwargs.get("desktop_edit", False),
-            economy=kwargs.get("economy", "balanced"),
-            phase=kwargs.get("phase", "implement"),
-            opus_only=kwargs.get("opus_only", False),
-            max_tickets=kwargs.get("max_tickets", 99),
-            merge_spec=kwargs.get("merge_spec", ""),
-            force_split=kwargs.get("force_split", False),
-            min_tickets=kwargs.get("min_tickets", 0)
+            **_v4_kwargs(kwargs)
         )
 
         # M9: Module activation tracking
@@ -335,82 +415,83 @@ class EnhancedRouter:
             "text_chunking": False
         }
 
-        # Step 2: Apply batch NLP processing with PARALLEL EXECUTION (ThreadPoolExecutor)
+        # Step 2: Apply batched NLP processing. Each helper hands the whole
+        # task list to its model at once, so they run back to back rather
+        # than in threads that would only contend for the GIL.
         intent_analyses = []
         priority_scores = []
         chunk_results = {}
 
+        # Chunker and compressor both tokenize every claude_prompt with
+        # tiktoken; count once and hand the counts to both.
+        prompt_tokens = self._count_prompt_tokens(v4_result.tasks)
+
         if self.enable_nlp and self.loader:
-            parallel_start = time.time()
-
-            # Parallel processing with ThreadPoolExecutor (max_workers=3)
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                # Submit parallel tasks (conditionally based on M10/M11 flags)
-                future_intents = None
-                future_priorities = None
-                future_chunks = None
-
-                if self.enable_intent_detect:
-                    future_intents = executor.submit(self._batch_detect_intents, v4_result.tasks)
-
-                if self.enable_smart_priority:
-                    future_priorities = executor.submit(self._batch_rank_priorities, v4_result.tasks)
-
-                # M13: TextChunker in ThreadPoolExecutor
-                future_chunks = executor.submit(self._batch_chunk_texts, v4_result.tasks)
-
-                # Wait for results (blocking)
-                if future_intents:
-                    try:
-                        intent_analyses = future_intents.result(timeout=30)
-                        modules_active["intent_detection"] = True
-                    except Exception as e:
-                        logger.warning(f"Parallel intent detection failed: {e}")
-                        intent_analyses = [None] * len(v4_result.tasks)
-
-                if future_priorities:
-                    try:
-                        priority_scores = future_priorities.result(timeout=30)
-                        modules_active["priority_ranking"] = True
-                    except Exception as e:
-                        logger.warning(f"Parallel priority ranking failed: {e}")
-                        priority_scores = [None] * len(v4_result.tasks)
+            nlp_start_ns = time.perf_counter_ns()
+
+            if self.enable_intent_detect:
+                try:
+                    intent_analyses = self._batch_detect_intents(v4_result.tasks)
+                    modules_active["intent_detection"] = True
+                except Exception as e:
+                    logger.warning("Batch intent detection failed: %s", e)
+                    intent_analyses = [None] * len(v4_result.tasks)
 
+            if self.enable_smart_priority:
                 try:
-                    chunk_results = future_chunks.result(timeout=30)
-                    modules_active["text_chunking"] = True
+                    priority_scores = self._batch_rank_priorities(v4_result.tasks)
+                    modules_active["priority_ranking"] = True
                 except Exception as e:
-                    logger.warning(f"Parallel text chunking failed: {e}")
-                    chunk_results = {}
+                    logger.warning("Batch priority ranking failed: %s", e)
+                    priority_scores = [None] * len(v4_result.tasks)
+
+            # M13: TextChunker
+            try:
+                chunk_results = self._batch_chunk_texts(v4_result.tasks, prompt_tokens)
+                modules_active["text_chunking"] = True
+            except Exception as e:
+                logger.warning("Batch text chunking failed: %s", e)
+                chunk_results = {}
+
+            nlp_time = (time.perf_counter_ns() - nlp_start_ns) / 1e6
+            logger.info("Batched NLP processing completed in %.2fms", nlp_time)
 
-            parallel_time = (time.time() - parallel_start) * 1000
-            logger.info(f"Parallel NLP processing completed in {parallel_time:.2f}ms")
+        # Prompt compression, batched across all tasks
+        compression_results = []
+        if self.enable_compression and self.loader:
+            try:
+                compression_results = self._batch_compress(v4_result.tasks, prompt_tokens)
+            except Exception as e:
+                logger.warning("Batch compression failed: %s", e)
 
         # Fill defaults if modules were disabled
         if not intent_analyses:
             intent_analyses = [None] * len(v4_result.tasks)
         if not priority_scores:
             priority_scores = [None] * len(v4_result.tasks)
+        if not compression_results:
+            compression_results = [None] * len(v4_result.tasks)
 
         # Step 3: Convert v4 tasks to v5 format with enhancements
         enhanced_tasks = []
-        v5_features_used = []
+        v5_features_used = set()
         total_token_reduction = 0.0
 
         for i, v4_task in enumerate(v4_result.tasks):
             intent = intent_analyses[i] if i < len(intent_analyses) else None
             priority = priority_scores[i] if i < len(priority_scores) else None
+            compression = compression_results[i] if i < len(compression_results) else None
 
-            enhanced_task = self._enhance_task(v4_task, intent, priority, **kwargs)
+            enhanced_task = self._enhance_task(v4_task, intent, priority, compression, **kwargs)
             enhanced_tasks.append(enhanced_task)
 
             # Track features used
             if enhanced_task.intent_analysis:
-                v5_features_used.append("intent_detection")
+                v5_features_used.add("intent_detection")
             if enhanced_task.priority_score:
-                v5_features_used.append("smart_priority")
+                v5_features_used.add("smart_priority")
             if enhanced_task.compression_result:
-                v5_features_used.append("compression")
+                v5_features_used.add("compression")
                 total_token_reduction += enhanced_task.compression_result.reduction_rate
 
         # Calculate average token reduction
@@ -423,8 +504,7 @@ class EnhancedRouter:
             modules_active["compression"] = True
 
         # Include modules_active in features used
-        active_modules = [k for k, v in modules_active.items() if v]
-        v5_features_used.extend(active_modules)
+        v5_features_used.update(k for k, v in modules_active.items() if v)
 
         # Step 3: Build enhanced output
         return EnhancedRouterOutput(
@@ -435,12 +515,12 @@ class EnhancedRouter:
             session_guard=v4_result.session_guard,
             tasks=enhanced_tasks,
             token_reduction_rate=avg_token_reduction,
-            v5_features_used=list(set(v5_features_used))  # Deduplicate
+            v5_features_used=sorted(v5_features_used)  # Deterministic order
         )
 
     def _batch_detect_intents(self, v4_tasks: List[v4.TaskDecision]) -> List[Optional[IntentAnalysis]]:
         """
-        Batch intent detection for parallel processing
+        Batch intent detection (one embedding pass for all summaries)
 
         Args:
             v4_tasks: List of v4.0 TaskDecisions
@@ -448,20 +528,15 @@ class EnhancedRouter:
         Returns:
             List of IntentAnalysis (or None on failure)
         """
-        intent_analyses = []
-        for v4_task in v4_tasks:
-            try:
-                intent = self.loader.intent_detector.detect(v4_task.summary)
-                intent_analyses.append(intent)
-            except Exception as e:
-                logger.warning(f"Intent detection failed for task {v4_task.id}: {e}")
-                intent_analyses.append(None)
-
-        return intent_analyses
+        try:
+            return self.loader.intent_detector.batch_detect([t.summary for t in v4_tasks])
+        except Exception as e:
+            logger.warning("Intent detection failed: %s", e)
+            return [None] * len(v4_tasks)
 
     def _batch_rank_priorities(self, v4_tasks: List[v4.TaskDecision]) -> List[Optional[PriorityScore]]:
         """
-        Batch priority ranking for parallel processing
+        Batch priority ranking
 
         Args:
             v4_tasks: List of v4.0 TaskDecisions
@@ -474,14 +549,70 @@ class EnhancedRouter:
             priority_scores = self.loader.priority_ranker.rank(task_summaries)
             return priority_scores
         except Exception as e:
-            logger.warning(f"Priority ranking failed: {e}")
+            logger.warning("Priority ranking failed: %s", e)
             return [None] * len(v4_tasks)
 
+    def _count_prompt_tokens(self, v4_tasks: List[v4.TaskDecision]) -> Optional[List[int]]:
+        """
+        tiktoken counts for every claude_prompt, shared by chunker and compressor
+
+        Returns None (each module counts for itself) unless both run and
+        use the same encoding.
+        """
+        if not (self.enable_nlp and self.enable_compression and self.loader):
+            return None
+        try:
+            encoding = self.loader.compressor.encoding
+            if encoding.name != self.loader.text_chunker.encoding.name:
+                return None
+            return [len(tokens) for tokens in encoding.encode_batch([t.claude_prompt for t in v4_tasks])]
+        except Exception as e:
+            logger.warning("Shared prompt token count failed: %s", e)
+            return None
+
+    def _batch_compress(
+        self,
+        v4_tasks: List[v4.TaskDecision],
+        prompt_tokens: Optional[List[int]] = None
+    ) -> List[Optional[CompressionResult]]:
+        """
+        Batch prompt compression (token counts taken in one batched call)
+
+        Falls back to per-task compression if the batch call fails, so one
+        bad prompt does not cost the others their compression.
+
+        Args:
+            v4_tasks: List of v4.0 TaskDecisions
+            prompt_tokens: Precomputed token count per prompt (or None)
+
+        Returns:
+            List of CompressionResult (or None on failure)
+        """
+        compressor = self.loader.compressor
+        try:
+            return compressor.batch_compress(
+                [t.claude_prompt for t in v4_tasks],
+                level=self.compression_level,
+                original_tokens=prompt_tokens
+            )
+        except Exception as e:
+            logger.warning("Batch compression failed, compressing per task: %s", e)
+
+        results = []
+        for task in v4_tasks:
+            try:
+                results.append(compressor.compress(task.claude_prompt, level=self.compression_level))
+            except Exception as e:
+                logger.warning("Compression failed for task %s: %s", task.id, e)
+                results.append(None)
+        return results
+
     def _enhance_task(
         self,
         v4_task: v4.TaskDecision,
         intent_analysis: Optional[IntentAnalysis],
         priority_score: Optional[PriorityScore],
+        compression_result: Optional[CompressionResult] = None,
         **kwargs
     ) -> EnhancedTaskDecision:
         """
@@ -491,12 +622,14 @@ class EnhancedRouter:
             v4_task: v4.0 TaskDecision
             intent_analysis: Pre-computed intent analysis (or None)
             priority_score: Pre-computed priority score (or None)
+            compression_result: Pre-computed prompt compression (or None)
             **kwargs: Configuration flags
 
         Returns:
             EnhancedTaskDecision with NLP/ML metadata
         """
-        task_start = time.time()
+        if self.collect_stats:
+            task_start_ns = time.perf_counter_ns()
 
         # Convert v4 task to v5 format
         enhanced = EnhancedTaskDecision(
@@ -533,23 +666,16 @@ class EnhancedRouter:
             enhanced.priority = priority_score.priority
             enhanced.confidence = max(enhanced.confidence, priority_score.ml_confidence)
 
-        if self.enable_compression and self.loader:
-            # Prompt compression
-            try:
-                compression_result = self.loader.compressor.compress(
-                    v4_task.claude_prompt,
-                    level=self.compression_level
-                )
-                enhanced.compression_result = compression_result
-
-                # Update prompt with compressed version
-                enhanced.claude_prompt = compression_result.compressed
+        # Apply compression result if available
+        if compression_result:
+            enhanced.compression_result = compression_result
 
-            except Exception as e:
-                logger.warning(f"Compression failed for task {v4_task.id}: {e}")
+            # Update prompt with compressed version
+            enhanced.claude_prompt = compression_result.compressed
 
         # Calculate processing time
-        enhanced.processing_time_ms = (time.time() - task_start) * 1000
+        if self.collect_stats:
+            enhanced.processing_time_ms = (time.perf_counter_ns() - task_start_ns) / 1e6
 
         return enhanced
 
@@ -569,14 +695,17 @@ class EnhancedRouter:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, lambda: self.route(request, **kwargs))
 
-    def _batch_chunk_texts(self, v4_tasks: List[v4.TaskDecision]) -> Dict[str, List[str]]:
+    def _batch_chunk_texts(
+        self,
+        v4_tasks: List[v4.TaskDecision],
+        prompt_tokens: Optional[List[int]] = None
+    ) -> Dict[str, List[str]]:
         """
         Batch chunk task prompts using TextChunker.
 
-        Runs in ThreadPoolExecutor alongside intent detection and priority ranking.
-
         Args:
             v4_tasks: List of v4.0 TaskDecisions
+            prompt_tokens: Precomputed token count per prompt (or None)
 
         Returns:
             Dict mapping task ID to list of chunked text segments
@@ -586,12 +715,16 @@ class EnhancedRouter:
             return results
 
         chunker = self.loader.text_chunker
-        for task in v4_tasks:
+        for i, task in enumerate(v4_tasks):
             try:
-                chunks = chunker.chunk(task.claude_prompt, max_tokens=500)
+                chunks = chunker.chunk(
+                    task.claude_prompt,
+                    max_tokens=500,
+                    total_tokens=prompt_tokens[i] if prompt_tokens else None
+                )
                 results[task.id] = chunks
             except Exception as e:
-                logger.warning(f"Chunking failed for task {task.id}: {e}")
+                logger.warning("Chunking failed for task %s: %s", task.id, e)
                 results[task.id] = [task.claude_prompt]
 
         return results
@@ -609,14 +742,7 @@ class EnhancedRouter:
         """
         v4_result = v4.route_text(
             full_text=request,
-            desktop_edit=kwargs.get("desktop_edit", False),
-            economy=kwargs.get("economy", "balanced"),
-            phase=kwargs.get("phase", "implement"),
-            opus_only=kwargs.get("opus_only", False),
-            max_tickets=kwargs.get("max_tickets", 99),
-            merge_spec=kwargs.get("merge_spec", ""),
-            force_split=kwargs.get("force_split", False),
-            min_tickets=kwargs.get("min_tickets", 0)
+            **_v4_kwargs(kwargs)
         )
 
         # Convert v4 tasks to v5 format (without enhancements)
@@ -648,7 +774,12 @@ class EnhancedRouter:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        stats["avg_processing_time_ms"] = (
+            self._total_processing_time_ms / stats["v5_success"]
+            if stats["v5_success"] else 0.0
+        )
+        return stats
 
 
 # -------------------------
@@ -684,11 +815,11 @@ def format_output_for_v4_compat(result: EnhancedRouterOutput, include_v5_fields:
         # Include v5.0 fields only if requested
         if include_v5_fields:
             if task.intent_analysis:
-                task_dict["intent_analysis"] = asdict(task.intent_analysis)
+                task_dict["intent_analysis"] = task.intent_analysis.as_plain_dict()
             if task.priority_score:
-                task_dict["priority_score"] = asdict(task.priority_score)
+                task_dict["priority_score"] = task.priority_score.as_plain_dict()
             if task.compression_result:
-                task_dict["compression_result"] = asdict(task.compression_result)
+                task_dict["compression_result"] = task.compression_result.as_plain_dict()
             task_dict["processing_time_ms"] = task.processing_time_ms
             task_dict["v5_enabled"] = task.v5_enabled
 
@@ -717,54 +848,85 @@ def format_output_for_v4_compat(result: EnhancedRouterOutput, include_v5_fields:
 # CLI Entry Point (v5.0)
 # -------------------------
 
+_V5_SIMPLE_FLAGS = frozenset({
+    "--v5", "--enable-v5", "--compress", "--show-stats",
+    "--fallback-v4", "--no-fallback", "--no-cache", "--intent-detect", "--smart-priority",
+    "--bf16",
+})
+_V5_VALUE_FLAGS = frozenset({"--compression-level", "--intent-model", "--nlp-backend", "--min-nlp-chars"})
+_NLP_BACKENDS = ("torch", "onnx", "openvino")
+
+
+def parse_args(args: List[str]) -> Tuple[set, Dict[str, str], List[str], List[str]]:
+    """
+    Split argv in one pass into v5 flags, v5 values, v4 args and request words
+
+    v4 args are every token that is not a v5 flag (passed to v4.main() as
+    is); request words are what remains after also dropping v4 flags and
+    their values. A value flag takes the next token; the first occurrence
+    wins.
+    """
+    flags: set = set()
+    values: Dict[str, str] = {}
+    v4_args: List[str] = []
+    request_parts: List[str] = []
+    it = iter(args)
+    for a in it:
+        if a in _V5_SIMPLE_FLAGS:
+            flags.add(a)
+        elif a in _V5_VALUE_FLAGS:
+            val = next(it, None)
+            if val is not None:
+                values.setdefault(a, val)
+        else:
+            v4_args.append(a)
+            if a in v4._VALUE_FLAGS:
+                val = next(it, None)
+                if val is not None:
+                    v4_args.append(val)
+            elif a not in v4._SIMPLE_FLAGS:
+                request_parts.append(a)
+    return flags, values, v4_args, request_parts
+
+
 def main():
     """
     CLI entry point for v5.0 router
 
     Supports all v4.0 flags plus new v5.0 flags
     """
-    # Parse v5.0 specific flags from argv
-    args = sys.argv[1:]
+    flags, values, args, request_parts = parse_args(sys.argv[1:])
 
-    v5_enabled = "--v5" in args or "--enable-v5" in args
-    enable_compression = "--compress" in args or v5_enabled
-    compression_level = 2  # Default
-    show_stats = "--show-stats" in args
-    fallback_v4 = "--no-fallback" not in args
-    no_cache = "--no-cache" in args
+    v5_enabled = "--v5" in flags or "--enable-v5" in flags
+    enable_compression = "--compress" in flags or v5_enabled
+    show_stats = "--show-stats" in flags
+    fallback_v4 = "--no-fallback" not in flags
+    no_cache = "--no-cache" in flags
 
     # M10/M11: Individual module toggle flags
-    intent_detect = "--intent-detect" in args or v5_enabled
-    smart_priority = "--smart-priority" in args or v5_enabled
+    intent_detect = "--intent-detect" in flags or v5_enabled
+    smart_priority = "--smart-priority" in flags or v5_enabled
 
-    # Parse compression level (flag with value)
-    for i, arg in enumerate(args):
-            try:
-                compression_level = int(args[i + 1])
-                compression_level = max(1, min(3, compression_level))  # Clamp to 1-3
-            except ValueError:
-                logger.warning(f"Invalid compression level: {args[i + 1]}, using default (2)")
-
-    # Strip all v5 flags (simple flags and value flags) to isolate the request text
-    v5_simple_flags = {
-        "--v5", "--enable-v5", "--compress", "--show-stats",
-        "--fallback-v4", "--no-fallback", "--no-cache", "--intent-detect", "--smart-priority",
-    }
-    v5_value_flags = {"--compression-level"}
-
-    cleaned = []
-    skip_next = False
-    for i, arg in enumerate(args):
-        if skip_next:
-            skip_next = False
-            continue
-        if arg in v5_simple_flags:
-            continue
-        if arg in v5_value_flags:
-            skip_next = True
-            continue
-        cleaned.append(arg)
-    args = cleaned
+    compression_level = 2  # Default
+    if "--compression-level" in values:
+        try:
+            compression_level = max(1, min(3, int(values["--compression-level"])))  # Clamp to 1-3
+        except ValueError:
+            logger.warning("Invalid compression level: %s, using default (2)", values["--compression-level"])
+
+    intent_model = values.get("--intent-model")
+
+    nlp_backend = values.get("--nlp-backend", "torch")
+    if nlp_backend not in _NLP_BACKENDS:
+        logger.warning("Invalid --nlp-backend, using default (torch)")
+        nlp_backend = "torch"
+
+    min_nlp_chars = 0  # Default (off)
+    if "--min-nlp-chars" in values:
+        try:
+            min_nlp_chars = max(0, int(values["--min-nlp-chars"]))
+        except ValueError:
+            logger.warning("Invalid --min-nlp-chars: %s, using default (0)", values["--min-nlp-chars"])
 
     # Check if NLP is available
     if v5_enabled and not NLP_AVAILABLE:
@@ -788,7 +950,12 @@ def main():
         fallback_to_v4=fallback_v4,
         use_cache=not no_cache,
         enable_intent_detect=intent_detect,
-        enable_smart_priority=smart_priority
+        enable_smart_priority=smart_priority,
+        intent_model=intent_model,
+        nlp_backend=nlp_backend,
+        collect_stats=show_stats,
+        bf16="--bf16" in flags,
+        min_nlp_chars=min_nlp_chars
     )
 
     # Get request from remaining args (after stripping v5 flags)
@@ -797,29 +964,6 @@ def main():
         print("Run with --help for full documentation.", file=sys.stderr)
         sys.exit(1)
 
-    # v4 flags are still in args — strip them too and join remainder as request
-    v4_simple_flags = {
-        "--json", "--desktop-edit", "--opus-only", "--tickets-md",
-        "--friendly", "--force-split",
-    }
-    v4_value_flags = {
-        "--economy", "--phase", "--one-task", "--save-tickets",
-        "--max-tickets", "--min-tickets", "--merge",
-    }
-
-    request_parts = []
-    skip_next = False
-    for i, arg in enumerate(args):
-        if skip_next:
-            skip_next = False
-            continue
-        if arg in v4_simple_flags:
-            continue
-        if arg in v4_value_flags:
-            skip_next = True
-            continue
-        request_parts.append(arg)
-
     request = " ".join(request_parts) if request_parts else args[-1]
 
     # Route request
@@ -828,7 +972,10 @@ def main():
     # Output results (v4.0 compatible format)
     # Format output based on --show-stats flag
     output = format_output_for_v4_compat(result, include_v5_fields=show_stats)
-    print(json.dumps(output, indent=2, ensure_ascii=False))
+    if orjson is not None:
+        print(orjson.dumps(output, option=orjson.OPT_INDENT_2).decode("utf-8"))
+    else:
+        print(json.dumps(output, indent=2, ensure_ascii=False))
 
     # Show stats if requested
     if show_stats:
@@ -837,6 +984,7 @@ def main():
         print(f"Total requests: {stats['total_requests']}", file=sys.stderr)
         print(f"v5 success: {stats['v5_success']}", file=sys.stderr)
         print(f"v4 fallback: {stats['v4_fallback']}", file=sys.stderr)
+        print(f"NLP skipped (short input): {stats['nlp_skipped']}", file=sys.stderr)
         print(f"Avg processing time: {stats['avg_processing_time_ms']:.2f}ms", file=sys.stderr)
         print(f"Avg token reduction: {result.token_reduction_rate * 100:.1f}%", file=sys.stderr)
 
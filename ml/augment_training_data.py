@@ -4,9 +4,15 @@ Training Data Augmentation Script
 Adds samples to balance urgency/importance distribution.
 """
 
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml.dataset import (
+    SCORE_AXES, TRAINING_DATA_FILE, append_samples, count_samples, dedup_samples, iter_samples,
+    score_histograms,
+)
+
 # Additional samples to balance distribution
 ADDITIONAL_SAMPLES = [
     # urgency=1 (극히 낮은 긴급도) - 6개 추가
@@ -96,40 +102,34 @@ ADDITIONAL_SAMPLES = [
     {"text": "중요: 알림 시스템 구축", "urgency": 6, "importance": 7},
 ]
 
+
 def main():
-    # Load existing data
-    data_file = Path("ml/training_data.json")
-    with open(data_file) as f:
-        existing_data = json.load(f)
+    # Existing samples are streamed (hashed for dedup and counted), never held in memory
+    data_file = TRAINING_DATA_FILE
+    existing_count = count_samples(data_file)
 
-    print(f"Existing samples: {len(existing_data)}")
+    print(f"Existing samples: {existing_count}")
 
-    # Add new samples
-    augmented_data = existing_data + ADDITIONAL_SAMPLES
+    # Add new samples (skipping ones already present, so re-runs don't duplicate)
+    new_samples = dedup_samples(iter_samples(data_file), ADDITIONAL_SAMPLES)
+    total = existing_count + len(new_samples)
 
-    print(f"New samples: {len(ADDITIONAL_SAMPLES)}")
-    print(f"Total samples: {len(augmented_data)}")
+    print(f"New samples: {len(new_samples)} ({len(ADDITIONAL_SAMPLES) - len(new_samples)} duplicates skipped)")
+    print(f"Total samples: {total}")
 
-    # Save augmented data
-    with open(data_file, "w", encoding="utf-8") as f:
-        json.dump(augmented_data, f, indent=2, ensure_ascii=False)
+    # Append-only write: existing lines are never rewritten
+    append_samples(new_samples, data_file)
 
     print(f"\n✅ Training data augmented and saved to {data_file}")
 
     # Show new distribution
-    from collections import Counter
-    urgency_dist = Counter(item["urgency"] for item in augmented_data)
-    importance_dist = Counter(item["importance"] for item in augmented_data)
-
-    print("\nNew Urgency distribution:")
-    for i in range(1, 11):
-        count = urgency_dist.get(i, 0)
-        print(f"  {i}: {count:2d} samples")
-
-    print("\nNew Importance distribution:")
-    for i in range(1, 11):
-        count = importance_dist.get(i, 0)
-        print(f"  {i}: {count:2d} samples")
+    # One streamed pass over the file, bincount per axis
+    hists = score_histograms(iter_samples(data_file))
+
+    for axis in SCORE_AXES:
+        print(f"\nNew {axis.capitalize()} distribution:")
+        for i in range(1, 11):
+            print(f"  {i}: {hists[axis][i]:2d} samples")
 
 if __name__ == "__main__":
     main()
@@ -4,9 +4,15 @@ Training Data Augmentation Script v2
 Adds 60+ more samples to reach 200 total.
 """
 
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml.dataset import (
+    SCORE_AXES, TRAINING_DATA_FILE, append_samples, count_samples, dedup_samples, iter_samples,
+    score_histograms,
+)
+
 # Additional 60 samples for better distribution
 ADDITIONAL_SAMPLES_V2 = [
     # urgency=1, importance varied
@@ -130,52 +136,42 @@ ADDITIONAL_SAMPLES_V2 = [
     {"text": "결제 시스템 구현", "urgency": 7, "importance": 10},
 ]
 
+
 def main():
-    # Load existing data
-    data_file = Path("ml/training_data.json")
-    with open(data_file) as f:
-        existing_data = json.load(f)
+    # Existing samples are streamed (hashed for dedup and counted), never held in memory
+    data_file = TRAINING_DATA_FILE
+    existing_count = count_samples(data_file)
 
-    print(f"Current samples: {len(existing_data)}")
+    print(f"Current samples: {existing_count}")
 
-    # Add new samples
-    augmented_data = existing_data + ADDITIONAL_SAMPLES_V2
+    # Add new samples (skipping ones already present, so re-runs don't duplicate)
+    new_samples = dedup_samples(iter_samples(data_file), ADDITIONAL_SAMPLES_V2)
+    total = existing_count + len(new_samples)
 
-    print(f"Adding: {len(ADDITIONAL_SAMPLES_V2)} new samples")
-    print(f"Total samples: {len(augmented_data)}")
+    print(f"Adding: {len(new_samples)} new samples ({len(ADDITIONAL_SAMPLES_V2) - len(new_samples)} duplicates skipped)")
+    print(f"Total samples: {total}")
 
-    # Save augmented data
-    with open(data_file, "w", encoding="utf-8") as f:
-        json.dump(augmented_data, f, indent=2, ensure_ascii=False)
+    # Append-only write: existing lines are never rewritten
+    append_samples(new_samples, data_file)
 
-    print(f"\n✅ Training data augmented to {len(augmented_data)} samples")
+    print(f"\n✅ Training data augmented to {total} samples")
 
     # Show distribution
-    from collections import Counter
-    urgency_dist = Counter(item["urgency"] for item in augmented_data)
-    importance_dist = Counter(item["importance"] for item in augmented_data)
-
-    print("\n📊 Urgency distribution:")
-    for i in range(1, 11):
-        count = urgency_dist.get(i, 0)
-        bar = "█" * (count // 2)
-        print(f"  {i:2d}: {count:3d} {bar}")
-
-    print("\n📊 Importance distribution:")
-    for i in range(1, 11):
-        count = importance_dist.get(i, 0)
-        bar = "█" * (count // 2)
-        print(f"  {i:2d}: {count:3d} {bar}")
-
-    # Calculate balance
-    min_urgency = min(urgency_dist.values())
-    max_urgency = max(urgency_dist.values())
-    min_importance = min(importance_dist.values())
-    max_importance = max(importance_dist.values())
+    # One streamed pass over the file, bincount per axis
+    hists = score_histograms(iter_samples(data_file))
+
+    for axis in SCORE_AXES:
+        print(f"\n📊 {axis.capitalize()} distribution:")
+        for i in range(1, 11):
+            count = hists[axis][i]
+            bar = "█" * (count // 2)
+            print(f"  {i:2d}: {count:3d} {bar}")
 
+    # Calculate balance (over the classes that have samples)
     print(f"\n📈 Balance:")
-    print(f"  Urgency: {min_urgency}-{max_urgency} samples per class")
-    print(f"  Importance: {min_importance}-{max_importance} samples per class")
+    for axis in SCORE_AXES:
+        counts = [c for c in hists[axis] if c]
+        print(f"  {axis.capitalize()}: {min(counts)}-{max(counts)} samples per class")
 
 if __name__ == "__main__":
     main()
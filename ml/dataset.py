@@ -0,0 +1,160 @@
+"""
+Training Data Storage
+Priority-model samples live in ml/training_data.jsonl, one
+{"text", "urgency", "importance", ...} record per line, so adding samples
+is an append and readers can stream without loading the whole file.
+dedup_samples() drops candidates already present, by content hash.
+
+A legacy ml/training_data.json array is converted to JSONL once, the
+first time any of these helpers touches the file. orjson is used for
+(de)serialization, blake3 for sample hashes and numpy for score
+histograms when installed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+try:
+    import orjson  # optional: faster JSON for sample files and GPT-4 responses
+except ImportError:
+    orjson = None
+
+try:
+    import blake3  # optional: faster than md5 for sample hashing
+except ImportError:
+    blake3 = None
+
+try:
+    import numpy as np  # optional: bincount for score histograms
+except ImportError:
+    np = None
+
+TRAINING_DATA_FILE = str(Path(__file__).parent / "training_data.jsonl")
+SCORE_AXES = ("urgency", "importance")
+
+
+def dumps(obj: Any) -> str:
+    """Compact single-line JSON (UTF-8 text, not ASCII-escaped)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def loads(raw):
+    """Parse JSON from str or bytes; raises ValueError on bad input."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Write obj as an indented JSON document (for human-reviewed files)."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def migrate_legacy(path: str = TRAINING_DATA_FILE) -> None:
+    """Convert a legacy training_data.json array to JSONL once, if no JSONL file exists."""
+    legacy = os.path.splitext(path)[0] + ".json"
+    if legacy == path or os.path.exists(path):
+        return
+    try:
+        with open(legacy, "rb") as f:
+            data = loads(f.read())
+    except (ValueError, OSError):
+        return
+    if not isinstance(data, list):
+        return
+    tmp_file = path + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.writelines(dumps(s) + "\n" for s in data)
+    os.replace(tmp_file, path)
+
+
+def iter_samples(path: str = TRAINING_DATA_FILE) -> Iterator[Dict]:
+    """Stream samples one line at a time (skips blank and torn lines)."""
+    migrate_legacy(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def load_samples(path: str = TRAINING_DATA_FILE) -> List[Dict]:
+    """All samples as a list (for training, which needs them in memory anyway)."""
+    return list(iter_samples(path))
+
+
+def count_samples(path: str = TRAINING_DATA_FILE) -> int:
+    """Number of samples, counted by line without parsing them."""
+    migrate_legacy(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+    except FileNotFoundError:
+        return 0
+
+
+def append_samples(samples: Iterable[Dict], path: str = TRAINING_DATA_FILE) -> int:
+    """Append samples to the JSONL file (streamed); returns how many were written."""
+    migrate_legacy(path)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for s in samples:
+            f.write(dumps(s) + "\n")
+            written += 1
+    return written
+
+
+def score_histograms(samples: Iterable[Dict]) -> Dict[str, List[int]]:
+    """Counts per score for each axis in SCORE_AXES, indexed by score (0-10), in one pass."""
+    if np is not None:
+        scores = np.fromiter(
+            ((s["urgency"], s["importance"]) for s in samples),
+            dtype=np.dtype((np.int8, 2)),
+        )
+        return {
+            axis: np.bincount(scores[:, col], minlength=11).tolist()
+            for col, axis in enumerate(SCORE_AXES)
+        }
+    hists = {axis: [0] * 11 for axis in SCORE_AXES}
+    for s in samples:
+        for axis in SCORE_AXES:
+            hists[axis][s[axis]] += 1
+    return hists
+
+
+def _sample_digest(sample: Dict) -> bytes:
+    """Hash of a sample's canonical JSON (sorted keys), for exact dedup."""
+    if orjson is not None:
+        data = orjson.dumps(sample, option=orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(sample, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    if blake3 is not None:
+        return blake3.blake3(data).digest()
+    return hashlib.md5(data).digest()
+
+
+def dedup_samples(existing: Iterable[Dict], candidates: Iterable[Dict]) -> List[Dict]:
+    """Candidates whose exact content is not already in existing (or earlier in candidates)."""
+    seen = {_sample_digest(s) for s in existing}
+    new_samples = []
+    for sample in candidates:
+        digest = _sample_digest(sample)
+        if digest not in seen:
+            seen.add(digest)
+            new_samples.append(sample)
+    return new_samples
@@ -9,9 +9,12 @@ Usage:
 """
 
 import os
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml.dataset import loads, write_json
+
 try:
     import openai
 except ImportError:
@@ -74,7 +77,7 @@ Output JSON array:
         elif "```" in content:
             content = content.split("```")[1].split("```")[0]
 
-        samples = json.loads(content.strip())
+        samples = loads(content.strip())
 
         print("✅ Generated samples:\n")
         for i, sample in enumerate(samples, 1):
@@ -83,8 +86,7 @@ Output JSON array:
 
         # Save
         output_file = Path("ml/demo_samples.json")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(samples, f, indent=2, ensure_ascii=False)
+        write_json(output_file, samples)
 
         print(f"✅ Saved to {output_file}")
         print("\n📊 Quality looks good? Run full generation:")
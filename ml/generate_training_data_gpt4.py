@@ -5,17 +5,31 @@ Generates 500 high-quality labeled samples for urgency/importance prediction.
 
 Usage:
     export OPENAI_API_KEY="your-key"
-    python ml/generate_training_data_gpt4.py
+    python ml/generate_training_data_gpt4.py [--no-cache]
 
 Output:
-    ml/training_data_gpt4.json (500 new samples)
+    ml/training_data_gpt4.jsonl (500 new samples, appended batch by batch;
+    a re-run resumes from the samples already in the file)
+
+GPT-4 responses are cached in ml/.gpt4_cache/ by prompt hash, so
+regenerating the same batches costs nothing; --no-cache bypasses it.
 """
 
 import os
-import json
-import time
+import re
+import hashlib
+import sys
+import asyncio
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, TypedDict, Union
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml.dataset import (
+    SCORE_AXES, TRAINING_DATA_FILE, append_samples, count_samples, dumps, iter_samples, loads,
+    score_histograms,
+)
+
+GPT4_OUTPUT_FILE = str(Path(__file__).parent / "training_data_gpt4.jsonl")
 
 try:
     import openai
@@ -24,6 +38,35 @@ except ImportError:
     print("Install: pip install openai")
     exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("❌ numpy package not installed")
+    print("Install: pip install numpy")
+    exit(1)
+
+try:
+    import blake3  # optional: faster than md5 for cache keys
+except ImportError:
+    blake3 = None
+
+try:
+    import msgspec  # optional: schema-checked parsing of GPT-4 responses
+except ImportError:
+    msgspec = None
+
+try:
+    from datasketch import MinHash, MinHashLSH  # optional: near-duplicate filtering
+except ImportError:
+    MinHash = MinHashLSH = None
+
+GPT4_MODEL = "gpt-4"
+GPT4_CACHE_DIR = Path(__file__).parent / ".gpt4_cache"
+
+# Concurrent GPT-4 requests (keep under the account's rate limit; the
+# client retries 429s on its own)
+MAX_CONCURRENT_REQUESTS = 10
+
 # Categories for diverse samples
 CATEGORIES = [
     ("security", "Security vulnerabilities, authentication, encryption"),
@@ -38,28 +81,110 @@ CATEGORIES = [
     ("maintenance", "Dependency updates, cleanup"),
 ]
 
-# Urgency/Importance combinations (balanced distribution)
-SCORE_DISTRIBUTION = [
+# Urgency/Importance combinations (balanced distribution): (pairs, repeats)
+_SCORE_BUCKETS = [
     # High urgency, high importance (10%)
-    *[(9, 10), (10, 10), (10, 9), (9, 9)] * 13,
+    ([(9, 10), (10, 10), (10, 9), (9, 9)], 13),
     # High urgency, medium/low importance (10%)
-    *[(9, 5), (10, 6), (8, 4), (9, 3)] * 13,
+    ([(9, 5), (10, 6), (8, 4), (9, 3)], 13),
     # Medium urgency, high importance (20%)
-    *[(5, 10), (6, 9), (5, 8), (6, 10)] * 25,
+    ([(5, 10), (6, 9), (5, 8), (6, 10)], 25),
     # Medium urgency, medium importance (30%)
-    *[(5, 5), (6, 6), (5, 6), (6, 5), (4, 5), (5, 4)] * 25,
+    ([(5, 5), (6, 6), (5, 6), (6, 5), (4, 5), (5, 4)], 25),
     # Low urgency, any importance (20%)
-    *[(2, 3), (1, 2), (3, 4), (2, 5), (1, 1), (3, 2)] * 17,
+    ([(2, 3), (1, 2), (3, 4), (2, 5), (1, 1), (3, 2)], 17),
     # Any urgency, low importance (10%)
-    *[(4, 2), (5, 1), (6, 3), (7, 2)] * 13,
+    ([(4, 2), (5, 1), (6, 3), (7, 2)], 13),
 ]
 
+# (N, 2) int8 array of (urgency, importance) rows, one contiguous block
+SCORE_DISTRIBUTION = np.concatenate([
+    np.tile(np.array(pairs, dtype=np.int8), (repeats, 1))
+    for pairs, repeats in _SCORE_BUCKETS
+])
+
+
+class _SampleOptional(TypedDict, total=False):
+    category: str
+
 
-def generate_batch_prompt(category: str, description: str, num_samples: int = 10) -> str:
-    """Generate GPT-4 prompt for a batch of samples."""
+class Sample(_SampleOptional):
+    """One generated sample; msgspec checks this schema while decoding."""
+    text: str
+    urgency: int
+    importance: int
+
+
+REQUIRED_FIELDS = {"text", "urgency", "importance"}
+
+
+def validate_samples(samples: List[Dict]) -> List[Dict]:
+    """
+    Samples (as returned by parse_gpt_response) with both scores in 1-10.
+
+    The range check runs on an (N, 2) score array in one vectorized
+    pass; a batch with non-numeric scores raises TypeError.
+    """
+    if not samples:
+        return []
+    scores = np.array([(s["urgency"], s["importance"]) for s in samples])
+    if scores.dtype.kind not in "biuf":
+        raise TypeError(f"non-numeric urgency/importance in batch ({scores.dtype})")
+    in_range = ((scores >= 1) & (scores <= 10)).all(axis=1)
+    return [s for s, ok in zip(samples, in_range) if ok]
+
+
+_HANGUL = re.compile(r"[\uac00-\ud7a3]")
+
+
+def _shingles(text: str) -> set:
+    """Lowercased word tokens; character 3-grams for Korean (not space-delimited)."""
+    text = " ".join(text.lower().split())
+    if _HANGUL.search(text):
+        return {text[i:i + 3] for i in range(max(1, len(text) - 2))}
+    return set(text.split())
+
+
+class NearDuplicateFilter:
+    """
+    Rejects texts whose MinHash Jaccard estimate against an earlier text
+    reaches threshold (MinHashLSH). Without datasketch it only rejects
+    exact repeats after case/whitespace normalization.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64):
+        self.num_perm = num_perm
+        self._lsh = MinHashLSH(threshold=threshold, num_perm=num_perm) if MinHashLSH else None
+        self._seen = set()
+        self._inserted = 0
+        self.dropped = 0
+
+    def add(self, text: str) -> bool:
+        """Remember text and return True, or return False if it is a near-duplicate."""
+        if self._lsh is None:
+            key = " ".join(text.lower().split())
+            if key in self._seen:
+                self.dropped += 1
+                return False
+            self._seen.add(key)
+            return True
+        mh = MinHash(num_perm=self.num_perm)
+        for shingle in _shingles(text):
+            mh.update(shingle.encode("utf-8"))
+        if self._lsh.query(mh):
+            self.dropped += 1
+            return False
+        self._lsh.insert(str(self._inserted), mh)
+        self._inserted += 1
+        return True
+
+
+def generate_batch_prompt(category: str, description: str, num_samples: int = 10, batch: int = 0) -> str:
+    """Generate GPT-4 prompt for a batch of samples (batch keeps cached prompts distinct)."""
     return f"""You are a project management expert. Generate {num_samples} diverse task descriptions for software development.
 
 Category: {category} ({description})
+Batch: {batch + 1} (make these tasks different from the other batches)
 
 Requirements:
 1. Generate exactly {num_samples} tasks in JSON format
@@ -89,25 +214,53 @@ Examples:
 Generate diverse, realistic tasks:"""
 
 
-def call_gpt4(prompt: str, api_key: str) -> str:
-    """Call GPT-4 API."""
-    client = openai.OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that generates training data in JSON format."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.9,  # High creativity
-        max_tokens=2000
-    )
-
-    return response.choices[0].message.content
+def _cache_path(prompt: str) -> Path:
+    """Cache file for a prompt's response, keyed by a hash of model + prompt."""
+    data = f"{GPT4_MODEL}\n{prompt}".encode("utf-8")
+    key = blake3.blake3(data).hexdigest() if blake3 is not None else hashlib.md5(data).hexdigest()
+    return GPT4_CACHE_DIR / f"{key}.txt"
+
+
+async def call_gpt4_async(
+    client: "openai.AsyncOpenAI", prompt: str, sem: asyncio.Semaphore, use_cache: bool = True
+) -> str:
+    """Call GPT-4 API, holding one of the semaphore's slots for the request.
+
+    With use_cache, a response already stored for this prompt is returned
+    without a request, and new responses are stored for later runs.
+    """
+    cache_file = _cache_path(prompt) if use_cache else None
+    if cache_file is not None and cache_file.exists():
+        return cache_file.read_text(encoding="utf-8")
+
+    async with sem:
+        response = await client.chat.completions.create(
+            model=GPT4_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that generates training data in JSON format."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.9,  # High creativity
+            max_tokens=2000
+        )
+
+    content = response.choices[0].message.content
+    if cache_file is not None and content:
+        GPT4_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(content, encoding="utf-8")
+        os.replace(tmp_file, cache_file)
+    return content
 
 
 def parse_gpt_response(response: str) -> List[Dict]:
-    """Parse GPT-4 JSON response."""
+    """
+    Parse GPT-4 JSON response into Sample dicts.
+
+    With msgspec, decoding and the Sample schema check (required fields,
+    str/int types) are one call, and a response that breaks the schema is
+    rejected whole. Without it, entries missing a required field are dropped.
+    """
     # Extract JSON from response (might be wrapped in markdown)
     if "```json" in response:
         response = response.split("```json")[1].split("```")[0]
@@ -116,17 +269,43 @@ def parse_gpt_response(response: str) -> List[Dict]:
 
     response = response.strip()
 
-    try:
-        data = json.loads(response)
+    if msgspec is not None:
+        try:
+            data = msgspec.json.decode(response, type=Union[List[Sample], Sample])
+        except msgspec.ValidationError as e:
+            print(f"⚠️ Sample schema error: {e}")
+            return []
+        except msgspec.DecodeError as e:
+            print(f"⚠️ JSON parse error: {e}")
+            print(f"Response: {response[:200]}...")
+            return []
         return data if isinstance(data, list) else [data]
-    except json.JSONDecodeError as e:
+
+    try:
+        data = loads(response)
+    except ValueError as e:
         print(f"⚠️ JSON parse error: {e}")
         print(f"Response: {response[:200]}...")
         return []
+    data = data if isinstance(data, list) else [data]
+    return [s for s in data if isinstance(s, dict) and REQUIRED_FIELDS <= s.keys()]
 
 
-def generate_samples(target_count: int = 500) -> List[Dict]:
-    """Generate training samples using GPT-4."""
+async def generate_samples(
+    target_count: int = 500, output_file: str = GPT4_OUTPUT_FILE, use_cache: bool = True
+) -> int:
+    """Generate training samples using GPT-4, appending them to output_file.
+
+    All batches are issued at once and run MAX_CONCURRENT_REQUESTS at a
+    time; batches still queued when target_count is reached are cancelled.
+    Each validated batch is written and flushed as it arrives, so a crash
+    loses at most the batches in flight, and samples already in the file
+    count toward target_count. Returns the number of samples in the file.
+
+    Cached responses are replayed into an empty output file. When resuming,
+    each category's batch numbering starts after its cached batches, since
+    those samples are already in the file.
+    """
     api_key = os.environ.get("OPENAI_API_KEY")
 
     if not api_key:
@@ -134,70 +313,85 @@ def generate_samples(target_count: int = 500) -> List[Dict]:
         print("Set it: export OPENAI_API_KEY='your-key'")
         exit(1)
 
-    all_samples = []
-    batches_per_category = target_count // len(CATEGORIES) // 10 + 1
-
-    print(f"\n🚀 Generating {target_count} samples using GPT-4...")
+    written = count_samples(output_file)
+    if written >= target_count:
+        print(f"\n✅ {output_file} already has {written} samples (delete it to start over)")
+        return written
+    remaining = target_count - written
+    batches_per_category = remaining // len(CATEGORIES) // 10 + 1
+
+    first_batch = {category: 0 for category, _ in CATEGORIES}
+    if written and use_cache:
+        for category, description in CATEGORIES:
+            while _cache_path(generate_batch_prompt(category, description, 10, first_batch[category])).exists():
+                first_batch[category] += 1
+
+    if written:
+        print(f"\n↩️  Resuming: {written} samples already in {output_file}")
+    print(f"\n🚀 Generating {remaining} samples using GPT-4...")
     print(f"Categories: {len(CATEGORIES)}")
-    print(f"Batches per category: {batches_per_category}\n")
-
-    for category, description in CATEGORIES:
-        print(f"\n📦 Generating {category} tasks...")
-
-        for batch in range(batches_per_category):
-            if len(all_samples) >= target_count:
-                break
-
-            try:
-                # Generate batch
-                prompt = generate_batch_prompt(category, description, 10)
-                response = call_gpt4(prompt, api_key)
-                samples = parse_gpt_response(response)
+    print(f"Batches per category: {batches_per_category}")
+    print(f"Concurrent requests: {MAX_CONCURRENT_REQUESTS}\n")
 
-                # Validate and add
-                valid_samples = []
-                for sample in samples:
-                    if all(k in sample for k in ["text", "urgency", "importance"]):
-                        if 1 <= sample["urgency"] <= 10 and 1 <= sample["importance"] <= 10:
-                            valid_samples.append(sample)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-                all_samples.extend(valid_samples)
-                print(f"  Batch {batch+1}: Generated {len(valid_samples)} valid samples (total: {len(all_samples)})")
+    # Seeded with the samples already on disk so a resumed run doesn't repeat them
+    near_dups = NearDuplicateFilter()
+    for sample in iter_samples(output_file):
+        near_dups.add(sample["text"])
 
-                # Rate limiting
-                time.sleep(1)
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    async with openai.AsyncOpenAI(api_key=api_key) as client:
 
+        async def run_batch(category: str, description: str, batch: int) -> List[Dict]:
+            try:
+                prompt = generate_batch_prompt(category, description, 10, batch)
+                response = await call_gpt4_async(client, prompt, sem, use_cache)
+                samples = validate_samples(parse_gpt_response(response))
             except Exception as e:
-                print(f"  ⚠️ Batch {batch+1} failed: {e}")
-                continue
-
-    return all_samples[:target_count]
-
-
-def save_samples(samples: List[Dict], output_file: str = "ml/training_data_gpt4.json"):
-    """Save generated samples to file."""
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(samples, f, indent=2, ensure_ascii=False)
-
-    print(f"\n✅ Saved {len(samples)} samples to {output_file}")
-
-
-def merge_with_existing(gpt_samples: List[Dict], existing_file: str = "ml/training_data.json") -> List[Dict]:
-    """Merge GPT-4 samples with existing data."""
-    existing_path = Path(existing_file)
-
-    if existing_path.exists():
-        with open(existing_path) as f:
-            existing = json.load(f)
-        print(f"\n📊 Merging with existing {len(existing)} samples...")
-        merged = existing + gpt_samples
-        print(f"   Total: {len(merged)} samples")
-        return merged
-    else:
-        return gpt_samples
+                print(f"  ⚠️ {category} batch {batch+1} failed: {e}")
+                return []
+
+            # Drop near-duplicates of anything seen so far
+            dropped_before = near_dups.dropped
+            valid_samples = [s for s in samples if near_dups.add(s["text"])]
+            print(f"  {category} batch {batch+1}: Generated {len(valid_samples)} valid samples"
+                  f" ({near_dups.dropped - dropped_before} near-duplicates dropped)")
+            return valid_samples
+
+        tasks = [
+            asyncio.create_task(run_batch(category, description, batch))
+            for category, description in CATEGORIES
+            for batch in range(first_batch[category], first_batch[category] + batches_per_category)
+        ]
+        # Only this loop writes, so batches land in the file one at a time
+        with open(output_file, "a", encoding="utf-8") as out:
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    valid_samples = (await next_done)[:target_count - written]
+                    if valid_samples:
+                        out.write("\n".join(dumps(s) for s in valid_samples) + "\n")
+                        out.flush()
+                        written += len(valid_samples)
+                    if written >= target_count:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    print(f"\n  Total: {written} valid samples ({near_dups.dropped} near-duplicates dropped)")
+    return written
+
+
+def merge_with_existing(gpt_file: str = GPT4_OUTPUT_FILE, existing_file: str = TRAINING_DATA_FILE) -> int:
+    """Stream the GPT-4 JSONL into the existing JSONL data; returns the new total."""
+    existing = count_samples(existing_file)
+    if existing:
+        print(f"\n📊 Merging with existing {existing} samples...")
+    added = append_samples(iter_samples(gpt_file), existing_file)
+    print(f"   Total: {existing + added} samples")
+    return existing + added
 
 
 def main():
@@ -205,42 +399,33 @@ def main():
     print("GPT-4 TRAINING DATA GENERATOR")
     print("="*70)
 
-    # Generate samples
-    samples = generate_samples(target_count=500)
+    # Generate samples (written to GPT4_OUTPUT_FILE as they arrive)
+    total = asyncio.run(generate_samples(target_count=500, use_cache="--no-cache" not in sys.argv[1:]))
 
-    if not samples:
+    if not total:
         print("\n❌ No samples generated")
         return
 
-    # Save GPT-4 samples separately
-    save_samples(samples, "ml/training_data_gpt4.json")
+    print(f"\n✅ Saved {total} samples to {GPT4_OUTPUT_FILE}")
 
-    # Show distribution
-    from collections import Counter
-    urgency_dist = Counter(s["urgency"] for s in samples)
-    importance_dist = Counter(s["importance"] for s in samples)
+    # Show distribution (one streamed pass over the file, bincount per axis)
+    hists = score_histograms(iter_samples(GPT4_OUTPUT_FILE))
 
     print("\n📊 Generated Data Distribution:")
-    print("\nUrgency:")
-    for i in range(1, 11):
-        count = urgency_dist.get(i, 0)
-        bar = "█" * (count // 5)
-        print(f"  {i:2d}: {count:3d} {bar}")
-
-    print("\nImportance:")
-    for i in range(1, 11):
-        count = importance_dist.get(i, 0)
-        bar = "█" * (count // 5)
-        print(f"  {i:2d}: {count:3d} {bar}")
+    for axis in SCORE_AXES:
+        print(f"\n{axis.capitalize()}:")
+        for i in range(1, 11):
+            count = hists[axis][i]
+            bar = "█" * (count // 5)
+            print(f"  {i:2d}: {count:3d} {bar}")
 
     # Merge with existing
     print("\n" + "="*70)
-    response = input("\n🤔 Merge with existing training_data.json? (y/n): ")
+    response = input("\n🤔 Merge with existing training_data.jsonl? (y/n): ")
 
     if response.lower() == 'y':
-        merged = merge_with_existing(samples)
-        save_samples(merged, "ml/training_data.json")
-        print(f"\n✅ Updated training_data.json with {len(merged)} total samples")
+        total = merge_with_existing()
+        print(f"\n✅ Updated training_data.jsonl with {total} total samples")
     else:
         print("\n✅ GPT-4 samples saved separately")
 
@@ -248,7 +433,7 @@ def main():
     print("✅ DATA GENERATION COMPLETE")
     print("="*70)
     print("\nNext steps:")
-    print("  1. Review: ml/training_data_gpt4.json")
+    print("  1. Review: ml/training_data_gpt4.jsonl")
     print("  2. Train: python ml/train_priority_model.py")
     print("  3. Test: python ml/train_priority_model.py")
     print("="*70 + "\n")
@@ -4,12 +4,18 @@ Training Data Generator with API Key Prompt
 Prompts user for API key instead of reading from environment.
 """
 
-import json
+import sys
 import time
 from pathlib import Path
 from typing import List, Dict
 import getpass
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from ml.dataset import (
+    SCORE_AXES, TRAINING_DATA_FILE, append_samples, count_samples, loads, score_histograms,
+    write_json,
+)
+
 try:
     import openai
 except ImportError:
@@ -91,9 +97,9 @@ def parse_gpt_response(response: str) -> List[Dict]:
     response = response.strip()
 
     try:
-        data = json.loads(response)
+        data = loads(response)
         return data if isinstance(data, list) else [data]
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"⚠️ JSON parse error: {e}")
         return []
 
@@ -177,46 +183,32 @@ def main():
 
     # Save
     output_file = Path("ml/training_data_gpt4.json")
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(samples, f, indent=2, ensure_ascii=False)
+    write_json(output_file, samples)
 
     print(f"\n✅ Saved {len(samples)} samples to {output_file}")
 
-    # Show distribution
-    from collections import Counter
-    urgency_dist = Counter(s["urgency"] for s in samples)
-    importance_dist = Counter(s["importance"] for s in samples)
+    # Show distribution (bincount per axis)
+    hists = score_histograms(samples)
 
     print("\n📊 Distribution:")
-    print("\nUrgency:")
-    for i in range(1, 11):
-        count = urgency_dist.get(i, 0)
-        bar = "█" * (count // 5)
-        print(f"  {i:2d}: {count:3d} {bar}")
-
-    print("\nImportance:")
-    for i in range(1, 11):
-        count = importance_dist.get(i, 0)
-        bar = "█" * (count // 5)
-        print(f"  {i:2d}: {count:3d} {bar}")
+    for axis in SCORE_AXES:
+        print(f"\n{axis.capitalize()}:")
+        for i in range(1, 11):
+            count = hists[axis][i]
+            bar = "█" * (count // 5)
+            print(f"  {i:2d}: {count:3d} {bar}")
 
     # Merge option
     print("\n" + "="*70)
-    response = input("\n🤔 Merge with existing training_data.json? (y/n): ")
+    response = input("\n🤔 Merge with existing training_data.jsonl? (y/n): ")
 
     if response.lower() == 'y':
-        existing_file = Path("ml/training_data.json")
-        if existing_file.exists():
-            with open(existing_file) as f:
-                existing = json.load(f)
-            merged = existing + samples
-            with open(existing_file, "w", encoding="utf-8") as f:
-                json.dump(merged, f, indent=2, ensure_ascii=False)
-            print(f"\n✅ Merged! Total: {len(merged)} samples")
+        existing = count_samples(TRAINING_DATA_FILE)
+        added = append_samples(samples, TRAINING_DATA_FILE)
+        if existing:
+            print(f"\n✅ Merged! Total: {existing + added} samples")
         else:
-            with open(existing_file, "w", encoding="utf-8") as f:
-                json.dump(samples, f, indent=2, ensure_ascii=False)
-            print(f"\n✅ Saved as training_data.json")
+            print(f"\n✅ Saved as training_data.jsonl")
 
     print("\n" + "="*70)
     print("✅ GENERATION COMPLETE")
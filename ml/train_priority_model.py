@@ -14,13 +14,14 @@ Version: 5.0.0
 Date: 2026-02-13
 """
 
-import json
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from ml.dataset import TRAINING_DATA_FILE, load_samples
+
 try:
     from nlp.priority_ranker import PriorityRanker
     from sklearn.model_selection import cross_val_score
@@ -33,24 +34,21 @@ except ImportError as e:
     sys.exit(1)
 
 
-def load_training_data(file_path: str = "ml/training_data.json"):
+def load_training_data(file_path: str = TRAINING_DATA_FILE):
     """
-    Load training data from JSON file.
+    Load training data from the JSONL file (a legacy JSON array is migrated).
 
     Returns:
         List of dicts with 'text', 'urgency', 'importance'
     """
-    path = Path(file_path)
+    data = load_samples(file_path)
 
-    if not path.exists():
+    if not data:
         print(f"❌ Training data not found: {file_path}")
-        print("\nPlease create ml/training_data.json with format:")
-        print('[{"text": "...", "urgency": 1-10, "importance": 1-10}, ...]')
+        print("\nPlease create ml/training_data.jsonl with one sample per line:")
+        print('{"text": "...", "urgency": 1-10, "importance": 1-10}')
         sys.exit(1)
 
-    with open(path) as f:
-        data = json.load(f)
-
     print(f"✅ Loaded {len(data)} training samples from {file_path}")
     return data
 
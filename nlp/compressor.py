@@ -14,8 +14,9 @@ Version: 5.1.0
 Date: 2026-02-23
 """
 
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import logging
 import re
 
@@ -29,7 +30,7 @@ except ImportError as e:
     ) from e
 
 
-@dataclass
+@dataclass(slots=True)
 class CompressionResult:
     """Result of text compression."""
     original: str                     # Original text
@@ -40,6 +41,13 @@ class CompressionResult:
     compression_level: int            # 1-3
     lost_info: List[str]              # Removed elements
 
+    def as_plain_dict(self) -> dict:
+        """Shallow field dict (no deep copy, unlike dataclasses.asdict)."""
+        return {name: getattr(self, name) for name in _COMPRESSION_RESULT_FIELDS}
+
+
+_COMPRESSION_RESULT_FIELDS = tuple(f.name for f in fields(CompressionResult))
+
 
 class Compressor:
     """
@@ -99,14 +107,30 @@ class Compressor:
         'can you': '',
     }
 
-    def __init__(self, encoding: str = "cl100k_base"):
+    # Max (text, level) results kept in the per-instance result cache
+    RESULT_CACHE_MAX = 4096
+
+    def __init__(self, encoding: str = "cl100k_base", use_cache: bool = True):
         """
         Initialize compressor.
 
         Args:
             encoding: tiktoken encoding name
+            use_cache: Reuse results for previously seen (text, level) pairs
         """
         self.encoding = tiktoken.get_encoding(encoding)
+        self.use_cache = use_cache
+        self._result_cache: Dict[Tuple[str, int], CompressionResult] = {}
+
+    def _cache_key(self, text: str, level: int) -> Tuple[str, int]:
+        """Result cache key: blake2b digest of text plus level."""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest(), level
+
+    def _cache_put(self, key: Tuple[str, int], result: CompressionResult):
+        """Store result, evicting the oldest entry when full."""
+        if len(self._result_cache) >= self.RESULT_CACHE_MAX:
+            del self._result_cache[next(iter(self._result_cache))]
+        self._result_cache[key] = result
 
     def compress(self, text: str, level: int = 2) -> CompressionResult:
         """
@@ -132,7 +156,29 @@ class Compressor:
                 lost_info=[]
             )
 
+        if self.use_cache:
+            key = self._cache_key(text, level)
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                return cached
+
         original_tokens = self.count_tokens(text)
+        compressed, lost_info = self._compress_text(text, level)
+        result = self._make_result(
+            text, compressed, lost_info,
+            original_tokens, self.count_tokens(compressed), level
+        )
+        if self.use_cache:
+            self._cache_put(key, result)
+        return result
+
+    def _compress_text(self, text: str, level: int) -> Tuple[str, List[str]]:
+        """
+        Run the compression passes for one non-empty text.
+
+        Returns:
+            (compressed_text, lost_info)
+        """
         lost_info = []
 
         # Extract code blocks before compression
@@ -171,8 +217,18 @@ class Compressor:
         # Restore code blocks
         compressed = self._restore_code_blocks(compressed, code_blocks)
 
-        # Calculate metrics
-        compressed_tokens = self.count_tokens(compressed)
+        return compressed, lost_info
+
+    def _make_result(
+        self,
+        text: str,
+        compressed: str,
+        lost_info: List[str],
+        original_tokens: int,
+        compressed_tokens: int,
+        level: int
+    ) -> CompressionResult:
+        """Build a CompressionResult from precomputed token counts."""
         reduction_rate = (
             (original_tokens - compressed_tokens) / original_tokens
             if original_tokens > 0 else 0.0
@@ -411,19 +467,59 @@ class Compressor:
     def batch_compress(
         self,
         texts: List[str],
-        level: int = 2
+        level: int = 2,
+        original_tokens: Optional[List[int]] = None
     ) -> List[CompressionResult]:
         """
         Compress multiple texts.
 
+        Cached texts are reused; for the rest, token counts for all originals
+        and all outputs are taken with one tiktoken encode_batch call each
+        instead of two encode calls per text.
+
         Args:
             texts: List of input texts
             level: Compression level
+            original_tokens: Token count per text if already known (same
+                encoding); skips re-encoding the originals
 
         Returns:
-            List of CompressionResult
+            List of CompressionResult, in input order
         """
-        return [self.compress(text, level) for text in texts]
+        results: List[CompressionResult] = [None] * len(texts)
+        live = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = self.compress(text, level)
+                continue
+            if self.use_cache:
+                cached = self._result_cache.get(self._cache_key(text, level))
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            live.append(i)
+
+        if not live:
+            return results
+
+        originals = [texts[i] for i in live]
+        compressed = [self._compress_text(text, level) for text in originals]
+        if original_tokens is not None:
+            original_counts = [original_tokens[i] for i in live]
+        else:
+            original_counts = map(len, self.encoding.encode_batch(originals))
+        compressed_counts = map(len, self.encoding.encode_batch([c for c, _ in compressed]))
+
+        for i, text, (out, lost_info), orig_count, comp_count in zip(
+            live, originals, compressed, original_counts, compressed_counts
+        ):
+            results[i] = self._make_result(
+                text, out, lost_info, orig_count, comp_count, level
+            )
+            if self.use_cache:
+                self._cache_put(self._cache_key(text, level), results[i])
+
+        return results
 
 
 # Module-level convenience function
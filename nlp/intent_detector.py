@@ -21,7 +21,7 @@ Version: 5.2.0
 Date: 2026-02-23
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Optional, Tuple, Dict
 import json
 import hashlib
@@ -50,7 +50,65 @@ except ImportError:
     SentenceTransformer = None
 
 
-@dataclass
+def _quantize_int8(model):
+    """
+    Dynamically quantize a model's nn.Linear layers to INT8 (CPU only).
+
+    Returns the model unchanged if torch has no quantized engine here.
+    """
+    try:
+        import torch
+    except ImportError:
+        return model
+
+    if not {"fbgemm", "x86", "qnnpack", "onednn"} & set(torch.backends.quantized.supported_engines):
+        logger.info("No quantized engine available, keeping FP32 model")
+        return model
+
+    try:
+        return torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    except Exception as e:
+        logger.warning("INT8 quantization failed, keeping FP32 model: %s", e)
+        return model
+
+
+def _pad_tokens_to_multiple(model, multiple: int = 8):
+    """
+    Make a SentenceTransformer pad its token batches to a multiple of `multiple`.
+
+    INT8 GEMM kernels (fbgemm/oneDNN VNNI) want sequence lengths that are
+    multiples of 4/8; ragged lengths fall back to slower paths. Extra
+    positions get the pad token and attention_mask 0, so mean pooling
+    ignores them and the embeddings are unchanged.
+    """
+    first = model._first_module()
+    tokenizer = getattr(first, "tokenizer", None)
+    if tokenizer is None or tokenizer.pad_token_id is None:
+        return
+
+    import torch.nn.functional as F
+
+    tokenize = first.tokenize
+
+    def padded_tokenize(texts, *args, **kwargs):
+        features = tokenize(texts, *args, **kwargs)
+        input_ids = features.get("input_ids")
+        if input_ids is None:
+            return features
+        extra = -input_ids.shape[1] % multiple
+        if extra:
+            features["input_ids"] = F.pad(input_ids, (0, extra), value=tokenizer.pad_token_id)
+            for name in ("attention_mask", "token_type_ids"):
+                if name in features:
+                    features[name] = F.pad(features[name], (0, extra), value=0)
+        return features
+
+    first.tokenize = padded_tokenize
+
+
+@dataclass(slots=True)
 class IntentAnalysis:
     """Result of intent detection."""
     original_text: str                # Original user request
@@ -61,14 +119,28 @@ class IntentAnalysis:
     secondary_intent: Optional[str] = None  # Top-2 intent if gap < 0.1
     embedding_scores: Optional[Dict[str, float]] = None  # Debug scores
 
+    def as_plain_dict(self) -> dict:
+        """Shallow field dict (no deep copy, unlike dataclasses.asdict)."""
+        return {name: getattr(self, name) for name in _INTENT_ANALYSIS_FIELDS}
+
+
+_INTENT_ANALYSIS_FIELDS = tuple(f.name for f in fields(IntentAnalysis))
+
 
 class EmbeddingIntentEngine:
     """
     Sentence embedding-based intent classification engine.
 
-    Uses paraphrase-multilingual-MiniLM-L12-v2 for multilingual embeddings,
-    cosine similarity against intent centroids, and optional LogisticRegression
-    classifier for refined predictions.
+    Uses paraphrase-multilingual-MiniLM-L12-v2 (or another SentenceTransformer
+    given as model_name) for multilingual embeddings, cosine similarity against
+    intent centroids, and optional LogisticRegression classifier for refined
+    predictions. The classifier is trained on MODEL_NAME embeddings, so it is
+    only used with that model.
+
+    backend selects the SentenceTransformer inference backend: "torch"
+    (default), or "onnx" / "openvino", which export the model once and run
+    it through ONNX Runtime / OpenVINO on CPU (sentence-transformers >= 3.2).
+    With bf16, an FP32 torch model runs its forward passes under BF16 autocast.
     """
 
     MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
@@ -77,9 +149,20 @@ class EmbeddingIntentEngine:
         self,
         exemplar_path: str = "ml/intent_exemplars.json",
         classifier_path: str = "ml/intent_classifier.pkl",
-        cache_manager=None
+        cache_manager=None,
+        enable_int8: bool = True,
+        model_name: Optional[str] = None,
+        centroid_cache_dir: Optional[str] = None,
+        backend: str = "torch",
+        bf16: bool = False
     ):
+        self.model_name = model_name or self.MODEL_NAME
+        self._backend = backend
         self._model = None
+        self._enable_int8 = enable_int8
+        self._quantized = False
+        self._bf16 = bf16
+        self._centroid_cache_dir = Path(centroid_cache_dir) if centroid_cache_dir else None
         self._centroids: Optional[Dict[str, object]] = None
         self._classifier = None
         self._classifier_available = False
@@ -88,25 +171,76 @@ class EmbeddingIntentEngine:
         self._exemplar_path = Path(exemplar_path)
         self._classifier_path = Path(classifier_path)
 
-        # Try to load classifier
-        self._load_classifier()
+        # Try to load classifier (trained on MODEL_NAME embeddings only)
+        if self.model_name == self.MODEL_NAME:
+            self._load_classifier()
+        else:
+            logger.info("Classifier skipped for embedding model %s", self.model_name)
 
     def _load_model(self):
-        """Lazy load SentenceTransformer model with MPS support."""
+        """Lazy load SentenceTransformer model with CUDA/MPS support."""
         if self._model is not None:
             return
 
         if not EMBEDDING_AVAILABLE:
             raise RuntimeError("sentence-transformers not installed")
 
-        logger.info("Loading SentenceTransformer: %s", self.MODEL_NAME)
-        device = "mps" if self._check_mps() else "cpu"
-        self._model = SentenceTransformer(self.MODEL_NAME, device=device)
-        logger.info("Model loaded on device: %s", device)
+        logger.info("Loading SentenceTransformer: %s (backend=%s)", self.model_name, self._backend)
+        if self._backend != "torch":
+            try:
+                self._model = SentenceTransformer(
+                    self.model_name, device="cpu", backend=self._backend
+                )
+            except Exception as e:
+                # TypeError on sentence-transformers < 3.2, ImportError without
+                # onnxruntime/optimum
+                logger.warning("%s backend unavailable, using torch: %s", self._backend, e)
+                self._backend = "torch"
+            else:
+                logger.info("Model loaded with %s backend", self._backend)
+
+        device = self._select_device()
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name, device=device)
+            logger.info("Model loaded on device: %s", device)
+
+        # INT8 kernels are CPU-only; centroids below are built with the
+        # quantized model so they stay consistent with query embeddings.
+        if self._enable_int8 and self._backend == "torch" and device == "cpu":
+            self._model = _quantize_int8(self._model)
+            self._quantized = any(
+                "quantized" in type(m).__module__ for m in self._model.modules()
+            )
+            if self._quantized:
+                _pad_tokens_to_multiple(self._model, 8)
 
         # Build centroids after model is loaded
         self._build_centroids()
 
+    def _encode(self, texts):
+        """Model forward pass, under BF16 autocast for an FP32 torch model with bf16 set."""
+        if self._bf16 and self._backend == "torch" and not self._quantized:
+            import torch
+            with torch.autocast(device_type=self._model.device.type, dtype=torch.bfloat16):
+                return self._model.encode(texts, normalize_embeddings=True)
+        return self._model.encode(texts, normalize_embeddings=True)
+
+    def _select_device(self) -> str:
+        """
+        Pick the torch device: CUDA, then Apple MPS, then CPU.
+
+        On CUDA, encode() queues a whole batch on the default stream and
+        synchronizes once when copying the embeddings back, so no extra
+        streams or threads are needed.
+        """
+        try:
+            import torch
+        except ImportError:
+            return "cpu"
+        if torch.cuda.is_available():
+            return "cuda"
+        return "mps" if self._check_mps() else "cpu"
+
     def _check_mps(self) -> bool:
         """Check if Apple MPS (Metal) is available."""
         try:
@@ -129,30 +263,75 @@ class EmbeddingIntentEngine:
         except Exception as e:
             logger.warning("Failed to load classifier: %s", e)
 
+    def _centroid_cache_path(self, exemplar_bytes: bytes) -> Optional[Path]:
+        """
+        Disk cache file for centroids, keyed on model, INT8 flag and exemplars.
+
+        Any change to the backbone, backend, precision or exemplar file yields a
+        new key, so a stale file is never reused.
+        """
+        if self._centroid_cache_dir is None:
+            return None
+        key = hashlib.sha1(
+            f"{self.model_name}|{self._backend}|int8={self._quantized}|bf16={self._bf16}|".encode()
+            + exemplar_bytes
+        ).hexdigest()[:16]
+        return self._centroid_cache_dir / f"intent_centroids.{key}.npz"
+
     def _build_centroids(self):
-        """Build intent centroid vectors from exemplar embeddings."""
+        """
+        Build intent centroid vectors from exemplar embeddings.
+
+        Encoding every exemplar dominates cold start, so the result is
+        saved under centroid_cache_dir and loaded on later runs.
+        """
         if not self._exemplar_path.exists():
             logger.warning("Exemplar file not found: %s", self._exemplar_path)
             return
 
         try:
-            with open(self._exemplar_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            exemplar_bytes = self._exemplar_path.read_bytes()
+            cache_path = self._centroid_cache_path(exemplar_bytes)
+            if cache_path is not None and cache_path.exists():
+                try:
+                    with np.load(cache_path) as cached:
+                        self._centroids = {intent: cached[intent] for intent in cached.files}
+                    logger.info("Loaded centroids for %d intents from %s",
+                                len(self._centroids), cache_path)
+                    return
+                except Exception as e:
+                    logger.warning("Ignoring unreadable centroid cache %s: %s", cache_path, e)
+
+            data = json.loads(exemplar_bytes.decode('utf-8'))
 
             self._centroids = {}
             for intent, info in data["intents"].items():
                 exemplars = info["exemplars"]
-                embeddings = self._model.encode(exemplars, normalize_embeddings=True)
+                embeddings = self._encode(exemplars)
                 centroid = np.mean(embeddings, axis=0)
                 # L2 normalize the centroid
                 centroid = centroid / np.linalg.norm(centroid)
                 self._centroids[intent] = centroid
 
             logger.info("Built centroids for %d intents", len(self._centroids))
+
+            if cache_path is not None:
+                self._save_centroids(cache_path)
         except Exception as e:
             logger.warning("Failed to build centroids: %s", e)
             self._centroids = None
 
+    def _save_centroids(self, cache_path: Path):
+        """Write centroids atomically (temp file + rename)."""
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **self._centroids)
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            logger.warning("Failed to save centroid cache: %s", e)
+
     def encode(self, text: str) -> Optional[object]:
         """
         Encode text to embedding vector with caching.
@@ -166,13 +345,13 @@ class EmbeddingIntentEngine:
         self._load_model()
 
         # Check cache first
-        cache_key = f"emb:{self.MODEL_NAME}:{text}"
+        cache_key = f"emb:{self.model_name}:{text}"
         if self._cache_manager:
             cached = self._cache_manager.get_embedding(cache_key)
             if cached is not None:
                 return cached
 
-        embedding = self._model.encode(text, normalize_embeddings=True)
+        embedding = self._encode(text)
 
         # Cache the embedding
         if self._cache_manager:
@@ -236,6 +415,71 @@ class EmbeddingIntentEngine:
 
         return cosine_scores, classifier_scores
 
+    def encode_batch(self, texts: List[str]) -> List[object]:
+        """
+        Encode several texts with a single model forward pass.
+
+        Cached embeddings are reused; only the misses are encoded.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of embedding numpy arrays, in input order
+        """
+        self._load_model()
+
+        keys = [f"emb:{self.model_name}:{text}" for text in texts]
+        embeddings: List[Optional[object]] = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            if self._cache_manager:
+                embeddings[i] = self._cache_manager.get_embedding(key)
+            if embeddings[i] is None:
+                missing.append(i)
+
+        if missing:
+            encoded = self._encode([texts[i] for i in missing])
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                if self._cache_manager:
+                    self._cache_manager.set_embedding(keys[i], embedding)
+
+        return embeddings
+
+    def classify_batch(self, texts: List[str]) -> List[Tuple[Dict[str, float], Dict[str, float]]]:
+        """
+        Batched classify(): one encode and one predict_proba for all texts.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            List of (cosine_scores, classifier_scores) tuples, in input order
+        """
+        embeddings = self.encode_batch(texts)
+
+        cosine_all: List[Dict[str, float]] = [{} for _ in texts]
+        if self._centroids is not None:
+            for scores, embedding in zip(cosine_all, embeddings):
+                for intent, centroid in self._centroids.items():
+                    similarity = float(np.dot(embedding, centroid))
+                    scores[intent] = max(0.0, min(1.0, similarity))
+
+        classifier_all: List[Dict[str, float]] = [{} for _ in texts]
+        if self._classifier_available and self._classifier is not None:
+            try:
+                proba = self._classifier.predict_proba(np.asarray(embeddings))
+                classes = self._classifier.classes_
+                classifier_all = [
+                    {cls: float(prob) for cls, prob in zip(classes, row)}
+                    for row in proba
+                ]
+            except Exception as e:
+                logger.warning("Classifier prediction failed: %s", e)
+
+        return list(zip(cosine_all, classifier_all))
+
     @property
     def is_available(self) -> bool:
         """Check if embedding engine can be used."""
@@ -313,15 +557,35 @@ class IntentDetector:
         ]
     }
 
-    def __init__(self, model_name: str = "distilbert-base-uncased", cache_dir: str = "models/"):
+    def __init__(
+        self,
+        model_name: str = "distilbert-base-uncased",
+        cache_dir: str = "models/",
+        enable_int8: bool = True,
+        embedding_model: Optional[str] = None,
+        backend: str = "torch",
+        use_cache: bool = True,
+        bf16: bool = False
+    ):
         """
         Initialize intent detector.
 
         Args:
             model_name: HuggingFace model name (for optional BERT fallback)
-            cache_dir: Directory to cache downloaded models
+            cache_dir: Directory to cache downloaded models and centroids
+            enable_int8: Quantize the embedding model to INT8 when on CPU
+            embedding_model: SentenceTransformer backbone for the embedding
+                layer (default: EmbeddingIntentEngine.MODEL_NAME)
+            backend: Embedding inference backend ("torch", "onnx", "openvino")
+            use_cache: Reuse results for previously seen texts (memory + disk)
+            bf16: Run an FP32 embedding model under BF16 autocast
         """
         self.model_name = model_name
+        self.enable_int8 = enable_int8
+        self.embedding_model = embedding_model
+        self.backend = backend
+        self.use_cache = use_cache
+        self.bf16 = bf16
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -331,7 +595,8 @@ class IntentDetector:
         # Result cache (memory + disk)
         self._memory_cache: Dict[str, IntentAnalysis] = {}
         self._cache_file = Path(__file__).parent / "cache.json"
-        self._load_disk_cache()
+        if use_cache:
+            self._load_disk_cache()
         self._cache_hits = 0
         self._cache_misses = 0
 
@@ -353,7 +618,12 @@ class IntentDetector:
                     pass
 
                 self._embedding_engine = EmbeddingIntentEngine(
-                    cache_manager=cache_mgr
+                    cache_manager=cache_mgr,
+                    enable_int8=self.enable_int8,
+                    model_name=self.embedding_model,
+                    centroid_cache_dir=str(self.cache_dir),
+                    backend=self.backend,
+                    bf16=self.bf16
                 )
             except Exception as e:
                 logger.warning("Failed to initialize embedding engine: %s", e)
@@ -380,19 +650,15 @@ class IntentDetector:
             )
 
         # Check cache first
-        cache_key = hashlib.md5(text.encode()).hexdigest()
-        if cache_key in self._memory_cache:
+        cache_key = self._cache_key(text)
+        if self.use_cache and cache_key in self._memory_cache:
             self._cache_hits += 1
             logger.debug("Cache hit for: %s", text[:50])
             return self._memory_cache[cache_key]
 
         self._cache_misses += 1
 
-        # Step 1: Keyword scoring (always available)
-        keyword_scores = self._get_keyword_scores(text)
-        keyword_intent, keyword_confidence = self._best_from_scores(keyword_scores)
-
-        # Step 2: Embedding scoring (if available)
+        # Embedding scoring (if available)
         cosine_scores: Dict[str, float] = {}
         classifier_scores: Dict[str, float] = {}
         embedding_engine = self._get_embedding_engine()
@@ -403,7 +669,48 @@ class IntentDetector:
             except Exception as e:
                 logger.warning("Embedding classification failed: %s", e)
 
-        # Step 3: Score fusion
+        result = self._analyze(text, cosine_scores, classifier_scores)
+
+        # Cache the result
+        if self.use_cache:
+            self._memory_cache[cache_key] = result
+            self._save_disk_cache()
+
+        return result
+
+    def _cache_key(self, text: str) -> str:
+        """
+        Result cache key for text.
+
+        Plain MD5 of the text for the default embedding model (compatible
+        with the existing cache.json); other backbones are namespaced so
+        their results never mix with the default model's.
+        """
+        if self.embedding_model:
+            text = f"{self.embedding_model}:{text}"
+        return hashlib.md5(text.encode()).hexdigest()
+
+    def _analyze(
+        self,
+        text: str,
+        cosine_scores: Dict[str, float],
+        classifier_scores: Dict[str, float]
+    ) -> IntentAnalysis:
+        """
+        Fuse keyword scores with precomputed embedding scores.
+
+        Args:
+            text: User request text
+            cosine_scores: Centroid similarity scores (empty if unavailable)
+            classifier_scores: Classifier probabilities (empty if unavailable)
+
+        Returns:
+            IntentAnalysis for text (not cached)
+        """
+        # Step 1: Keyword scoring (always available)
+        keyword_scores = self._get_keyword_scores(text)
+
+        # Step 2: Score fusion
         fused_scores = self._fuse_scores(keyword_scores, cosine_scores, classifier_scores)
         intent, confidence = self._best_from_scores(fused_scores)
 
@@ -440,10 +747,6 @@ class IntentDetector:
             embedding_scores=debug_scores
         )
 
-        # Cache the result
-        self._memory_cache[cache_key] = result
-        self._save_disk_cache()
-
         logger.info("Detected intent=%s confidence=%.2f secondary=%s for: %s",
                      intent, confidence, secondary_intent, text[:80])
 
@@ -661,13 +964,55 @@ class IntentDetector:
         """
         Detect intent for multiple texts.
 
+        Cache misses are embedded and classified together in one forward
+        pass, and the disk cache is written once for the whole batch.
+
         Args:
             texts: List of user requests
 
         Returns:
-            List of IntentAnalysis results
+            List of IntentAnalysis results, in input order
         """
-        return [self.detect(text) for text in texts]
+        results: List[Optional[IntentAnalysis]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # cache key -> input positions
+
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = self.detect(text)
+                continue
+            cache_key = self._cache_key(text)
+            if self.use_cache and cache_key in self._memory_cache:
+                self._cache_hits += 1
+                results[i] = self._memory_cache[cache_key]
+            else:
+                pending.setdefault(cache_key, []).append(i)
+
+        if not pending:
+            return results
+
+        miss_texts = [texts[positions[0]] for positions in pending.values()]
+        self._cache_misses += len(miss_texts)
+
+        scores = [({}, {})] * len(miss_texts)
+        embedding_engine = self._get_embedding_engine()
+        if embedding_engine and embedding_engine.is_available:
+            try:
+                scores = embedding_engine.classify_batch(miss_texts)
+            except Exception as e:
+                logger.warning("Embedding classification failed: %s", e)
+
+        for (cache_key, positions), text, (cosine_scores, classifier_scores) in zip(
+            pending.items(), miss_texts, scores
+        ):
+            result = self._analyze(text, cosine_scores, classifier_scores)
+            if self.use_cache:
+                self._memory_cache[cache_key] = result
+            for i in positions:
+                results[i] = result
+
+        if self.use_cache:
+            self._save_disk_cache()
+        return results
 
 
 # Module-level convenience function
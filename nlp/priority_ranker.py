@@ -12,8 +12,9 @@ Version: 5.1.0
 Date: 2026-02-23
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import List, Tuple, Dict, Optional
+import hashlib
 import json
 import logging
 from pathlib import Path
@@ -32,7 +33,7 @@ except ImportError as e:
     ) from e
 
 
-@dataclass
+@dataclass(slots=True)
 class PriorityScore:
     """Result of priority ranking."""
     task_id: str                      # "A", "B", "C", ...
@@ -44,6 +45,13 @@ class PriorityScore:
     parallel_safe: bool               # can run in parallel
     ml_confidence: float              # ML model confidence
 
+    def as_plain_dict(self) -> dict:
+        """Shallow field dict (no deep copy, unlike dataclasses.asdict)."""
+        return {name: getattr(self, name) for name in _PRIORITY_SCORE_FIELDS}
+
+
+_PRIORITY_SCORE_FIELDS = tuple(f.name for f in fields(PriorityScore))
+
 
 class PriorityRanker:
     """
@@ -90,6 +98,9 @@ class PriorityRanker:
         "스타일", "문서", "주석", "오타", "사소"
     ]
 
+    # Max texts kept in the per-instance score cache
+    SCORE_CACHE_MAX = 4096
+
     # Dependency patterns
     DEPENDENCY_PATTERNS = [
         r"after\s+([A-Z])",
@@ -100,13 +111,19 @@ class PriorityRanker:
         r"의존\s+([A-Z])"
     ]
 
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, use_cache: bool = True):
         """
         Initialize priority ranker.
 
         Args:
             model_path: Path to saved ML model. If None, uses __file__-based resolution.
+            use_cache: Reuse scores for previously seen task texts
         """
+        self.use_cache = use_cache
+        # blake2b(text) -> (urgency, urgency_conf, importance, importance_conf,
+        #                   dependencies, parallel_safe)
+        self._score_cache: Dict[str, tuple] = {}
+
         if model_path is None:
             project_root = Path(__file__).parent.parent
             model_path = str(project_root / "ml" / "priority_model.pkl")
@@ -138,10 +155,8 @@ class PriorityRanker:
         for i, task in enumerate(tasks):
             task_id = chr(65 + i)  # A, B, C, ...
 
-            urgency, urgency_conf = self._classify_urgency(task)
-            importance, importance_conf = self._classify_importance(task)
-            dependencies = self._extract_dependencies(task)
-            parallel_safe = self._check_parallel_safety(task, dependencies)
+            (urgency, urgency_conf, importance, importance_conf,
+             dependencies, parallel_safe) = self._score_text(task)
 
             priority = int(urgency * importance / 10)
             confidence = (urgency_conf + importance_conf) / 2
@@ -152,7 +167,7 @@ class PriorityRanker:
                 urgency=urgency,
                 importance=importance,
                 priority=priority,
-                dependencies=dependencies,
+                dependencies=list(dependencies),
                 parallel_safe=parallel_safe,
                 ml_confidence=confidence
             ))
@@ -161,6 +176,33 @@ class PriorityRanker:
 
         return scores
 
+    def _score_text(self, text: str) -> tuple:
+        """
+        Urgency, importance, dependencies and parallel safety for one text.
+
+        Results are cached on a blake2b digest of the text (cleared when the
+        models are trained or reloaded), so a repeated task skips both
+        predictions.
+        """
+        if self.use_cache:
+            key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+            cached = self._score_cache.get(key)
+            if cached is not None:
+                return cached
+
+        urgency, urgency_conf = self._classify_urgency(text)
+        importance, importance_conf = self._classify_importance(text)
+        dependencies = self._extract_dependencies(text)
+        parallel_safe = self._check_parallel_safety(text, dependencies)
+        scored = (urgency, urgency_conf, importance, importance_conf,
+                  tuple(dependencies), parallel_safe)
+
+        if self.use_cache:
+            if len(self._score_cache) >= self.SCORE_CACHE_MAX:
+                del self._score_cache[next(iter(self._score_cache))]
+            self._score_cache[key] = scored
+        return scored
+
     def _classify_urgency(self, text: str) -> Tuple[int, float]:
         """
         Classify urgency level (1-10).
@@ -324,6 +366,7 @@ class PriorityRanker:
 
         self._importance_model = RandomForestRegressor(n_estimators=100, random_state=42)
         self._importance_model.fit(features, importance_labels)
+        self._score_cache.clear()
 
         logger.info("Regression models trained on %d samples", len(training_data))
 
@@ -355,6 +398,7 @@ class PriorityRanker:
             self._urgency_model = model_data["urgency_model"]
             self._importance_model = model_data["importance_model"]
             self.vectorizer = model_data["vectorizer"]
+            self._score_cache.clear()
 
             logger.info("Priority ML model loaded from %s", self.model_path)
         except Exception as e:
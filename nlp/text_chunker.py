@@ -12,7 +12,7 @@ Version: 5.0.0
 Date: 2026-02-13
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 from collections import Counter
 
@@ -58,13 +58,19 @@ class TextChunker:
         """
         self.encoding = tiktoken.get_encoding(encoding)
 
-    def chunk(self, text: str, max_tokens: int = 500) -> List[str]:
+    def chunk(
+        self,
+        text: str,
+        max_tokens: int = 500,
+        total_tokens: Optional[int] = None
+    ) -> List[str]:
         """
         Split text into chunks under token limit.
 
         Args:
             text: Input text to chunk
             max_tokens: Maximum tokens per chunk
+            total_tokens: Token count of text if already known (same encoding)
 
         Returns:
             List of text chunks
@@ -73,7 +79,8 @@ class TextChunker:
             return []
 
         # Count total tokens
-        total_tokens = self.count_tokens(text)
+        if total_tokens is None:
+            total_tokens = self.count_tokens(text)
 
         # If under limit, return as single chunk
         if total_tokens <= max_tokens:
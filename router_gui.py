@@ -102,6 +102,8 @@ def translate_non_code_to_english(text: str) -> str:
 
 def _contains_korean(text: str) -> bool:
     """Check if text contains Korean (Hangul) characters."""
+    if text.isascii():
+        return False
     return any('\uac00' <= c <= '\ud7af' for c in text)
 
 
@@ -249,6 +251,14 @@ def translate_block_to_english(block: str, api_key: str) -> str:
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 DEFAULT_GROQ_MODEL = "llama-3.1-8b-instant"
 
+# Use certifi CA bundle if available (fixes SSL on macOS with Python 3.14+).
+# Built once: parsing the CA bundle per request is pure overhead.
+try:
+    import certifi, ssl
+    _GROQ_SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+except ImportError:
+    _GROQ_SSL_CTX = None
+
 
 def _groq_chat(messages, api_key: str, model: str = DEFAULT_GROQ_MODEL, max_tokens: int = 300, temperature: float = 0.0) -> str:
     payload = {
@@ -268,19 +278,22 @@ def _groq_chat(messages, api_key: str, model: str = DEFAULT_GROQ_MODEL, max_toke
         },
         method="POST",
     )
-    # Use certifi CA bundle if available (fixes SSL on macOS with Python 3.14+)
-    ssl_ctx = None
-    try:
-        import certifi, ssl
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-    except ImportError:
-        pass
-    with urllib.request.urlopen(req, timeout=25, context=ssl_ctx) as resp:
+    with urllib.request.urlopen(req, timeout=25, context=_GROQ_SSL_CTX) as resp:
         raw = resp.read().decode("utf-8", errors="replace")
     obj = json.loads(raw)
     return obj["choices"][0]["message"]["content"]
 
 
+# Lines that end a ticket body; str.startswith(tuple) tests them in one call.
+# ("Change log" also covers "Change log stub".)
+_TICKET_END_PREFIXES = ("Change log", "→", "Next session", "Rules:")
+# apply_english_tickets_to_claude_block only stops skipping at the stub
+# itself: an original body line starting "Change log ..." is still body and
+# is replaced along with the rest of it.
+_APPLY_END_PREFIXES = ("Change log stub", "→", "Rules:", "Next session")
+_SECTION_END_PREFIXES = ("Ticket ", "Route:", "[다음 세션", "[Next session")
+
+
 def extract_tickets_from_claude_block(block: str) -> Tuple[Dict[str, str], str]:
     """Extract Ticket blocks (fence-aware).
 
@@ -349,14 +362,7 @@ def extract_tickets_from_claude_block(block: str) -> Tuple[Dict[str, str], str]:
                     continue
 
         # End conditions (outside fences only)
-        if cur_id and (
-            s == "" or
-            s.startswith("Change log stub") or
-            s.startswith("→") or
-            s.startswith("Change log") or
-            s.startswith("Next session") or
-            s.startswith("Rules:")
-        ):
+        if cur_id and (s == "" or s.startswith(_TICKET_END_PREFIXES)):
             flush()
             continue
 
@@ -491,13 +497,7 @@ def apply_english_tickets_to_claude_block(block: str, en_map: Dict[str, str]) ->
 
         if skipping and cur_id:
             # Stop skipping on section delimiters
-            if (
-                s == "" or
-                s.startswith("Change log stub") or
-                s.startswith("→") or
-                s.startswith("Rules:") or
-                s.startswith("Next session")
-            ):
+            if s == "" or s.startswith(_APPLY_END_PREFIXES):
                 skipping = False
                 cur_id = None
                 out_lines.append(line)
@@ -510,12 +510,14 @@ def apply_english_tickets_to_claude_block(block: str, en_map: Dict[str, str]) ->
     return "\n".join(out_lines)
 
 
+_TICKET_HEADING_RE = re.compile(r"^\s*Ticket\s+([A-Za-z])\b")
+
+
 def detect_ticket_ids(full_text: str):
     """Return unique ticket IDs found in headings like 'Ticket A' or 'Ticket B — ...'.
 
     Fence-aware: ignores 'Ticket X' lines inside ```...``` code blocks.
     """
-    import re
     lines = full_text.splitlines()
     in_fence = False
     uniq = []
@@ -526,7 +528,7 @@ def detect_ticket_ids(full_text: str):
             continue
         if in_fence:
             continue
-        m = re.match(r"^\s*Ticket\s+([A-Za-z])\b", line)
+        m = _TICKET_HEADING_RE.match(line)
         if m:
             x = m.group(1).upper()
             if x not in uniq:
@@ -605,11 +607,7 @@ def extract_claude_ready_block_from_output(full_text: str, ticket_id: str = "")
                 while m < end:
                     s2 = lines[m].strip()
 
-                    if s2.startswith("Ticket "):
-                        break
-                    if s2.startswith("Route:"):
-                        break
-                    if s2.startswith("[다음 세션") or s2.startswith("[Next session"):
+                    if s2.startswith(_SECTION_END_PREFIXES):
                         break
                     if set(s2) == {"-"} and len(s2) >= 20:
                         break
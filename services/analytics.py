@@ -1,8 +1,8 @@
 """Analytics aggregation for enterprise dashboard.
 
 Produces heatmap data (24h x 7d), latency percentiles,
-cost trends, and burn rate projection from task_history.json
-and data/token_usage.json.
+cost trends, and burn rate projection from task_history.jsonl
+and the in-memory token usage log (services/usage_log.py).
 """
 
 import json
@@ -12,26 +12,49 @@ import time
 from collections import defaultdict
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    HISTORY_FILE, TOKEN_USAGE_FILE,
-    ROUTE_COST_PER_1K, ROUTE_TOKENS_PER_TASK,
-    DEFAULT_COST_PER_1K, DEFAULT_TOKENS_PER_TASK,
+    HISTORY_FILE, HISTORY_LEGACY_FILE,
+    ROUTE_COST_PER_TASK, DEFAULT_COST_PER_TASK,
 )
+from services.usage_log import usage_log
 
 
 def _read_json(path, default=None):
     if default is None:
         default = []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
     except (FileNotFoundError, json.JSONDecodeError):
         return default
 
 
+def _read_jsonl(path):
+    loads = orjson.loads if orjson is not None else json.loads
+    entries = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                entries.append(loads(line))
+            except ValueError:
+                continue  # blank or torn line
+    return entries
+
+
 def _get_entries():
-    data = _read_json(HISTORY_FILE, [])
+    try:
+        return _read_jsonl(HISTORY_FILE)
+    except FileNotFoundError:
+        pass
+    # Not migrated yet: legacy JSON array
+    data = _read_json(HISTORY_LEGACY_FILE, [])
     if isinstance(data, list):
         return data
     if isinstance(data, dict):
@@ -40,7 +63,7 @@ def _get_entries():
 
 
 def _get_token_usage():
-    return _read_json(TOKEN_USAGE_FILE, [])
+    return usage_log.get_entries()
 
 
 def _period_seconds(period: str) -> float:
@@ -122,8 +145,7 @@ def get_cost_trends(period: str = "7d") -> list[dict]:
         tasks = entry.get("tasks", [{"route": entry.get("route", "claude")}])
         for t in tasks:
             r = t.get("route", "claude")
-            tk = ROUTE_TOKENS_PER_TASK.get(r, DEFAULT_TOKENS_PER_TASK)
-            daily[day_key] += (tk / 1000) * ROUTE_COST_PER_1K.get(r, DEFAULT_COST_PER_1K)
+            daily[day_key] += ROUTE_COST_PER_TASK.get(r, DEFAULT_COST_PER_TASK)
 
     result = [{"date": k, "cost": round(v, 4)} for k, v in sorted(daily.items())]
     return result
@@ -25,6 +25,7 @@ class AuditLogger:
     def __init__(self):
         self._entries: deque = deque(maxlen=MAX_ENTRIES)
         self._unsaved_count = 0
+        os.makedirs(DATA_DIR, exist_ok=True)  # once, not on every save
         self._load()
         atexit.register(self.flush)
 
@@ -38,7 +39,6 @@ class AuditLogger:
             pass
 
     def _save(self):
-        os.makedirs(DATA_DIR, exist_ok=True)
         with _lock:
             tmp_file = AUDIT_FILE + ".tmp"
             try:
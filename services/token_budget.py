@@ -25,9 +25,19 @@ _lock = threading.Lock()
 
 def count_tokens(text: str) -> int:
     """Count tokens using tiktoken cl100k_base encoding."""
+    if not text:
+        return 0
     if _encoder is None:
         return len(text.split()) * 4 // 3  # rough fallback
-    return len(_encoder.encode(text))
+    # encode_ordinary: no special-token scan, and no ValueError on "<|endoftext|>"
+    return len(_encoder.encode_ordinary(text))
+
+
+def count_tokens_batch(texts: list[str]) -> list[int]:
+    """Count tokens for several texts with one tiktoken batch call."""
+    if _encoder is None:
+        return [len(t.split()) * 4 // 3 for t in texts]
+    return [len(tokens) for tokens in _encoder.encode_ordinary_batch(texts)]
 
 
 @dataclass
@@ -73,6 +83,7 @@ class BudgetManager:
 
     def __init__(self):
         self._budgets: dict[str, TokenBudget] = {}
+        os.makedirs(DATA_DIR, exist_ok=True)  # once, not on every save
         self._load()
 
     def _load(self):
@@ -86,7 +97,6 @@ class BudgetManager:
 
     def _save_unlocked(self):
         """Write to disk. Caller must hold _lock."""
-        os.makedirs(DATA_DIR, exist_ok=True)
         with open(BUDGETS_FILE, "w", encoding="utf-8") as f:
             json.dump({n: b.to_dict() for n, b in self._budgets.items()}, f, indent=2)
 
@@ -0,0 +1,172 @@
+"""Append-only token usage log for v2 analytics.
+
+The newest MAX_ENTRIES entries are kept in memory (hydrated from disk on
+start) and served to analytics from there. Entries recorded by
+/api/v2/route are also appended to one of two write buffers; a background
+thread swaps buffers every FLUSH_INTERVAL and appends the full one to
+data/token_usage.jsonl (one JSON object per line). Request handlers take
+no lock and never touch the file. Once an hour the flusher compacts the
+file down to the newest MAX_ENTRIES lines.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import TOKEN_USAGE_FILE, TOKEN_USAGE_LOG
+
+MAX_ENTRIES = 10000
+FLUSH_INTERVAL = 0.2  # seconds between buffer swaps
+COMPACT_INTERVAL = 3600  # seconds between compactions
+
+
+def _dumps(entry: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(entry).decode()
+    return json.dumps(entry, separators=(",", ":"))
+
+
+def _loads(line):
+    return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+class UsageLog:
+    """In-memory ring + double-buffered background writer (JSONL)."""
+
+    def __init__(self, path: str = TOKEN_USAGE_LOG):
+        self._path = path
+        self._entries: deque = deque(maxlen=MAX_ENTRIES)
+        # record() appends to _buffers[_active]; only the flusher flips _active
+        self._buffers = (deque(), deque())
+        self._active = 0
+        self._file = None
+        self._io_lock = threading.Lock()  # flusher thread vs. atexit flush
+        self._last_compact = time.time()
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)  # once, not per write
+        self._migrate_legacy()
+        self._load()
+        self._thread = threading.Thread(target=self._run, name="usage-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _migrate_legacy(self):
+        """Convert the old token_usage.json array once, if no JSONL log exists."""
+        if os.path.exists(self._path):
+            return
+        try:
+            with open(TOKEN_USAGE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return
+        if not isinstance(data, list) or not data:
+            return
+        tmp_file = self._path + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(_dumps(e) for e in data[-MAX_ENTRIES:]) + "\n")
+            os.replace(tmp_file, self._path)
+        except OSError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self._path, "rb") as f:
+                lines = deque(f, maxlen=MAX_ENTRIES)
+        except (FileNotFoundError, OSError):
+            return
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self._entries.append(_loads(line))
+            except ValueError:
+                continue
+
+    def record(self, entry: dict):
+        """Add one entry; lock-free (deque.append is atomic), no disk I/O."""
+        self._entries.append(entry)
+        self._buffers[self._active].append(entry)
+
+    def get_entries(self) -> list[dict]:
+        """Snapshot of the newest MAX_ENTRIES entries, oldest first."""
+        return list(self._entries)
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+            if time.time() - self._last_compact >= COMPACT_INTERVAL:
+                self._compact()
+
+    def _open(self):
+        """Return the append handle, reopening it if the file was replaced.
+
+        Caller must hold ``_io_lock``.
+        """
+        if self._file is not None:
+            try:
+                if os.fstat(self._file.fileno()).st_ino == os.stat(self._path).st_ino:
+                    return self._file
+            except OSError:
+                pass
+            self._file.close()
+        self._file = open(self._path, "a", encoding="utf-8")
+        return self._file
+
+    def _write(self, batch: list[dict]):
+        """Append batch to the log. Caller must hold ``_io_lock``."""
+        try:
+            f = self._open()
+            f.write("\n".join(_dumps(e) for e in batch) + "\n")
+            f.flush()
+        except OSError:
+            pass
+
+    def _compact(self):
+        """Keep only the newest MAX_ENTRIES lines (atomic temp file + rename)."""
+        self._last_compact = time.time()
+        with self._io_lock:
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    lines = deque(f, maxlen=MAX_ENTRIES)
+            except (FileNotFoundError, OSError):
+                return
+            tmp_file = self._path + ".tmp"
+            try:
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                os.replace(tmp_file, self._path)
+            except OSError:
+                pass
+
+    def flush(self):
+        """Swap write buffers and append their contents to disk.
+
+        Runs every FLUSH_INTERVAL on the flusher thread and once at exit.
+        New records go to the other buffer after the swap; that one is also
+        drained (popleft is safe against concurrent appends) so a record()
+        that raced the swap is not left behind at exit.
+        """
+        with self._io_lock:
+            full = self._buffers[self._active]
+            self._active ^= 1
+            batch = []
+            for buf in (full, self._buffers[self._active]):
+                while buf:
+                    batch.append(buf.popleft())
+            if batch:
+                self._write(batch)
+
+
+# Singleton
+usage_log = UsageLog()
@@ -0,0 +1,94 @@
+"""
+test_api_v1.py -- Tests for v1 API conditional GETs (ETag / 304)
+
+Run: python3 -m pytest tests/test_api_v1.py
+(skipped when Flask is not installed)
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+flask = pytest.importorskip("flask")
+
+from api import v1  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """v1 test client with the prompts, feedback and history files in tmp_path."""
+    files = {name: tmp_path / name for name in ("prompts.json", "feedback.json", "task_history.jsonl")}
+    monkeypatch.setattr(v1, "PROMPTS_FILE", str(files["prompts.json"]))
+    monkeypatch.setattr(v1, "FEEDBACK_FILE", str(files["feedback.json"]))
+    monkeypatch.setattr(v1, "HISTORY_FILE", str(files["task_history.jsonl"]))
+    monkeypatch.setattr(v1, "HISTORY_LEGACY_FILE", str(tmp_path / "task_history.json"))
+    monkeypatch.setattr(v1, "_json_cache", {})
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(v1.v1_bp)
+    return app.test_client(), files
+
+
+def _touch(path, content: str):
+    """Rewrite path and move its mtime forward so the ETag is guaranteed to change."""
+    old_mtime = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(old_mtime + 10**9, old_mtime + 10**9))
+
+
+def test_prompts_etag_and_304(client):
+    """A matching If-None-Match gets an empty 304; a changed file gets 200 and a new ETag"""
+    test_client, files = client
+    _touch(files["prompts.json"], json.dumps({"prompts": [{"id": 1}]}))
+
+    first = test_client.get("/api/prompts")
+    assert first.status_code == 200
+    assert first.get_json() == {"prompts": [{"id": 1}]}
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    cached = test_client.get("/api/prompts", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+
+    _touch(files["prompts.json"], json.dumps({"prompts": [{"id": 1}, {"id": 2}]}))
+    changed = test_client.get("/api/prompts", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.get_json()["prompts"]) == 2
+
+
+def test_history_etag_follows_jsonl_file(client):
+    """History is revalidated against the JSONL log"""
+    test_client, files = client
+    _touch(files["task_history.jsonl"], '{"request": "a"}\n')
+
+    first = test_client.get("/api/history")
+    assert first.get_json() == {"entries": [{"request": "a"}]}
+    etag = first.headers["ETag"]
+    assert test_client.get("/api/history", headers={"If-None-Match": etag}).status_code == 304
+
+    _touch(files["task_history.jsonl"], '{"request": "a"}\n{"request": "b"}\n')
+    changed = test_client.get("/api/history", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.get_json()["entries"]) == 2
+
+
+def test_missing_file_has_no_etag(client):
+    """Without a backing file the default body is served with no ETag"""
+    test_client, _ = client
+
+    resp = test_client.get("/api/feedback")
+
+    assert resp.status_code == 200
+    assert resp.get_json() == {"feedback": {}}
+    assert "ETag" not in resp.headers
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+test_api_v2.py -- Tests for the v2 API /route endpoint (routing, budget, rate limits)
+
+Run: python3 -m pytest tests/test_api_v2.py
+(skipped when Flask is not installed)
+"""
+
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+flask = pytest.importorskip("flask")
+
+import llm_router  # noqa: E402
+from api import auth, v2  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client for the v2 blueprint plus a fresh API key (keys file in tmp_path)."""
+    monkeypatch.setattr(auth, "KEYS_FILE", str(tmp_path / "api_keys.json"))
+    monkeypatch.setattr(auth, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(auth, "_cache", {"mtime": None, "keys": {}, "index": {}, "dirty": set(), "pending": 0})
+    monkeypatch.setattr(auth, "_counters", None)
+    # Keep the router's task history out of the working directory
+    history_file = str(tmp_path / "task_history.jsonl")
+    monkeypatch.setattr(llm_router, "record_tasks_async",
+                        lambda tasks: llm_router.record_tasks(tasks, history_file))
+    monkeypatch.setattr(v2, "rate_limiter", v2.rate_limiter.__class__())
+    monkeypatch.setattr(v2, "log_request", lambda *args, **kwargs: None)
+    monkeypatch.setattr(v2, "_record_usage", lambda *args, **kwargs: None)
+    # No Groq: the split is deterministic (whole request as one task)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(v2.v2_bp)
+    key = auth.generate_api_key("test")["key"]
+    return app.test_client(), {"Authorization": f"Bearer {key}"}
+
+
+def _cli_output(request_text: str, economy: str, cwd) -> str:
+    """stdout of the router CLI; run in cwd, where it writes its task history."""
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "llm_router.py"), "--economy", economy, "-"],
+        input=request_text.encode("utf-8"), capture_output=True, cwd=cwd,
+        env={**env, "PYTHONUTF8": "1"}, check=True,
+    )
+    return result.stdout.decode("utf-8").strip()
+
+
+@pytest.mark.skipif(not v2._HAS_LLM_ROUTER, reason="llm_router not importable")
+@pytest.mark.parametrize("economy", ["strict", "balanced"])
+def test_route_matches_cli_output(client, economy, tmp_path):
+    """In-process /route renders exactly what `llm_router.py --economy` prints"""
+    test_client, headers = client
+    request_text = "Fix the login bug in auth.py"
+
+    resp = test_client.post("/api/v2/route", json={"request": request_text, "economy": economy},
+                            headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.get_json()["output"] == _cli_output(request_text, economy, tmp_path)
+
+
+def test_route_with_explicit_router_uses_subprocess(client, monkeypatch):
+    """A requested router script is run, not replaced by the in-process router"""
+    test_client, headers = client
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout=b"routed", stderr=b"")
+
+    monkeypatch.setattr(v2.subprocess, "run", fake_run)
+    monkeypatch.setattr(v2, "_router_candidates",
+                        lambda: (("llm_router.py",), frozenset({v2._abspath("llm_router.py")})))
+    monkeypatch.setattr(v2, "_route_in_process",
+                        lambda *args: pytest.fail("in-process router used"))
+
+    resp = test_client.post("/api/v2/route", json={"request": "Fix bug", "router": "llm_router.py"},
+                            headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.get_json()["output"] == "routed"
+    assert calls and calls[0][1] == "llm_router.py"
+
+
+def test_exhausted_budget_is_not_rate_charged(client, monkeypatch):
+    """A 402 for an exhausted budget leaves the caller's RPM and token windows untouched"""
+    test_client, headers = client
+    key_hash = auth._hash_key(headers["Authorization"][7:]).hex()
+    budget = SimpleNamespace(remaining=0)
+    monkeypatch.setattr(v2, "budget_manager", SimpleNamespace(get=lambda name: budget))
+
+    resp = test_client.post("/api/v2/route", json={"request": "Fix bug", "budget": "team"},
+                            headers=headers)
+
+    assert resp.status_code == 402
+    usage = v2.rate_limiter.get_usage(key_hash)
+    assert usage["rpm_used"] == 0
+    assert usage["tokens_hour_used"] == 0
@@ -0,0 +1,132 @@
+"""
+test_auth.py -- Tests for v2 API key storage (api/auth.py)
+
+Run: python3 -m pytest tests/test_auth.py
+(skipped when Flask is not installed)
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("flask")
+
+from api import auth  # noqa: E402
+
+
+@pytest.fixture
+def keys_file(tmp_path, monkeypatch):
+    """Point api.auth at an empty keys file in tmp_path with a fresh cache."""
+    path = tmp_path / "api_keys.json"
+    monkeypatch.setattr(auth, "KEYS_FILE", str(path))
+    monkeypatch.setattr(auth, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(auth, "_cache", {"mtime": None, "keys": {}, "index": {}, "dirty": set(), "pending": 0})
+    monkeypatch.setattr(auth, "_counters", None)
+    return path
+
+
+def _write_external(path, keys: dict):
+    """Rewrite the keys file as another worker would, with a distinct mtime."""
+    old_mtime = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(json.dumps(keys), encoding="utf-8")
+    os.utime(path, ns=(old_mtime + 10**9, old_mtime + 10**9))
+
+
+def test_generate_and_validate(keys_file):
+    """A generated key validates and bumps its request count; others do not"""
+    raw = auth.generate_api_key("ci")["key"]
+
+    meta = auth.validate_key(raw)
+    assert meta["name"] == "ci"
+    assert meta["hash"] == auth._hash_key(raw).hex()
+    assert meta["request_count"] == 1
+    assert auth.validate_key(raw)["request_count"] == 2
+    assert auth.validate_key(raw + "x") is None
+
+
+def test_prefix_index_resolves_colliding_prefixes(keys_file, monkeypatch):
+    """Keys sharing an index bucket are still told apart by the full digest"""
+    monkeypatch.setattr(auth, "INDEX_PREFIX_BYTES", 0)  # every key in one bucket
+    raws = [auth.generate_api_key(f"k{i}")["key"] for i in range(3)]
+
+    for i, raw in enumerate(raws):
+        assert auth.validate_key(raw)["name"] == f"k{i}"
+
+    assert auth.revoke_key(auth._hash_key(raws[1]).hex())
+    assert auth.validate_key(raws[1]) is None
+    assert auth.validate_key(raws[0])["name"] == "k0"
+    assert auth.validate_key(raws[2])["name"] == "k2"
+
+
+def test_legacy_key_is_rekeyed(keys_file):
+    """An entry under the old unpeppered SHA256 hash validates and is moved to the HMAC hash"""
+    raw = "ssh_legacy_key"
+    legacy_hash = auth._legacy_hash_key(raw)
+    _write_external(keys_file, {legacy_hash: {"name": "old", "created_at": 0,
+                                              "last_used": 0, "request_count": 5}})
+
+    meta = auth.validate_key(raw)
+
+    new_hash = auth._hash_key(raw).hex()
+    assert meta["hash"] == new_hash
+    assert meta["name"] == "old"
+    assert meta["request_count"] == 6
+    on_disk = json.loads(keys_file.read_text(encoding="utf-8"))
+    assert legacy_hash not in on_disk
+    assert on_disk[new_hash]["name"] == "old"
+    # Second use goes straight through the index
+    assert auth.validate_key(raw)["hash"] == new_hash
+
+
+def test_cache_reloads_when_file_mtime_changes(keys_file):
+    """Revocations and new keys written by another process are picked up"""
+    raw = auth.generate_api_key("mine")["key"]
+    assert auth.validate_key(raw) is not None
+
+    # Another worker revokes it
+    _write_external(keys_file, {})
+    assert auth.validate_key(raw) is None
+
+    # ... and adds a key of its own
+    other = "ssh_other_worker_key"
+    _write_external(keys_file, {auth._hash_key(other).hex(): {
+        "name": "theirs", "created_at": 0, "last_used": 0, "request_count": 0}})
+    assert auth.validate_key(other)["name"] == "theirs"
+
+
+def test_cache_not_reread_while_mtime_unchanged(keys_file, monkeypatch):
+    """With an unchanged mtime the keys file is not opened again"""
+    raw = auth.generate_api_key("ci")["key"]
+    auth.validate_key(raw)
+
+    def fail_open(*args, **kwargs):
+        raise AssertionError("keys file re-read")
+
+    monkeypatch.setattr("builtins.open", fail_open)
+    assert auth.validate_key(raw) is not None
+
+
+def test_unflushed_counters_survive_reload(keys_file):
+    """Pending usage counters are kept when another process rewrites the file"""
+    raw = auth.generate_api_key("ci")["key"]
+    key_hash = auth._hash_key(raw).hex()
+    auth.validate_key(raw)
+    auth.validate_key(raw)
+
+    on_disk = json.loads(keys_file.read_text(encoding="utf-8"))
+    on_disk["0" * 64] = {"name": "new", "created_at": 0, "last_used": 0, "request_count": 0}
+    _write_external(keys_file, on_disk)
+
+    assert auth.validate_key(raw)["request_count"] == 3
+    auth.flush()
+    on_disk = json.loads(keys_file.read_text(encoding="utf-8"))
+    assert on_disk[key_hash]["request_count"] == 3
+    assert "0" * 64 in on_disk
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+test_dataset.py -- Tests for the JSONL training data store (ml/dataset.py)
+
+Run: python3 -m pytest tests/test_dataset.py
+"""
+
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml import dataset
+from ml.dataset import (
+    append_samples, count_samples, dedup_samples, iter_samples, load_samples, migrate_legacy,
+    score_histograms,
+)
+
+SAMPLES = [
+    {"text": "Fix login bug", "urgency": 9, "importance": 8},
+    {"text": "로그인 버그 수정", "urgency": 9, "importance": 8},
+    {"text": "Update docs", "urgency": 2, "importance": 3},
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "training_data.jsonl")
+
+
+def test_migrate_legacy_json_array(data_file, tmp_path):
+    """A legacy .json array is converted to JSONL once; the JSONL file then wins"""
+    legacy = tmp_path / "training_data.json"
+    legacy.write_text(json.dumps(SAMPLES, ensure_ascii=False), encoding="utf-8")
+
+    assert load_samples(data_file) == SAMPLES
+    assert count_samples(data_file) == 3
+
+    # Later edits to the legacy file are ignored
+    legacy.write_text(json.dumps(SAMPLES[:1]), encoding="utf-8")
+    migrate_legacy(data_file)
+    assert count_samples(data_file) == 3
+
+
+def test_migrate_legacy_ignores_bad_input(data_file, tmp_path):
+    """Missing, unparsable or non-array legacy files leave no JSONL file behind"""
+    migrate_legacy(data_file)
+    assert not os.path.exists(data_file)
+
+    (tmp_path / "training_data.json").write_text('{"text": "x"}', encoding="utf-8")
+    migrate_legacy(data_file)
+    assert not os.path.exists(data_file)
+
+    (tmp_path / "training_data.json").write_text("[{", encoding="utf-8")
+    assert load_samples(data_file) == []
+
+
+def test_append_then_stream(data_file):
+    """append_samples writes one line per sample; readers skip blank and torn lines"""
+    assert append_samples(iter(SAMPLES[:2]), data_file) == 2
+    assert append_samples(SAMPLES[2:], data_file) == 1
+
+    with open(data_file, "a", encoding="utf-8") as f:
+        f.write("\n{\"text\": \"torn")
+
+    assert list(iter_samples(data_file)) == SAMPLES
+    with open(data_file, encoding="utf-8") as f:
+        assert "로그인" in f.read()  # UTF-8, not \\u escapes
+
+
+def test_missing_file_is_empty(data_file):
+    """A data file that does not exist yet reads as no samples"""
+    assert list(iter_samples(data_file)) == []
+    assert count_samples(data_file) == 0
+
+
+def test_score_histograms(monkeypatch):
+    """Counts per score, indexed 0-10, with and without numpy"""
+    expected = {
+        "urgency": [0, 0, 1, 0, 0, 0, 0, 0, 0, 2, 0],
+        "importance": [0, 0, 0, 1, 0, 0, 0, 0, 2, 0, 0],
+    }
+    assert score_histograms(iter(SAMPLES)) == expected
+
+    monkeypatch.setattr(dataset, "np", None)
+    assert score_histograms(iter(SAMPLES)) == expected
+
+
+def test_dedup_samples():
+    """Exact duplicates (of existing or earlier candidates) are dropped; key order is ignored"""
+    reordered = {"importance": 3, "urgency": 2, "text": "Update docs"}
+    candidates = [reordered, SAMPLES[0], {"text": "New task", "urgency": 5, "importance": 5},
+                  {"text": "New task", "urgency": 5, "importance": 5}]
+
+    assert dedup_samples(SAMPLES[1:], candidates) == [SAMPLES[0], candidates[2]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
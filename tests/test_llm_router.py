@@ -0,0 +1,56 @@
+"""
+test_llm_router.py -- Tests for llm_router.py helpers (v4 ticket splitting)
+
+Run: python3 -m pytest tests/test_llm_router.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_router import _parse_numbered_response, _parse_numbered_stream, apply_merge_spec
+
+
+def test_apply_merge_spec_merges_into_lower_ticket():
+    """Merging A+C joins C into A's slot and drops C, in either order"""
+    tasks = ["login", "signup", "logout"]
+
+    assert apply_merge_spec(tasks, "A+C") == ["login / logout", "signup"]
+    assert apply_merge_spec(tasks, "c + a") == ["login / logout", "signup"]
+    assert apply_merge_spec(tasks, "B+C") == ["login", "signup / logout"]
+    assert tasks == ["login", "signup", "logout"]  # input untouched
+
+
+def test_apply_merge_spec_ignores_invalid_specs():
+    """Empty, malformed, out-of-range and self merges leave the tasks as they are"""
+    tasks = ["login", "signup"]
+
+    for spec in ("", "A", "A+", "AB+C", "A-B", "A+C", "B+B"):
+        assert apply_merge_spec(tasks, spec) == tasks
+
+
+def test_parse_numbered_stream_matches_whole_response():
+    """Chunk boundaries anywhere (mid-line, mid-number) give the same tasks"""
+    text = "1. Fix the login bug\n2) Add signup page\n\n3. Update docs"
+    expected = _parse_numbered_response(text)
+    assert expected == ["Fix the login bug", "Add signup page", "Update docs"]
+
+    for size in (1, 2, 3, 7, len(text)):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert _parse_numbered_stream(chunks) == expected
+
+
+def test_parse_numbered_stream_handles_crlf_and_empty():
+    """CRLF line ends are split correctly; no chunks means no tasks"""
+    assert _parse_numbered_stream(["1. a\r", "\n2. b\r\n"]) == ["a", "b"]
+    assert _parse_numbered_stream([]) == []
+    assert _parse_numbered_stream(["", "  "]) == []
+
+
+if __name__ == "__main__":
+    test_apply_merge_spec_merges_into_lower_ticket()
+    test_apply_merge_spec_ignores_invalid_specs()
+    test_parse_numbered_stream_matches_whole_response()
+    test_parse_numbered_stream_handles_crlf_and_empty()
+    print("✅ llm_router helper tests passed")
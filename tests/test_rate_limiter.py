@@ -0,0 +1,147 @@
+"""
+test_rate_limiter.py -- Tests for the v2 API rate limiter (api/middleware.py)
+
+Run: python3 -m pytest tests/test_rate_limiter.py
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import middleware
+from api.middleware import RateCheck, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable time.time() for the limiter (clock.now, in seconds)."""
+    clock = SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(middleware, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+def test_check_rejects_over_rpm(clock):
+    """The request past the RPM limit is rejected and its tokens are not counted"""
+    limiter = RateLimiter(rpm=2, tokens_per_hour=1000)
+
+    assert limiter.check("k", 10) == RateCheck(True, True)
+    assert limiter.check("k", 10) == RateCheck(True, True)
+    assert limiter.check("k", 10) == RateCheck(False, True)
+
+    usage = limiter.get_usage("k")
+    assert usage["rpm_used"] == 2
+    assert usage["tokens_hour_used"] == 20
+
+
+def test_check_token_reject_keeps_rpm_slot(clock):
+    """A request rejected for tokens still uses an RPM slot but adds no tokens"""
+    limiter = RateLimiter(rpm=10, tokens_per_hour=100)
+
+    assert limiter.check("k", 80) == RateCheck(True, True)
+    assert limiter.check("k", 30) == RateCheck(True, False)
+
+    usage = limiter.get_usage("k")
+    assert usage["rpm_used"] == 2
+    assert usage["tokens_hour_used"] == 80
+
+    # The remaining token allowance is still usable
+    assert limiter.check("k", 20) == RateCheck(True, True)
+
+
+def test_check_matches_separate_calls(clock):
+    """check() agrees with check_rpm() + check_tokens() on the same sequence"""
+    combined = RateLimiter(rpm=3, tokens_per_hour=50)
+    separate = RateLimiter(rpm=3, tokens_per_hour=50)
+
+    for tokens in (20, 20, 20, 5, 5):
+        rpm_ok = separate.check_rpm("k")
+        tokens_ok = separate.check_tokens("k", tokens) if rpm_ok else True
+        assert combined.check("k", tokens) == RateCheck(rpm_ok, tokens_ok)
+
+    assert combined.get_usage("k") == separate.get_usage("k")
+
+
+def test_rpm_window_expires_per_bucket(clock):
+    """Requests leave the RPM window 60s after their 1s bucket, one bucket at a time"""
+    limiter = RateLimiter(rpm=2, tokens_per_hour=1000)
+
+    assert limiter.check_rpm("k")
+    clock.now += 30
+    assert limiter.check_rpm("k")
+    assert not limiter.check_rpm("k")
+
+    clock.now += 29  # first request is 59s old: still in the window
+    assert not limiter.check_rpm("k")
+
+    clock.now += 1  # 60s: its bucket is recycled, the second request remains
+    assert limiter.get_usage("k")["rpm_used"] == 1
+    assert limiter.check_rpm("k")
+    assert not limiter.check_rpm("k")
+
+
+def test_token_window_expires_after_an_hour(clock):
+    """Token usage drops out of the hourly window by 1-minute bucket"""
+    limiter = RateLimiter(rpm=100, tokens_per_hour=100)
+
+    assert limiter.check_tokens("k", 60)
+    clock.now += 30 * 60
+    assert limiter.check_tokens("k", 40)
+    assert not limiter.check_tokens("k", 1)
+
+    clock.now += 30 * 60  # first 60 tokens are an hour old
+    assert limiter.get_usage("k")["tokens_hour_used"] == 40
+    assert limiter.check_tokens("k", 60)
+    assert not limiter.check_tokens("k", 1)
+
+
+def test_idle_key_resets_whole_ring(clock):
+    """After more than a full window of inactivity every bucket is cleared"""
+    limiter = RateLimiter(rpm=3, tokens_per_hour=100)
+
+    for _ in range(3):
+        limiter.check("k", 30)
+    assert limiter.check("k", 1) == RateCheck(False, True)
+
+    clock.now += 2 * 3600
+    assert limiter.get_usage("k") == {
+        "rpm_used": 0, "rpm_limit": 3, "tokens_hour_used": 0, "tokens_hour_limit": 100,
+    }
+    assert limiter.check("k", 100) == RateCheck(True, True)
+
+
+def test_keys_are_independent(clock):
+    """One key hitting its limit does not affect another"""
+    limiter = RateLimiter(rpm=1, tokens_per_hour=10)
+
+    assert limiter.check("a", 10) == RateCheck(True, True)
+    assert limiter.check("a", 1) == RateCheck(False, True)
+    assert limiter.check("b", 10) == RateCheck(True, True)
+
+
+@pytest.mark.skipif(middleware.redis is None or not os.environ.get("REDIS_URL"),
+                    reason="needs redis-py and a server at REDIS_URL")
+def test_redis_limiter_matches_in_memory():
+    """The Lua-script limiter gives the same RateCheck sequence as RateLimiter"""
+    import uuid
+
+    client = middleware.redis.Redis.from_url(os.environ["REDIS_URL"])
+    prefix = f"test-ratelimit-{uuid.uuid4().hex}"
+    redis_limiter = middleware.RedisRateLimiter(client, rpm=2, tokens_per_hour=50, prefix=prefix)
+    memory_limiter = RateLimiter(rpm=2, tokens_per_hour=50)
+    try:
+        for tokens in (30, 30, 5):
+            assert redis_limiter.check("k", tokens) == memory_limiter.check("k", tokens)
+        usage = redis_limiter.get_usage("k")
+        assert usage["rpm_used"] == 2
+        assert usage["tokens_hour_used"] == 30
+    finally:
+        for key in client.scan_iter(f"{prefix}:*"):
+            client.delete(key)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
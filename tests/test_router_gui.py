@@ -0,0 +1,73 @@
+"""
+test_router_gui.py -- Tests for router_gui's ticket block helpers
+
+Run: python3 -m pytest tests/test_router_gui.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from router_gui import apply_english_tickets_to_claude_block, extract_tickets_from_claude_block
+
+
+def test_apply_replaces_body_line_starting_with_change_log():
+    """Only the "Change log stub" line ends a ticket body when applying translations"""
+    block = "\n".join([
+        "Ticket A: 로그인 버그",
+        "로그인 버그 수정",
+        "Change log 포맷도 정리",
+        "Change log stub: fix login",
+    ])
+
+    result = apply_english_tickets_to_claude_block(block, {"A": "Fix the login bug"})
+
+    assert result.splitlines() == [
+        "Ticket A:",
+        "Fix the login bug",
+        "",
+        "Change log stub: fix login",
+    ]
+    print("✅ apply_english_tickets Change log body test passed")
+
+
+def test_apply_stops_at_section_delimiters():
+    """Rules:, → and Next session lines are kept after the replaced body"""
+    block = "\n".join([
+        "Ticket A: 작업",
+        "원문",
+        "Rules:",
+        "Ticket B: 작업",
+        "원문",
+        "→ next",
+        "Next session: B",
+    ])
+
+    result = apply_english_tickets_to_claude_block(block, {"A": "Task A", "B": "Task B"})
+
+    assert result.splitlines() == [
+        "Ticket A:", "Task A", "", "Rules:",
+        "Ticket B:", "Task B", "", "→ next", "Next session: B",
+    ]
+    print("✅ apply_english_tickets delimiter test passed")
+
+
+def test_extract_ends_ticket_at_change_log():
+    """Extraction treats any "Change log" line as the end of the ticket body"""
+    block = "\n".join([
+        "Ticket A: 로그인 버그",
+        "로그인 버그 수정",
+        "Change log 포맷도 정리",
+    ])
+
+    tickets, _ = extract_tickets_from_claude_block(block)
+
+    assert "Change log" not in tickets["A"]
+    print("✅ extract_tickets Change log test passed")
+
+
+if __name__ == "__main__":
+    test_apply_replaces_body_line_starting_with_change_log()
+    test_apply_stops_at_section_delimiters()
+    test_extract_ends_ticket_at_change_log()
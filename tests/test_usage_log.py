@@ -0,0 +1,107 @@
+"""
+test_usage_log.py -- Tests for the double-buffered token usage log (services/usage_log.py)
+
+Run: python3 -m pytest tests/test_usage_log.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import usage_log as usage_log_module
+from services.usage_log import UsageLog
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    """JSONL path in tmp_path; the background flusher is parked so tests flush by hand."""
+    monkeypatch.setattr(usage_log_module, "FLUSH_INTERVAL", 3600)
+    monkeypatch.setattr(usage_log_module, "TOKEN_USAGE_FILE", str(tmp_path / "token_usage.json"))
+    return tmp_path / "token_usage.jsonl"
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_record_is_memory_only_until_flush(log_path):
+    """record() serves entries immediately but writes nothing until flush()"""
+    log = UsageLog(str(log_path))
+    log.record({"n": 1})
+    log.record({"n": 2})
+
+    assert log.get_entries() == [{"n": 1}, {"n": 2}]
+    assert not log_path.exists() or log_path.read_text(encoding="utf-8") == ""
+
+    log.flush()
+    assert _lines(log_path) == [{"n": 1}, {"n": 2}]
+
+
+def test_flush_swaps_buffers_and_appends(log_path):
+    """Each flush appends only what was recorded since the last one, in order"""
+    log = UsageLog(str(log_path))
+    log.record({"n": 1})
+    log.flush()
+    assert log._active == 1
+
+    log.record({"n": 2})
+    log.record({"n": 3})
+    log.flush()
+    log.flush()  # nothing pending: no extra lines
+
+    assert _lines(log_path) == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert not any(log._buffers)
+
+
+def test_flush_drains_record_that_raced_the_swap(log_path):
+    """An entry left in the inactive buffer is written by the same flush"""
+    log = UsageLog(str(log_path))
+    log.record({"n": 1})
+    log._buffers[log._active ^ 1].append({"n": 2})  # as if record() ran mid-swap
+
+    log.flush()
+
+    assert _lines(log_path) == [{"n": 1}, {"n": 2}]
+
+
+def test_reload_hydrates_entries(log_path):
+    """A new instance starts with the entries already on disk"""
+    log = UsageLog(str(log_path))
+    for n in range(3):
+        log.record({"n": n})
+    log.flush()
+
+    assert UsageLog(str(log_path)).get_entries() == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_legacy_json_array_is_migrated(log_path, tmp_path):
+    """token_usage.json is converted to JSONL once when no JSONL log exists"""
+    (tmp_path / "token_usage.json").write_text(json.dumps([{"n": 1}, {"n": 2}]), encoding="utf-8")
+
+    log = UsageLog(str(log_path))
+
+    assert log.get_entries() == [{"n": 1}, {"n": 2}]
+    assert _lines(log_path) == [{"n": 1}, {"n": 2}]
+
+
+def test_compact_keeps_newest_entries(log_path, monkeypatch):
+    """Compaction trims the file to the newest MAX_ENTRIES lines"""
+    monkeypatch.setattr(usage_log_module, "MAX_ENTRIES", 2)
+    log = UsageLog(str(log_path))
+    for n in range(4):
+        log.record({"n": n})
+    log.flush()
+
+    log._compact()
+    log.record({"n": 4})
+    log.flush()  # reopens the replaced file
+
+    assert _lines(log_path) == [{"n": 2}, {"n": 3}, {"n": 4}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
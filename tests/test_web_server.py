@@ -0,0 +1,99 @@
+"""
+test_web_server.py -- Tests for the stdlib web server's history API (web_server.py)
+
+Run: python3 -m pytest tests/test_web_server.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import web_server
+from llm_router import TaskDecision, record_tasks
+
+
+class _FakeHandler:
+    """Just enough of RouterHandler for the history methods: captures the JSON response."""
+
+    def __init__(self):
+        self.response = None
+
+    def _json_response(self, data, status=200):
+        self.response = (status, data)
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    """Point web_server at a JSONL history (and legacy array) in tmp_path."""
+    path = tmp_path / "task_history.jsonl"
+    monkeypatch.setattr(web_server, "HISTORY_FILE", str(path))
+    monkeypatch.setattr(web_server, "HISTORY_LEGACY_FILE", str(tmp_path / "task_history.json"))
+    return path
+
+
+def _call(method, *args):
+    handler = _FakeHandler()
+    method(handler, *args)
+    return handler.response
+
+
+def _record(path, *summaries):
+    tasks = [TaskDecision(id=chr(ord("A") + i), summary=s, route="claude", confidence=0.9,
+                          priority=i + 1, reasons=[], claude_prompt="", next_session_starter="",
+                          change_log_stub="")
+             for i, s in enumerate(summaries)]
+    record_tasks(tasks, str(path))
+
+
+def test_history_get_reads_router_jsonl(history):
+    """/api/history lists what llm_router.record_tasks appended"""
+    _record(history, "Fix login", "Add signup")
+
+    status, data = _call(web_server.RouterHandler._api_history_get)
+
+    assert status == 200
+    assert [e["summary"] for e in data["entries"]] == ["Fix login", "Add signup"]
+
+
+def test_history_get_falls_back_to_legacy_array(history, tmp_path):
+    """Before llm_router migrates it, the legacy JSON array is served"""
+    (tmp_path / "task_history.json").write_text(json.dumps([{"summary": "old"}]), encoding="utf-8")
+
+    _, data = _call(web_server.RouterHandler._api_history_get)
+
+    assert data["entries"] == [{"summary": "old"}]
+
+
+def test_history_delete_one_rewrites_jsonl(history):
+    """Deleting one entry removes it from the live log; later appends still land"""
+    _record(history, "Fix login", "Add signup", "Update docs")
+
+    status, _ = _call(web_server.RouterHandler._api_history_delete_one, "/api/history/1")
+    assert status == 200
+    _record(history, "New task")
+
+    _, data = _call(web_server.RouterHandler._api_history_get)
+    assert [e["summary"] for e in data["entries"]] == ["Fix login", "Update docs", "New task"]
+
+    status, _ = _call(web_server.RouterHandler._api_history_delete_one, "/api/history/9")
+    assert status == 404
+
+
+def test_history_delete_all_truncates_jsonl(history, tmp_path):
+    """Delete all empties the JSONL log, which then also shadows the legacy array"""
+    (tmp_path / "task_history.json").write_text(json.dumps([{"summary": "old"}]), encoding="utf-8")
+    _record(history, "Fix login")
+
+    _call(web_server.RouterHandler._api_history_delete_all)
+
+    assert history.read_text(encoding="utf-8") == ""
+    _, data = _call(web_server.RouterHandler._api_history_get)
+    assert data["entries"] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -106,7 +106,8 @@ def _translate_remaining_korean(text: str, api_key: str) -> str:
 
 WEBSITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "website")
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
-HISTORY_FILE = os.path.join(DATA_DIR, "task_history.json")
+HISTORY_FILE = os.path.join(DATA_DIR, "task_history.jsonl")  # written by llm_router.record_tasks
+HISTORY_LEGACY_FILE = os.path.splitext(HISTORY_FILE)[0] + ".json"
 PROMPTS_FILE = os.path.join(DATA_DIR, "prompts.json")
 FEEDBACK_FILE = os.path.join(DATA_DIR, "feedback.json")
 DEFAULT_PORT = 8080
@@ -133,6 +134,35 @@ def _write_json_file(path, data):
             json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def _read_history():
+    """History entries: the JSONL log, or the legacy JSON array until it is migrated."""
+    if not os.path.exists(HISTORY_FILE):
+        data = _read_json_file(HISTORY_LEGACY_FILE, [])
+        if isinstance(data, dict):
+            data = data.get("entries", data.get("history", []))
+        return data if isinstance(data, list) else []
+    entries = []
+    try:
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # blank or torn line
+    except FileNotFoundError:
+        return []
+    return entries
+
+
+def _write_history(entries):
+    """Atomically rewrite the JSONL history (used by the delete endpoints)."""
+    tmp_file = HISTORY_FILE + ".tmp"
+    with _file_lock:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+        os.replace(tmp_file, HISTORY_FILE)
+
+
 class ThreadedHTTPServer(HTTPServer):
     """HTTPServer with threading + SO_REUSEADDR for concurrent requests."""
 
@@ -873,18 +903,10 @@ RULES:
     # ---------- History API ----------
 
     def _api_history_get(self):
-        data = _read_json_file(HISTORY_FILE, [])
-        # task_history.json can be a list or dict with "entries" key
-        if isinstance(data, list):
-            entries = data
-        elif isinstance(data, dict):
-            entries = data.get("entries", data.get("history", []))
-        else:
-            entries = []
-        self._json_response({"entries": entries})
+        self._json_response({"entries": _read_history()})
 
     def _api_history_delete_all(self):
-        _write_json_file(HISTORY_FILE, [])
+        _write_history([])
         self._json_response({"success": True, "deleted": "all"})
 
     def _api_history_delete_one(self, path):
@@ -895,15 +917,14 @@ RULES:
             self._json_response({"error": "Invalid index"}, 400)
             return
 
-        data = _read_json_file(HISTORY_FILE, [])
-        entries = data if isinstance(data, list) else data.get("entries", data.get("history", []))
+        entries = _read_history()
 
         if idx < 0 or idx >= len(entries):
             self._json_response({"error": "Index out of range"}, 404)
             return
 
         removed = entries.pop(idx)
-        _write_json_file(HISTORY_FILE, entries)
+        _write_history(entries)
         self._json_response({"success": True, "deleted_index": idx})
 
     # ---------- Cost Stats API ----------
@@ -1183,8 +1204,7 @@ RULES:
             pass  # Client disconnected
 
     def _api_cost_stats(self):
-        data = _read_json_file(HISTORY_FILE, [])
-        entries = data if isinstance(data, list) else data.get("entries", [])
+        entries = _read_history()
 
         cost_per_1k = {"claude": 0.015, "cheap_llm": 0.0005, "split": 0.008}
         tokens_per_task = {"claude": 2000, "cheap_llm": 500, "split": 1200}